@@ -121,3 +121,44 @@ STATIC_URL = "static/"
 
 LOGIN_REDIRECT_URL = os.getenv("LOGIN_REDIRECT_URL", "/")
 LOGOUT_REDIRECT_URL = os.getenv("LOGOUT_REDIRECT_URL", "/")
+
+# Client PokeAPI partagé (pokedex/pokeapi.py)
+# URL de l'API : à remplacer par le faux PokeAPI local pour les tests de charge
+# (manage.py fake_pokeapi, puis POKEAPI_BASE_URL=http://127.0.0.1:8001/api/v2)
+POKEAPI_BASE_URL = os.getenv("POKEAPI_BASE_URL", "https://pokeapi.co/api/v2")
+POKEAPI_TIMEOUT = float(os.getenv("POKEAPI_TIMEOUT", "5"))  # secondes par appel
+POKEAPI_RETRIES = int(os.getenv("POKEAPI_RETRIES", "2"))  # tentatives en plus
+POKEAPI_MAX_WORKERS = int(os.getenv("POKEAPI_MAX_WORKERS", "6"))  # appels parallèles
+
+# Cache Django du site, et un alias réservé aux réponses PokeAPI : le vider
+# (TieredCache.clear) ne touche ni aux sessions ni aux autres clés du site
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "pokeapi": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "pokeapi",
+    },
+}
+
+# Cache des réponses PokeAPI (pokedex/api_cache.py) : LRU mémoire, puis cache
+# Django (alias ci-dessus), puis disque. Durées de vie en secondes, par endpoint.
+POKEAPI_CACHE = {
+    "LRU_SIZE": int(os.getenv("POKEAPI_CACHE_LRU_SIZE", "512")),
+    "BACKEND": os.getenv("POKEAPI_CACHE_BACKEND", "pokeapi") or None,
+    "DIR": os.getenv("POKEAPI_CACHE_DIR", BASE_DIR / "var" / "pokeapi") or None,
+    "TTLS": {
+        "pokemon": 7 * 24 * 3600,
+        "pokemon-species": 30 * 24 * 3600,
+        "default": 24 * 3600,
+    },
+}
+
+# Miroir local des sprites (manage.py mirror_sprites, pokedex/sprites.py)
+SPRITE_MIRROR_DIR = os.getenv("SPRITE_MIRROR_DIR", BASE_DIR / "var" / "sprites")
+
+# Combats sans action depuis ce délai supprimés par manage.py expire_fights
+FIGHT_EXPIRY_HOURS = int(os.getenv("FIGHT_EXPIRY_HOURS", "24"))
+
+# Matchmaking PvE : adversaire de niveau moyen à ± N niveaux si possible
+# (0 : n'importe quelle équipe prête)
+MATCHMAKING_LEVEL_BAND = int(os.getenv("MATCHMAKING_LEVEL_BAND", "5"))
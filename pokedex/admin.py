@@ -2,7 +2,15 @@ from django import forms
 from django.contrib import admin
 from django.core.exceptions import ValidationError
 
-from .models import PokemonCapture, Team
+from .models import (
+    Fight,
+    FightResult,
+    PokemonCapture,
+    Species,
+    SpeciesStats,
+    Team,
+    TrainerStats,
+)
 
 # Register your models here.
 
@@ -15,6 +23,43 @@ class PokemonCaptureAdmin(admin.ModelAdmin):
     search_fields = ("name", "user__username")
 
 
+# Catalogue local des espèces (rempli par manage.py sync_catalog)
+class SpeciesStatsInline(admin.StackedInline):
+    model = SpeciesStats
+
+
+@admin.register(Species)
+class SpeciesAdmin(admin.ModelAdmin):
+    list_display = ("id", "name_fr", "name", "type1", "type2", "synced_at")
+    list_filter = ("type1",)
+    search_fields = ("name", "name_fr")
+    inlines = [SpeciesStatsInline]
+
+
+# Combats en cours (état binaire, non éditable)
+@admin.register(Fight)
+class FightAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "team1", "team2", "winner", "version", "updated_at")
+    list_filter = ("winner",)
+    search_fields = ("user__username",)
+    readonly_fields = ("state", "version")
+
+
+# Combats terminés (écrits par Fight.save_state)
+@admin.register(FightResult)
+class FightResultAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "team1", "team2", "mode", "winner", "turns")
+    list_filter = ("mode", "winner")
+    search_fields = ("user__username",)
+    list_select_related = ("user", "team1", "team2")
+
+
+@admin.register(TrainerStats)
+class TrainerStatsAdmin(admin.ModelAdmin):
+    list_display = ("user", "fights", "wins", "losses", "best_level", "species_count")
+    search_fields = ("user__username",)
+
+
 # Formulaire personnalisé pour empêcher les admins de mettre
 # plus de 5 Pokémons dans une équipe
 # Cette validation est obligée car le modèle Team.clean() n'est pas appelé
@@ -58,12 +103,12 @@ class TeamAdmin(admin.ModelAdmin):
 
     # Methode pour definir les colonnes pokemon_count et is_complete
     def pokemon_count(self, obj):
-        return obj.pokemons.count()
+        return obj.roster_size
 
     pokemon_count.short_description = "Nombre de Pokémon"
 
     def is_complete(self, obj):
-        if obj.is_ready_for_battle():
+        if obj.is_ready:
             return "✅"
         else:
             return "❌"
@@ -0,0 +1,196 @@
+"""
+Cache à plusieurs niveaux pour les réponses PokeAPI.
+
+1. LRU en mémoire (borné, propre au processus)
+2. Cache Django (alias CACHE_ALIAS réservé à PokeAPI, partagé entre workers)
+3. Fichiers JSON sur disque (survit aux redémarrages)
+
+Chaque entrée garde son ETag / Last-Modified : une entrée expirée n'est pas
+retéléchargée, elle est revalidée par une requête conditionnelle (304).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict
+from pathlib import Path
+
+from django.core.cache import caches
+
+# Alias de CACHES réservé aux réponses PokeAPI : clear() peut le vider en entier
+CACHE_ALIAS = "pokeapi"
+
+
+class LRUTier:
+    name = "lru"
+
+    def __init__(self, max_entries, stats):
+        self.max_entries = max_entries
+        self.stats = stats
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.incr("lru_evictions")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DjangoCacheTier:
+    name = "django"
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.cache = caches[alias]
+        # Clés écrites par ce processus, pour vider un alias partagé
+        self._keys = set()
+        self._lock = threading.Lock()
+
+    def _key(self, key):
+        return "pokeapi:" + hashlib.sha1(key.encode()).hexdigest()
+
+    def get(self, key):
+        return self.cache.get(self._key(key))
+
+    def set(self, key, entry):
+        # Pas d'expiration côté backend : une entrée périmée sert encore
+        # à la revalidation (ETag) et de secours si l'API est en panne.
+        with self._lock:
+            self._keys.add(self._key(key))
+        self.cache.set(self._key(key), entry, timeout=None)
+
+    def clear(self):
+        # Un alias partagé (default : sessions, Pokédex des dresseurs...) ne
+        # perd que les clés pokeapi: écrites ici, jamais le reste du site
+        if self.alias == CACHE_ALIAS:
+            self.cache.clear()
+            return
+        with self._lock:
+            keys, self._keys = list(self._keys), set()
+        self.cache.delete_many(keys)
+
+
+class DiskTier:
+    name = "disk"
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def _path(self, key):
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.json"
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, entry):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Écriture atomique : un lecteur ne voit jamais de fichier à moitié écrit
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def clear(self):
+        for path in self.directory.glob("*/*.json"):
+            path.unlink(missing_ok=True)
+
+
+class CacheStats:
+    """Compteurs partagés entre threads (hits par niveau, misses, évictions...)."""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def incr(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def as_dict(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+class TieredCache:
+    def __init__(self, lru_size=512, backend=None, directory=None, ttls=None):
+        self.stats = CacheStats()
+        self.ttls = ttls or {}
+        self.lru = LRUTier(lru_size, self.stats)
+        self.tiers = [self.lru]
+        if backend:
+            self.tiers.append(DjangoCacheTier(backend))
+        if directory:
+            self.tiers.append(DiskTier(directory))
+
+    def ttl_for(self, endpoint):
+        return self.ttls.get(endpoint, self.ttls.get("default", 3600))
+
+    def get(self, key):
+        """
+        Retourne l'entrée la plus proche (fraîche ou non) et la recopie dans
+        les niveaux supérieurs. None si aucun niveau ne la connaît.
+        """
+        for depth, tier in enumerate(self.tiers):
+            entry = tier.get(key)
+            if entry is not None:
+                self.stats.incr(f"{tier.name}_hits")
+                for upper in self.tiers[:depth]:
+                    upper.set(key, entry)
+                return entry
+        self.stats.incr("misses")
+        return None
+
+    def set(self, key, endpoint, data, etag=None, last_modified=None):
+        entry = {
+            "data": data,
+            "etag": etag,
+            "last_modified": last_modified,
+            "expires": time.time() + self.ttl_for(endpoint),
+        }
+        for tier in self.tiers:
+            tier.set(key, entry)
+        return entry
+
+    def refresh(self, key, endpoint, entry):
+        """Réponse 304 : on garde les données et on repousse l'expiration."""
+        self.stats.incr("revalidations")
+        return self.set(
+            key, endpoint, entry["data"], entry["etag"], entry["last_modified"]
+        )
+
+    @staticmethod
+    def is_fresh(entry):
+        return entry["expires"] > time.time()
+
+    def clear(self):
+        for tier in self.tiers:
+            tier.clear()
+
+    def info(self):
+        return {**self.stats.as_dict(), "lru_size": len(self.lru)}
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class PokedexConfig(AppConfig):
     name = "pokedex"
+
+    def ready(self):
+        # Pool de matchmaking tenu à jour par signaux
+        from . import signals  # noqa: F401
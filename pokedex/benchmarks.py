@@ -0,0 +1,288 @@
+"""
+Suite de performance par URL (voir manage.py benchmark_routes).
+
+`seed()` remplit la base avec des volumes réalistes (milliers de dresseurs,
+millions de captures, 5 équipes pleines par dresseur). `run()` appelle
+chaque route de pokedex/urls.py avec le client de test Django et mesure le
+nombre de requêtes SQL et les percentiles de temps. Chaque route a un budget
+dans BUDGETS : un dépassement fait échouer la suite. PokeAPI est remplacée
+par le stub de fake_pokeapi.py sur un client dédié (cache mémoire seulement) :
+tout tourne hors ligne et rien n'est écrit dans le cache PokeAPI du site.
+De même, `run()` pointe SPRITE_MIRROR_DIR sur un dossier temporaire, supprimé
+à la fin : le miroir des sprites du site reste intact.
+"""
+
+import io
+import random
+import tempfile
+import time
+from collections import namedtuple
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from .api_cache import TieredCache
+from .catalog import fetch_records, store_records
+from .fake_pokeapi import SPECIES_COUNT, install_stub
+from .fight_logic import FightManager, encode_replay
+from .leaderboard import rebuild as rebuild_leaderboard
+from .matchmaking import rebuild_pool
+from .models import Fight, FightResult, PokemonCapture, Team
+from .pokeapi import PokeAPIClient, override_client
+from .sprites import variants
+
+# Requêtes SQL max par appel, et temps de réponse max au 95e centile
+Budget = namedtuple("Budget", "queries p95_ms")
+
+BUDGETS = {
+    # Badges « capturé » : dresseur (auser) et Pokédex au premier appel
+    "index": Budget(8, 150),
+    "pokemon_detail": Budget(5, 150),
+    "signup": Budget(0, 100),
+    "capture_pokemon": Budget(5, 100),
+    # + bit du Pokédex quand la dernière capture d'une espèce part
+    "release_pokemon": Budget(14, 150),
+    "profile": Budget(4, 150),
+    "edit_profile": Budget(2, 100),
+    # Deux lectures de plus aux extrémités (voisine en boucle)
+    "capture_detail": Budget(8, 150),
+    "team": Budget(5, 150),
+    "fight": Budget(5, 150),
+    "fight_detail": Budget(3, 150),
+    "fight_history": Budget(4, 150),
+    "fight_replay": Budget(3, 150),
+    "leaderboard": Budget(3, 150),
+    "sprite_file": Budget(0, 50),
+    "pokeapi_cache_stats": Budget(2, 100),
+}
+
+# Un appel : méthode HTTP, URL, données POST, qui est connecté
+Call = namedtuple("Call", "method url data user", defaults=(None, "player"))
+
+
+def _calls(ctx):
+    """Appel type de chaque route, construit à partir des données seedées."""
+    return {
+        "index": Call("get", reverse("index")),
+        "pokemon_detail": Call("get", reverse("pokemon_detail", args=[25])),
+        "signup": Call("get", reverse("signup"), user=None),
+        "capture_pokemon": Call(
+            "post",
+            reverse("capture_pokemon"),
+            {"pokemon_id": 25, "pokemon_name": "pikachu"},
+        ),
+        # Une capture neuve à relâcher à chaque appel
+        "release_pokemon": lambda: Call(
+            "post", reverse("release_pokemon", args=[ctx.new_capture()])
+        ),
+        "profile": Call("get", reverse("profile")),
+        "edit_profile": Call("get", reverse("edit_profile")),
+        "capture_detail": Call("get", reverse("capture_detail", args=[ctx.capture])),
+        "team": Call("get", reverse("team"), {"team": 2}),
+        "fight": Call("get", reverse("fight")),
+        "fight_detail": Call("get", reverse("fight_detail", args=[ctx.fight])),
+        "fight_history": Call("get", reverse("fight_history")),
+        "fight_replay": Call(
+            "get", reverse("fight_replay", args=[ctx.result]), {"turn": 5}
+        ),
+        "leaderboard": Call("get", reverse("leaderboard"), {"sort": "species"}),
+        "sprite_file": Call("get", reverse("sprite_file", args=[ctx.sprite])),
+        "pokeapi_cache_stats": Call(
+            "get", reverse("pokeapi_cache_stats"), user="staff"
+        ),
+    }
+
+
+def stub_client():
+    """
+    Client PokeAPI branché sur le stub. Cache en mémoire uniquement : les
+    fausses réponses n'atterrissent jamais dans le cache disque ou Django.
+    """
+    client = PokeAPIClient(cache=TieredCache())
+    install_stub(client)
+    return client
+
+
+def seed(users=2000, captures=500, results=50, batch_size=10_000, rng=None, log=None):
+    """
+    Crée `users` dresseurs avec `captures` captures chacun, leurs 5 équipes
+    pleines et `results` combats terminés, plus le catalogue des espèces
+    (servi par le stub PokeAPI).
+    """
+    rng = rng or random.Random(0)
+    store_records(fetch_records(range(1, SPECIES_COUNT + 1), client=stub_client()))
+
+    password = make_password("benchmark")
+    User.objects.bulk_create(
+        User(username=f"bench{i}", password=password) for i in range(users)
+    )
+    User.objects.create(username="bench-staff", password=password, is_staff=True)
+    user_ids = list(
+        User.objects.filter(username__regex=r"^bench\d+$").values_list("id", flat=True)
+    )
+
+    # Dresseurs traités par lots : captures, équipes puis composition
+    per_batch = max(1, batch_size // max(captures, 1))
+    Roster = Team.pokemons.through
+    for start in range(0, len(user_ids), per_batch):
+        chunk = user_ids[start : start + per_batch]
+        objs = []
+        for user_id in chunk:
+            for _ in range(captures):
+                pokemon_id = rng.randint(1, SPECIES_COUNT)
+                objs.append(
+                    PokemonCapture(
+                        user_id=user_id,
+                        pokemon_id=pokemon_id,
+                        name=f"Pokemon {pokemon_id}",
+                        nickname=f"Pokemon {pokemon_id}",
+                        level=rng.randint(1, 50),
+                    )
+                )
+        objs = PokemonCapture.objects.bulk_create(objs)
+
+        teams = Team.objects.bulk_create(
+            Team(
+                user_id=user_id,
+                name=f"Équipe {position + 1}",
+                position=position,
+                roster_size=5 if captures else 0,
+                is_ready=bool(captures),
+            )
+            for user_id in chunk
+            for position in range(5)
+        )
+        rows = []
+        for i, team in enumerate(teams):
+            own = objs[(i // 5) * captures : (i // 5 + 1) * captures]
+            members = {own[(team.position * 5 + k) % len(own)].pk for k in range(5)}
+            rows += [Roster(team_id=team.pk, pokemoncapture_id=pk) for pk in members]
+        Roster.objects.bulk_create(rows)
+        FightResult.objects.bulk_create(
+            FightResult(
+                user_id=team.user_id,
+                team1=team,
+                team2=teams[rng.randrange(len(teams))],
+                mode="pve",
+                winner=rng.choice(["team1", "team2"]),
+                turns=rng.randint(5, 40),
+                duration=timedelta(seconds=rng.randint(30, 600)),
+            )
+            for team in teams[::5]
+            for _ in range(results)
+        )
+        if log:
+            log(f"{start + len(chunk)}/{len(user_ids)} dresseurs")
+
+    # Données dérivées (écritures groupées : pas de signaux)
+    Team.objects.filter(user_id__in=user_ids).update(roster_size=5, is_ready=True)
+    rebuild_pool()
+    rebuild_leaderboard()
+
+
+def context():
+    """Dresseur de référence et objets utilisés par les appels."""
+    player = User.objects.filter(username__regex=r"^bench\d+$").order_by("id").first()
+    teams = list(Team.objects.filter(user=player))
+
+    def new_capture():
+        return PokemonCapture.objects.create(
+            user=player, pokemon_id=1, name="Bulbizarre"
+        ).pk
+
+    return SimpleNamespace(
+        player=player,
+        staff=User.objects.get(username="bench-staff"),
+        capture=PokemonCapture.objects.filter(user=player).first().pk,
+        fight=Fight.start(player, FightManager(teams[0], teams[1])).pk,
+        result=_fight_result(player, teams).pk,
+        new_capture=new_capture,
+        sprite=_sprite_file(),
+    )
+
+
+def _fight_result(player, teams):
+    """Combat PvE joué jusqu'au bout (attaquer, switcher si KO), à revoir."""
+    manager = FightManager(teams[0], teams[1], seed=0)
+    while not manager.winner:
+        state = manager.team1_state
+        if state[manager.active_p1].fainted:
+            alive = next(i for i, p in enumerate(state) if not p.fainted)
+            manager.execute_turn({"type": "switch", "index": alive})
+        else:
+            manager.execute_turn({"type": "attack"})
+    return FightResult.objects.create(
+        user=player,
+        team1=teams[0],
+        team2=teams[1],
+        mode=manager.mode,
+        winner=manager.winner,
+        turns=manager.turn,
+        duration=timedelta(0),
+        replay=encode_replay(manager),
+    )
+
+
+def _sprite_file():
+    """Variante 128 px d'un artwork factice, écrite dans le miroir (temporaire)."""
+    buffer = io.BytesIO()
+    Image.new("RGBA", (475, 475), (255, 0, 0, 255)).save(buffer, "PNG")
+    return dict(variants(buffer.getvalue(), "artwork"))[128]["webp"]
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def run(runs=30, routes=None, budgets=BUDGETS):
+    """
+    Appelle chaque route `runs` fois. Retourne une ligne par route :
+    requêtes (max), p50 / p95 / p99 en ms et si le budget est respecté.
+    """
+    with (
+        tempfile.TemporaryDirectory() as mirror,
+        override_settings(SPRITE_MIRROR_DIR=mirror),
+        override_client(stub_client()),
+    ):
+        ctx = context()
+        calls = _calls(ctx)
+        clients = {None: Client(), "player": Client(), "staff": Client()}
+        clients["player"].force_login(ctx.player)
+        clients["staff"].force_login(ctx.staff)
+
+        results = []
+        for name in routes or calls:
+            timings, queries = [], 0
+            for _ in range(runs):
+                call = calls[name]() if callable(calls[name]) else calls[name]
+                client = clients[call.user]
+                with CaptureQueriesContext(connection) as captured:
+                    start = time.perf_counter()
+                    response = getattr(client, call.method)(call.url, call.data)
+                    timings.append((time.perf_counter() - start) * 1000)
+                if response.status_code >= 400:
+                    raise AssertionError(f"{name} : HTTP {response.status_code}")
+                queries = max(queries, len(captured))
+
+            budget = budgets[name]
+            p95 = percentile(timings, 95)
+            results.append(
+                {
+                    "name": name,
+                    "queries": queries,
+                    "p50": percentile(timings, 50),
+                    "p95": p95,
+                    "p99": percentile(timings, 99),
+                    "budget": budget,
+                    "ok": queries <= budget.queries and p95 <= budget.p95_ms,
+                }
+            )
+    return results
@@ -0,0 +1,186 @@
+"""
+Catalogue local des espèces (modèles Species / SpeciesStats).
+
+Les pages lisent le catalogue en base. Une espèce absente (catalogue pas encore
+synchronisé) est récupérée une seule fois sur PokeAPI puis enregistrée.
+Les fonctions préfixées par `a` sont les équivalents pour les vues async.
+"""
+
+from asgiref.sync import sync_to_async
+
+from .models import Species, SpeciesStats
+from .pokeapi import get_client
+from .stats import catalog_changed
+
+# Champs mis à jour lors d'une resynchronisation
+SPECIES_FIELDS = [
+    "name",
+    "name_fr",
+    "type1",
+    "type2",
+    "height",
+    "weight",
+    "description_fr",
+    "sprite",
+    "artwork",
+    "synced_at",
+]
+STATS_FIELDS = [name.replace("-", "_") for name in SpeciesStats.STAT_NAMES]
+
+
+def parse_payload(pokemon, species):
+    """
+    Transforme les réponses /pokemon/{id} et /pokemon-species/{id} en un
+    enregistrement compact (le format des dumps JSON de sync_catalog).
+    `species` peut être None si l'API espèce n'a pas répondu.
+    """
+    types = [t["type"]["name"] for t in sorted(pokemon["types"], key=_slot)]
+
+    name_fr = pokemon["name"]
+    description = ""
+    if species:
+        for entry in species["names"]:
+            if entry["language"]["name"] == "fr":
+                name_fr = entry["name"]
+                break
+        for entry in species["flavor_text_entries"]:
+            if entry["language"]["name"] == "fr":
+                description = " ".join(entry["flavor_text"].split())
+                break
+
+    sprites = pokemon["sprites"]
+    return {
+        "id": pokemon["id"],
+        "name": pokemon["name"],
+        "name_fr": name_fr,
+        "types": types,
+        "height": pokemon["height"],
+        "weight": pokemon["weight"],
+        "description_fr": description,
+        "sprite": sprites.get("front_default") or "",
+        "artwork": sprites["other"]["official-artwork"].get("front_default") or "",
+        "stats": {s["stat"]["name"]: s["base_stat"] for s in pokemon["stats"]},
+    }
+
+
+def _slot(type_entry):
+    return type_entry["slot"]
+
+
+def _paths(pokemon_ids):
+    paths = []
+    for pokemon_id in pokemon_ids:
+        paths += [f"pokemon/{pokemon_id}", f"pokemon-species/{pokemon_id}"]
+    return paths
+
+
+def _parse_many(payloads):
+    records = []
+    for pokemon, species in zip(payloads[::2], payloads[1::2]):
+        if pokemon is not None:
+            records.append(parse_payload(pokemon, species))
+    return records
+
+
+def fetch_records(pokemon_ids, client=None):
+    """
+    Récupère plusieurs espèces sur PokeAPI, tous les appels en parallèle.
+    Les espèces introuvables (ou API injoignable) sont omises. `client` :
+    le client partagé par défaut.
+    """
+    client = client or get_client()
+    return _parse_many(client.fetch_many(_paths(pokemon_ids)))
+
+
+async def afetch_records(pokemon_ids, client=None):
+    client = client or get_client()
+    return _parse_many(await client.afetch_many(_paths(pokemon_ids)))
+
+
+def store_records(records):
+    """Insère ou met à jour les espèces en deux requêtes groupées."""
+    species = []
+    stats = []
+    for record in records:
+        types = record["types"]
+        species.append(
+            Species(
+                id=record["id"],
+                name=record["name"],
+                name_fr=record["name_fr"],
+                type1=types[0],
+                type2=types[1] if len(types) > 1 else "",
+                height=record["height"],
+                weight=record["weight"],
+                description_fr=record["description_fr"],
+                sprite=record["sprite"],
+                artwork=record["artwork"],
+            )
+        )
+        stats.append(
+            SpeciesStats(
+                species_id=record["id"],
+                **{
+                    name.replace("-", "_"): record["stats"].get(name, 0)
+                    for name in SpeciesStats.STAT_NAMES
+                },
+            )
+        )
+
+    Species.objects.bulk_create(
+        species,
+        update_conflicts=True,
+        unique_fields=["id"],
+        update_fields=SPECIES_FIELDS,
+    )
+    SpeciesStats.objects.bulk_create(
+        stats,
+        update_conflicts=True,
+        unique_fields=["species"],
+        update_fields=STATS_FIELDS,
+    )
+    catalog_changed()
+    return len(species)
+
+
+def get_species_many(pokemon_ids):
+    """
+    Retourne {id: Species} (stats préchargées) pour les IDs demandés.
+    Les IDs absents du catalogue sont récupérés sur PokeAPI et enregistrés ;
+    ceux introuvables sont simplement omis.
+    """
+    found = Species.objects.select_related("stats").in_bulk(pokemon_ids)
+    missing = [p_id for p_id in pokemon_ids if p_id not in found]
+
+    if missing:
+        records = fetch_records(missing)
+        if records:
+            store_records(records)
+            found.update(
+                Species.objects.select_related("stats").in_bulk(
+                    [r["id"] for r in records]
+                )
+            )
+    return found
+
+
+def get_species(pokemon_id):
+    return get_species_many([pokemon_id]).get(pokemon_id)
+
+
+async def aget_species_many(pokemon_ids):
+    """Version async de get_species_many() (ORM async, appels API concurrents)."""
+    queryset = Species.objects.select_related("stats")
+    found = await queryset.ain_bulk(pokemon_ids)
+    missing = [p_id for p_id in pokemon_ids if p_id not in found]
+
+    if missing:
+        records = await afetch_records(missing)
+        if records:
+            await sync_to_async(store_records)(records)
+            found.update(await queryset.ain_bulk([r["id"] for r in records]))
+    return found
+
+
+async def aget_species(pokemon_id):
+    return (await aget_species_many([pokemon_id])).get(pokemon_id)
@@ -0,0 +1,124 @@
+"""
+Pokédex du dresseur : un bit par espèce possédée.
+
+Le bitmap (TrainerStats.pokedex, 19 octets pour 151 espèces) change quand
+une espèce entre ou sort de la collection (leaderboard.capture_added /
+capture_removed) et il est gardé dans le cache Django. Le badge « capturé »
+d'une carte est un test de bit, la complétion du profil un popcount : aucune
+requête sur PokemonCapture, quel que soit le nombre de captures. Le cache a
+une durée de vie courte (CACHE_TIMEOUT) : avec plusieurs workers, chacun
+relit TrainerStats.pokedex après ce délai.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import TrainerStats
+from .utils import FRENCH_TO_ENGLISH
+
+POKEDEX_SIZE = len(FRENCH_TO_ENGLISH)
+
+# Bits 1 à POKEDEX_SIZE (le bit 0 ne sert pas : les numéros commencent à 1)
+_POKEDEX_MASK = (1 << (POKEDEX_SIZE + 1)) - 2
+
+# Durée de vie du bitmap en cache (s)
+CACHE_TIMEOUT = 60
+
+
+def _cache_key(user_id):
+    return f"pokedex:owned:{user_id}"
+
+
+def in_pokedex(pokemon_id):
+    return 1 <= pokemon_id <= POKEDEX_SIZE
+
+
+def has_species(bitmap, pokemon_id):
+    """Bit de l'espèce ; toujours faux hors du Pokédex (1 à POKEDEX_SIZE)."""
+    if not in_pokedex(pokemon_id):
+        return False
+    byte = pokemon_id >> 3
+    return byte < len(bitmap) and bool(bitmap[byte] >> (pokemon_id & 7) & 1)
+
+
+def with_species(bitmap, pokemon_id, owned=True):
+    """
+    Copie de `bitmap` avec le bit de l'espèce mis (ou retiré). ValueError
+    hors du Pokédex : un numéro posté ne fait jamais grossir le bitmap.
+    """
+    if not in_pokedex(pokemon_id):
+        raise ValueError(f"Espèce hors du Pokédex : {pokemon_id}")
+    data = bytearray(bitmap)
+    byte = pokemon_id >> 3
+    if byte >= len(data):
+        data.extend(bytes(byte + 1 - len(data)))
+    if owned:
+        data[byte] |= 1 << (pokemon_id & 7)
+    else:
+        data[byte] &= ~(1 << (pokemon_id & 7)) & 0xFF
+    return bytes(data).rstrip(b"\0")
+
+
+def from_species(pokemon_ids):
+    value = 0
+    for pokemon_id in pokemon_ids:
+        if in_pokedex(pokemon_id):
+            value |= 1 << pokemon_id
+    return value.to_bytes((value.bit_length() + 7) // 8, "little")
+
+
+def completion(bitmap):
+    """(espèces du Pokédex possédées, pourcentage de complétion)."""
+    owned = (int.from_bytes(bitmap, "little") & _POKEDEX_MASK).bit_count()
+    return owned, round(owned * 100 / POKEDEX_SIZE)
+
+
+def owned_species(user):
+    """Bitmap du dresseur : depuis le cache, sinon une requête. Vide si anonyme."""
+    if not user.is_authenticated:
+        return b""
+    bitmap = cache.get(_cache_key(user.pk))
+    if bitmap is None:
+        row = TrainerStats.objects.filter(user=user).values_list("pokedex", flat=True)
+        bitmap = bytes(row.first() or b"")
+        cache.set(_cache_key(user.pk), bitmap, timeout=CACHE_TIMEOUT)
+    return bitmap
+
+
+async def aowned_species(user):
+    if not user.is_authenticated:
+        return b""
+    bitmap = await cache.aget(_cache_key(user.pk))
+    if bitmap is None:
+        row = TrainerStats.objects.filter(user=user).values_list("pokedex", flat=True)
+        bitmap = bytes(await row.afirst() or b"")
+        await cache.aset(_cache_key(user.pk), bitmap, timeout=CACHE_TIMEOUT)
+    return bitmap
+
+
+def mark_species(user_id, pokemon_id, owned=True):
+    """
+    Met à jour le bit de l'espèce (ligne verrouillée le temps de l'écriture).
+    Le cache est vidé tout de suite et rempli au commit : une transaction
+    annulée n'y laisse jamais de bit. Une espèce hors du Pokédex est ignorée.
+    """
+    # pokemon_id arrive parfois tel que posté (chaîne)
+    pokemon_id = int(pokemon_id)
+    if not in_pokedex(pokemon_id):
+        return
+    with transaction.atomic():
+        stats = TrainerStats.objects.select_for_update().filter(user_id=user_id)
+        bitmap = stats.values_list("pokedex", flat=True).first()
+        if bitmap is None:
+            return
+        bitmap = with_species(bytes(bitmap), pokemon_id, owned)
+        stats.update(pokedex=bitmap)
+
+    key = _cache_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.set(key, bitmap, timeout=CACHE_TIMEOUT))
+
+
+def forget(user_ids):
+    """Vide le cache des dresseurs donnés (après un recalcul des bitmaps)."""
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
@@ -0,0 +1,237 @@
+"""
+PokeAPI factice, pour les benchmarks et les tests de charge hors ligne.
+
+Les réponses /pokemon/{id}/ et /pokemon-species/{id}/ des 151 premières
+espèces sont générées (noms réels de utils.py, types et stats déterministes)
+dans le même format que l'API. `StubAdapter` les sert directement à la
+session `requests` du client, sans aucun appel réseau.
+
+`FakePokeAPIServer` sert les mêmes réponses en HTTP (manage.py fake_pokeapi)
+pour les tests de charge : JSON enregistré dans un dossier de fixtures
+(complété depuis la vraie API en mode enregistrement), latence et erreurs
+injectées à la demande. Le site y est branché avec POKEAPI_BASE_URL.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+from .utils import FRENCH_TO_ENGLISH, TYPE_TRANSLATIONS
+
+SPECIES_COUNT = len(FRENCH_TO_ENGLISH)
+
+_PATH = re.compile(r"/(pokemon|pokemon-species)/(\d+)/?$")
+_NAMES = list(FRENCH_TO_ENGLISH.items())
+_TYPES = list(TYPE_TRANSLATIONS)
+_STATS = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+_SPRITES = "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon"
+_ARTWORK = f"{_SPRITES}/other/official-artwork"
+
+
+def pokemon_payload(pokemon_id):
+    name = _NAMES[pokemon_id - 1][1]
+    return {
+        "id": pokemon_id,
+        "name": name,
+        "types": [{"slot": 1, "type": {"name": _TYPES[pokemon_id % len(_TYPES)]}}],
+        "height": 3 + pokemon_id % 20,
+        "weight": 40 + pokemon_id * 7 % 900,
+        "sprites": {
+            "front_default": f"{_SPRITES}/{pokemon_id}.png",
+            "other": {
+                "official-artwork": {"front_default": f"{_ARTWORK}/{pokemon_id}.png"}
+            },
+        },
+        "stats": [
+            {"stat": {"name": stat}, "base_stat": 30 + (pokemon_id * (i + 3)) % 100}
+            for i, stat in enumerate(_STATS)
+        ],
+    }
+
+
+def species_payload(pokemon_id):
+    name_fr = _NAMES[pokemon_id - 1][0].capitalize()
+    return {
+        "id": pokemon_id,
+        "names": [{"language": {"name": "fr"}, "name": name_fr}],
+        "flavor_text_entries": [
+            {
+                "language": {"name": "fr"},
+                "flavor_text": f"{name_fr}, Pokémon n°{pokemon_id}.",
+            }
+        ],
+    }
+
+
+def payload_for(path):
+    """JSON de la ressource demandée ('.../pokemon/25/'), ou None (404)."""
+    match = _PATH.search(path)
+    if match is None:
+        return None
+    endpoint, pokemon_id = match.group(1), int(match.group(2))
+    if not 1 <= pokemon_id <= SPECIES_COUNT:
+        return None
+    if endpoint == "pokemon":
+        return pokemon_payload(pokemon_id)
+    return species_payload(pokemon_id)
+
+
+class StubAdapter(requests.adapters.BaseAdapter):
+    """Transport `requests` qui répond avec payload_for(), sans réseau."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        data = payload_for(requests.utils.urlparse(request.url).path)
+
+        response = requests.Response()
+        response.status_code = 200 if data is not None else 404
+        response.url = request.url
+        response.headers["Content-Type"] = "application/json"
+        response._content = json.dumps(data).encode()
+        return response
+
+    def close(self):
+        pass
+
+
+def install_stub(client):
+    """Branche StubAdapter sur la session du client PokeAPI."""
+    adapter = StubAdapter()
+    client.session.mount("https://", adapter)
+    client.session.mount("http://", adapter)
+    return adapter
+
+
+class FakePokeAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, comme la vraie API
+
+    def do_GET(self):
+        server = self.server
+        server.wait()
+        if server.should_fail():
+            self.reply(server.error_status, {"detail": "erreur injectée"})
+            return
+
+        data = server.payload(self.path)
+        if data is None:
+            self.reply(404, {"detail": "Not found."})
+            return
+
+        body = json.dumps(data).encode()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.reply(304, etag=etag)
+        else:
+            self.reply(200, body=body, etag=etag)
+
+    def reply(self, status, data=None, body=None, etag=None):
+        if body is None:
+            body = json.dumps(data).encode() if data is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "public, max-age=86400")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class FakePokeAPIServer(ThreadingHTTPServer):
+    """
+    Faux PokeAPI HTTP. Chaque réponse vient, dans l'ordre :
+    - du dossier `fixtures` (<endpoint>/<id>.json) s'il contient la ressource ;
+    - de `upstream` (la vraie API) si donné, et la réponse y est enregistrée ;
+    - sinon des réponses générées par payload_for().
+    `latency` / `jitter` (secondes) retardent chaque réponse, `error_rate` est
+    la part des requêtes qui reçoivent `error_status` au lieu du JSON.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address=("127.0.0.1", 0),
+        fixtures=None,
+        upstream=None,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        error_status=503,
+        seed=None,
+        verbose=False,
+    ):
+        super().__init__(address, FakePokeAPIHandler)
+        self.fixtures = Path(fixtures) if fixtures else None
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.verbose = verbose
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/v2"
+
+    def wait(self):
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def should_fail(self):
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+            self.errors += failed
+        return failed
+
+    def payload(self, path):
+        match = _PATH.search(path.split("?")[0])
+        if match is None:
+            return None
+        fixture = None
+        if self.fixtures:
+            fixture = self.fixtures / match.group(1) / f"{match.group(2)}.json"
+            if fixture.exists():
+                return json.loads(fixture.read_text(encoding="utf-8"))
+
+        if self.upstream:
+            response = requests.get(
+                f"{self.upstream}/{match.group(1)}/{match.group(2)}/", timeout=10
+            )
+            if response.status_code != 200:
+                return None
+            data = response.json()
+            if fixture:
+                fixture.parent.mkdir(parents=True, exist_ok=True)
+                fixture.write_text(json.dumps(data), encoding="utf-8")
+            return data
+        return payload_for(path)
+
+    def start(self):
+        """Sert dans un thread d'arrière-plan (tests) ; shutdown() l'arrête."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
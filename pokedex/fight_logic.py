@@ -1,68 +1,253 @@
 import random
+import struct
+from collections import deque, namedtuple
 
-# Table simplifiée des types (Attaquant -> Défenseur : Multiplicateur)
-TYPE_CHART = {
-    "fire": {"grass": 2.0, "water": 0.5, "bug": 2.0, "ice": 2.0, "steel": 2.0},
-    "water": {"fire": 2.0, "ground": 2.0, "rock": 2.0},
-    "grass": {"water": 2.0, "ground": 2.0, "rock": 2.0, "flying": 0.5, "fire": 0.5},
-    "electric": {"water": 2.0, "flying": 2.0, "ground": 0.0},
-    # ... on peut étendre plus tard
-}
+from .stats import max_hp
+from .type_chart import DUAL, species_types
+
+# Format binaire du combat sauvegardé (à incrémenter si le format change)
+STATE_VERSION = 4
+# Taille du journal (anneau) : les plus anciens événements sont oubliés
+LOG_SIZE = 64
+
+# Types d'événements du journal. Le texte est produit au rendu du template
+# (templatetags/fight_tags.py), le moteur ne manipule que des entiers.
+TURN, SWITCH, SWITCH_FAILED, DAMAGE, KO, NO_POKEMON, VICTORY = range(7)
+
+# side : 1 ou 2 (équipe concernée), index / target : positions dans les
+# équipes, value : tour, dégâts ou index demandé
+Event = namedtuple("Event", "kind side index target value", defaults=(0, 0, 0, 0))
+
+MODES = ("pve", "pvp")
+
+# Actions jouées, un octet chacune : 0 attaque, 1 + i switch vers l'index i.
+# Un index de switch hors bornes devient INVALID_SWITCH (rejoué comme -1),
+# NO_ACTION est l'action absente de J2 (IA en PvE).
+ATTACK = 0
+INVALID_SWITCH = 254
+NO_ACTION = 255
+_ACTIONS = (
+    [{"type": "attack"}]
+    + [{"type": "switch", "index": i} for i in range(INVALID_SWITCH - 1)]
+    + [{"type": "switch", "index": -1}, None]
+)
+
+# version, mode, graine
+_HEADER = struct.Struct("!BBI")
+# id capture, id API, niveau, HP max, type d'attaque, paire de types en
+# défense (indices de type_chart)
+_COMBATANT = struct.Struct("!IHHHBB")
+_LENGTH = struct.Struct("!H")
+
+
+def encode_action(action):
+    """Octet d'une action de la vue ({'type': 'switch', 'index': 1}...)."""
+    if not action:
+        return NO_ACTION
+    if action["type"] != "switch":
+        return ATTACK
+    index = int(action["index"])
+    return index + 1 if 0 <= index < INVALID_SWITCH - 1 else INVALID_SWITCH
+
+
+class Combatant:
+    """
+    Un Pokémon en combat. `__slots__` : pas de dict par instance.
+    L'accès par clé (p["current_hp"]) reste possible pour le code existant.
+    """
+
+    __slots__ = (
+        "id",
+        "pokemon_id",
+        "name",
+        "nickname",
+        "level",
+        "max_hp",
+        "current_hp",
+        "fainted",
+        "attack_type",
+        "defense_pair",
+    )
+
+    def __init__(
+        self,
+        id,
+        pokemon_id,
+        name,
+        nickname,
+        level,
+        max_hp,
+        current_hp,
+        fainted,
+        attack_type=0,
+        defense_pair=0,
+    ):
+        self.id = id
+        self.pokemon_id = pokemon_id
+        self.name = name
+        self.nickname = nickname
+        self.level = level
+        self.max_hp = max_hp
+        self.current_hp = current_hp
+        self.fainted = fainted
+        self.attack_type = attack_type
+        self.defense_pair = defense_pair
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+
+def _pack_text(text):
+    data = text.encode()
+    return _LENGTH.pack(len(data)) + data
+
+
+def _unpack_text(blob, offset):
+    (length,) = _LENGTH.unpack_from(blob, offset)
+    offset += _LENGTH.size
+    return blob[offset : offset + length].decode(), offset + length
+
+
+def encode_replay(manager):
+    """
+    Sérialise un combat (Fight.state, FightResult.replay) : graine, équipes
+    de départ et actions jouées. Tout le reste (PV, KO, journal) se retrouve
+    en rejouant les actions (replay()) : un tour ajoute 1 octet en PvE, 2 en
+    PvP.
+    """
+    parts = [_HEADER.pack(STATE_VERSION, MODES.index(manager.mode), manager.seed)]
+    for name, trainer, pokemons in manager.rosters():
+        parts += [_pack_text(name), _pack_text(trainer), bytes([len(pokemons)])]
+        for p in pokemons:
+            parts.append(
+                _COMBATANT.pack(
+                    p.id, p.pokemon_id, p.level, p.max_hp, p.attack_type, p.defense_pair
+                )
+            )
+            parts += [_pack_text(p.name), _pack_text(p.nickname)]
+    parts.append(manager.actions)
+    return b"".join(parts)
+
+
+def decode_replay(blob):
+    """
+    Inverse de encode_replay() : {"mode", "seed", "rosters", "actions"}.
+    Retourne None si la valeur est illisible ou d'une autre version.
+    """
+    try:
+        blob = bytes(blob)
+        version, mode, seed = _HEADER.unpack_from(blob)
+        if version != STATE_VERSION:
+            return None
+
+        offset = _HEADER.size
+        rosters = []
+        for _ in range(2):
+            team_name, offset = _unpack_text(blob, offset)
+            trainer, offset = _unpack_text(blob, offset)
+            count = blob[offset]
+            offset += 1
+            pokemons = []
+            for _ in range(count):
+                p_id, pokemon_id, level, hp, *types = _COMBATANT.unpack_from(
+                    blob, offset
+                )
+                offset += _COMBATANT.size
+                name, offset = _unpack_text(blob, offset)
+                nickname, offset = _unpack_text(blob, offset)
+                pokemons.append(
+                    Combatant(
+                        p_id, pokemon_id, name, nickname, level, hp, hp, False, *types
+                    )
+                )
+            rosters.append((team_name, trainer, pokemons))
+
+        actions = blob[offset:]
+        if len(actions) % (2 if MODES[mode] == "pvp" else 1):
+            return None
+        return {
+            "mode": MODES[mode],
+            "seed": seed,
+            "rosters": rosters,
+            "actions": actions,
+        }
+    except (TypeError, ValueError, IndexError, struct.error):
+        return None
+
+
+def replay(blob, team1=None, team2=None, turns=None):
+    """
+    FightManager d'un combat sauvegardé, rejoué depuis le début jusqu'au
+    tour `turns` (jusqu'au bout par défaut). None si le blob est illisible.
+    """
+    record = decode_replay(blob)
+    if record is None:
+        return None
+    manager = FightManager(
+        team1, team2, record["mode"], seed=record["seed"], rosters=record["rosters"]
+    )
+    manager.fast_forward(record["actions"], turns)
+    return manager
 
 
 class FightManager:
-    def __init__(self, team1, team2, session_state=None, mode="pve"):
+    """
+    Combat entre deux équipes. Le hasard (dégâts) vient d'un générateur
+    propre au combat, initialisé par `seed` : la graine, les équipes de
+    départ et les actions jouées (self.actions) suffisent à rejouer tout le
+    combat à l'identique (replay(), fast_forward()).
+    """
+
+    def __init__(self, team1, team2, mode="pve", seed=None, rosters=None):
         self.team1 = team1
         self.team2 = team2
         self.mode = mode
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.actions = bytearray()
 
-        if session_state:
-            self.turn = session_state["turn"]
-            self.log = session_state["log"]
-            self.winner = session_state["winner"]
-            self.team1_state = session_state["team1"]["pokemons"]
-            self.team2_state = session_state["team2"]["pokemons"]
-            self.active_p1 = session_state["team1"]["active_index"]
-            self.active_p2 = session_state["team2"]["active_index"]
-            self.mode = session_state.get("mode", "pve")
-        else:
-            self.turn = 0
-            self.log = []
-            self.winner = None
-            self.team1_state = self._init_team_state(team1)
-            self.team2_state = self._init_team_state(team2)
-            self.active_p1 = 0
-            self.active_p2 = 0
+        self.turn = 0
+        self.log = deque(maxlen=LOG_SIZE)
+        self.winner = None
+        self.active_p1 = 0
+        self.active_p2 = 0
+        # rosters : [(nom, dresseur, Pokémon)] de chaque équipe, lus sinon en base
+        if rosters is None:
+            rosters = [
+                (team.name, team.user.username, self._init_team_state(team))
+                for team in (team1, team2)
+            ]
+        roster1, roster2 = rosters
+        self.name1, self.trainer1, self.team1_state = roster1
+        self.name2, self.trainer2, self.team2_state = roster2
 
     def _init_team_state(self, team):
-        state = []
-        for p in team.pokemons.all():
-            # Calcul simple des HP max: voir models.py ou formule standard
-            # Ici on reprend la formule de capture_detail pour la cohérence
-            max_hp = int((p.pokemon_id * 0.1 + p.level) * 3 + 10)  # Formule arbitraire
-            # On devrait idéalement appeler l'API pour les stats de base,
-            # mais pour l'instant on simule
-            # Pour faire mieux, il faudrait stocker les stats de base
-            # dans le modèle PokemonCapture
-
-            # SIMPLIFICATION: On met 100 HP par défaut + niveau
-            max_hp = 100 + (p.level * 5)
-
-            state.append(
-                {
-                    "id": p.id,
-                    "pokemon_id": p.pokemon_id,  # ID de l'API pour les sprites
-                    "name": p.name,
-                    "nickname": p.nickname if p.nickname else p.name,
-                    "level": p.level,
-                    "max_hp": max_hp,
-                    "current_hp": max_hp,
-                    "fainted": False,
-                    # Pour l'instant on fera sans type effectiveness complexe
-                    # si pas d'API call
-                }
+        pokemons = list(team.pokemons.all())
+        species = [p.pokemon_id for p in pokemons]
+        # PV max : stats réelles de chaque espèce à son niveau (stats.py) ;
+        # types résolus une fois ici, les dégâts n'ont qu'un accès à DUAL
+        max_hps = max_hp(species, [p.level for p in pokemons])
+        attack_types, defense_pairs = species_types(species)
+        return [
+            Combatant(
+                id=p.id,
+                pokemon_id=p.pokemon_id,  # ID de l'API pour les sprites
+                name=p.name,
+                nickname=p.nickname if p.nickname else p.name,
+                level=p.level,
+                max_hp=int(hp),
+                current_hp=int(hp),
+                fainted=False,
+                attack_type=int(attack_type),
+                defense_pair=int(defense_pair),
+            )
+            for p, hp, attack_type, defense_pair in zip(
+                pokemons, max_hps, attack_types, defense_pairs
             )
-        return state
+        ]
 
     def get_state(self):
         """Retourne l'état actuel du combat pour la vue/template"""
@@ -72,59 +257,77 @@ class FightManager:
             "winner": self.winner,
             "mode": self.mode,
             "team1": {
-                "name": self.team1.name,
+                "name": self.name1,
+                "trainer": self.trainer1,
                 "active_index": self.active_p1,
                 "pokemons": self.team1_state,
             },
             "team2": {
-                "name": self.team2.name,
+                "name": self.name2,
+                "trainer": self.trainer2,
                 "active_index": self.active_p2,
                 "pokemons": self.team2_state,
             },
         }
 
+    def rosters(self):
+        """Équipes de départ : [(nom, dresseur, Pokémon)] (voir encode_replay)."""
+        return [
+            (self.name1, self.trainer1, self.team1_state),
+            (self.name2, self.trainer2, self.team2_state),
+        ]
+
+    def fast_forward(self, actions, turns=None):
+        """Rejoue des octets d'actions (self.actions), `turns` tours au plus."""
+        width = 2 if self.mode == "pvp" else 1
+        end = len(actions) if turns is None else min(len(actions), turns * width)
+        for i in range(0, end, width):
+            self.play(actions[i], actions[i + 1] if width == 2 else NO_ACTION)
+
     def execute_turn(self, action_p1, action_p2=None):
         """
         Exécute un tour de combat.
         action_p1: {'type': 'attack'} ou {'type': 'switch', 'index': 1}
         action_p2: IA simple par défaut (attaque toujours)
         """
+        self.play(encode_action(action_p1), encode_action(action_p2))
+
+    def play(self, code_p1, code_p2=NO_ACTION):
+        """Tour à partir des octets d'action (voir encode_action)."""
         if self.winner:
             return
+        self.actions.append(code_p1)
+        if self.mode == "pvp":
+            self.actions.append(code_p2)
+        action_p1, action_p2 = _ACTIONS[code_p1], _ACTIONS[code_p2]
 
         self.turn += 1
-        self.log.append(f"--- Tour {self.turn} ---")
+        self.log.append(Event(TURN, value=self.turn))
 
         # 1. Gestion des Switchs (priorité haute)
         if action_p1["type"] == "switch":
             idx = int(action_p1["index"])
-            if (
-                0 <= idx < len(self.team1_state)
-                and not self.team1_state[idx]["fainted"]
-            ):
+            if 0 <= idx < len(self.team1_state) and not self.team1_state[idx].fainted:
                 self.active_p1 = idx
-                self.log.append(
-                    f"{self.team1.user.username} envoie "
-                    f"{self.team1_state[idx]['nickname']} !"
-                )
+                self.log.append(Event(SWITCH, 1, idx))
             else:
-                self.log.append(f"Switch impossible vers {idx}.")
+                self.log.append(Event(SWITCH_FAILED, 1, value=idx))
 
         if self.mode == "pve":
             # IA: Switch si KO, sinon Attaque
             p2_poke = self.team2_state[self.active_p2]
-            if p2_poke["fainted"]:
+            if p2_poke.fainted:
                 # Trouver un vivant
                 found = False
                 for i, p in enumerate(self.team2_state):
-                    if not p["fainted"]:
+                    if not p.fainted:
                         self.active_p2 = i
-                        self.log.append(f"L'adversaire envoie {p['nickname']} !")
+                        self.log.append(Event(SWITCH, 2, i))
                         found = True
                         break
                 if not found:
                     self.winner = "team1"
-                    self.log.append("L'adversaire n'a plus de Pokémon !")
+                    self.log.append(Event(NO_POKEMON, 2))
                     return
         elif self.mode == "pvp" and action_p2:
             # Joueur 2
@@ -132,15 +335,12 @@ class FightManager:
                 idx = int(action_p2["index"])
                 if (
                     0 <= idx < len(self.team2_state)
-                    and not self.team2_state[idx]["fainted"]
+                    and not self.team2_state[idx].fainted
                 ):
                     self.active_p2 = idx
-                    self.log.append(
-                        f"{self.team2.user.username} envoie "
-                        f"{self.team2_state[idx]['nickname']} !"
-                    )
+                    self.log.append(Event(SWITCH, 2, idx))
                 else:
-                    self.log.append(f"Switch inv. P2 vers {idx}.")
+                    self.log.append(Event(SWITCH_FAILED, 2, value=idx))
 
         # 2. Combat (si pas de switch P1 et P1 vivant)
         p1_poke = self.team1_state[self.active_p1]
@@ -148,23 +348,21 @@ class FightManager:
 
         if (
             action_p1["type"] == "attack"
-            and not p1_poke["fainted"]
-            and not p2_poke["fainted"]
+            and not p1_poke.fainted
+            and not p2_poke.fainted
         ):
             # Dégâts P1 -> P2
             dmg = self._calculate_damage(p1_poke, p2_poke)
-            p2_poke["current_hp"] = max(0, p2_poke["current_hp"] - dmg)
-            self.log.append(
-                f"{p1_poke['nickname']} attaque ! {dmg} dégâts à {p2_poke['nickname']}."
-            )
+            p2_poke.current_hp = max(0, p2_poke.current_hp - dmg)
+            self.log.append(Event(DAMAGE, 1, self.active_p1, self.active_p2, dmg))
 
-            if p2_poke["current_hp"] == 0:
-                p2_poke["fainted"] = True
-                self.log.append(f"{p2_poke['nickname']} est KO !")
+            if p2_poke.current_hp == 0:
+                p2_poke.fainted = True
+                self.log.append(Event(KO, 2, self.active_p2))
                 # Check victoire immédiate P1
-                if all(p["fainted"] for p in self.team2_state):
+                if all(p.fainted for p in self.team2_state):
                     self.winner = "team1"
-                    self.log.append(f"{self.team1.name} remporte la victoire !")
+                    self.log.append(Event(VICTORY, 1))
                     return
 
         if (
@@ -172,27 +370,27 @@ class FightManager:
                 self.mode == "pve"
                 or (self.mode == "pvp" and action_p2 and action_p2["type"] == "attack")
             )
-            and not p2_poke["fainted"]
-            and not p1_poke["fainted"]
+            and not p2_poke.fainted
+            and not p1_poke.fainted
         ):
             dmg = self._calculate_damage(p2_poke, p1_poke)
-            p1_poke["current_hp"] = max(0, p1_poke["current_hp"] - dmg)
-            self.log.append(
-                f"{p2_poke['nickname']} attaque ! {dmg} dégâts à {p1_poke['nickname']}."
-            )
+            p1_poke.current_hp = max(0, p1_poke.current_hp - dmg)
+            self.log.append(Event(DAMAGE, 2, self.active_p2, self.active_p1, dmg))
 
-            if p1_poke["current_hp"] == 0:
-                p1_poke["fainted"] = True
-                self.log.append(f"{p1_poke['nickname']} est KO !")
+            if p1_poke.current_hp == 0:
+                p1_poke.fainted = True
+                self.log.append(Event(KO, 1, self.active_p1))
 
                 # Check victoire P2
-                if all(p["fainted"] for p in self.team1_state):
+                if all(p.fainted for p in self.team1_state):
                     self.winner = "team2"
-                    self.log.append(f"{self.team2.name} remporte la victoire !")
+                    self.log.append(Event(VICTORY, 2))
 
     def _calculate_damage(self, attacker, defender):
-        # Formule très simplifiée
-        # Dégâts = (Niveau * 2) + random(-5, 5)
-        base = attacker["level"] * 2
-        variation = random.randint(-5, 5)
-        return max(1, base + variation)
+        # Dégâts = ((Niveau * 2) + random(-5, 5)) * efficacité du type
+        # principal de l'attaquant contre les types du défenseur. Au moins 1 :
+        # deux Pokémon immunisés l'un contre l'autre finissent le combat
+        base = attacker.level * 2
+        variation = self.rng.randint(-5, 5)
+        multiplier = DUAL[attacker.attack_type, defender.defense_pair]
+        return max(1, int((base + variation) * multiplier))
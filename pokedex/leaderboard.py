@@ -0,0 +1,191 @@
+"""
+Classement des dresseurs, tenu à jour au fil de l'eau.
+
+TrainerStats porte les compteurs de chaque dresseur (victoires, taux de
+victoire, meilleur niveau, captures, espèces différentes) et SpeciesCaught le nombre
+de captures par espèce. Une capture, un relâchement (signals.py) ou un
+combat terminé (FightResult.record) ne touchent que les lignes du dresseur
+concerné, jamais d'agrégat sur toutes les captures.
+
+`page()` lit un tri du classement sur son index, par clé : coût en
+O(taille de page), quelle que soit la position. `rebuild()` recalcule tout
+depuis les captures et les combats (manage.py rebuild_leaderboard), y
+compris le Pokédex de chaque dresseur (collection.py).
+"""
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from .collection import forget, from_species, mark_species
+from .models import FightResult, PokemonCapture, SpeciesCaught, TrainerStats
+
+# Tris proposés : paramètre ?sort= -> colonne de TrainerStats
+SORTS = {
+    "wins": "wins",
+    "win_rate": "win_rate",
+    "level": "best_level",
+    "species": "species_count",
+}
+SORT_LABELS = [
+    ("wins", "Victoires"),
+    ("win_rate", "Taux de victoire"),
+    ("level", "Meilleur niveau"),
+    ("species", "Espèces capturées"),
+]
+PAGE_SIZE = 50
+
+
+def capture_added(capture):
+    species = SpeciesCaught.objects.filter(
+        user_id=capture.user_id, pokemon_id=capture.pokemon_id
+    )
+    new_species = 0
+    if not species.update(count=F("count") + 1):
+        _, created = SpeciesCaught.objects.get_or_create(
+            user_id=capture.user_id, pokemon_id=capture.pokemon_id
+        )
+        species.update(count=F("count") + 1)
+        new_species = int(created)
+
+    TrainerStats.bump(
+        capture.user_id,
+        captures=F("captures") + 1,
+        species_count=F("species_count") + new_species,
+        best_level=Greatest("best_level", Value(capture.level)),
+    )
+    if new_species:
+        mark_species(capture.user_id, capture.pokemon_id)
+
+
+def capture_leveled(capture):
+    TrainerStats.bump(
+        capture.user_id, best_level=Greatest("best_level", Value(capture.level))
+    )
+
+
+def capture_removed(capture):
+    # Pas de création ici : le dresseur est peut-être en cours de suppression
+    species = SpeciesCaught.objects.filter(
+        user_id=capture.user_id, pokemon_id=capture.pokemon_id
+    )
+    if not species.filter(count__gt=1).update(count=F("count") - 1):
+        if species.delete()[0]:
+            TrainerStats.objects.filter(user_id=capture.user_id).update(
+                species_count=F("species_count") - 1
+            )
+            mark_species(capture.user_id, capture.pokemon_id, owned=False)
+    TrainerStats.refresh_best_level([capture.user_id], captures=F("captures") - 1)
+
+
+def parse_cursor(text):
+    """'valeur:user_id:rang' -> (valeur, user_id, rang), ou None si invalide."""
+    try:
+        value, user_id, rank = text.split(":")
+        return float(value), int(user_id), int(rank)
+    except (AttributeError, ValueError):
+        return None
+
+
+def page(sort="wins", cursor=None, size=PAGE_SIZE):
+    """
+    Une page du classement : [(rang, TrainerStats)], et le curseur de la page
+    suivante (None à la fin). Le curseur porte la dernière ligne lue et son
+    rang : la page suivante reprend juste après sur l'index.
+    """
+    field = SORTS[sort]
+    rows = TrainerStats.objects.select_related("user").order_by(f"-{field}", "user")
+    rank = 0
+    if cursor is not None:
+        value, user_id, rank = cursor
+        rows = rows.filter(
+            Q(**{f"{field}__lt": value}) | Q(**{field: value, "user__gt": user_id})
+        )
+    rows = list(rows[: size + 1])
+
+    ranked = [(rank + i + 1, row) for i, row in enumerate(rows[:size])]
+    next_cursor = None
+    if len(rows) > size:
+        last_rank, last = ranked[-1]
+        next_cursor = f"{getattr(last, field)}:{last.user_id}:{last_rank}"
+    return ranked, next_cursor
+
+
+def _per_user(queryset, aggregate):
+    """Sous-requête : valeur de `aggregate` pour le dresseur de la ligne."""
+    values = (
+        queryset.filter(user=OuterRef("user"))
+        .order_by()
+        .values("user")
+        .annotate(value=aggregate)
+        .values("value")
+    )
+    return Coalesce(Subquery(values), 0)
+
+
+def _rebuild_pokedex(batch_size):
+    """Bitmaps du Pokédex depuis SpeciesCaught, dresseur par dresseur."""
+    rows = SpeciesCaught.objects.order_by("user", "pokemon_id").values_list(
+        "user", "pokemon_id"
+    )
+    species = {}
+    for user_id, pokemon_id in rows.iterator(chunk_size=batch_size):
+        species.setdefault(user_id, []).append(pokemon_id)
+
+    TrainerStats.objects.update(pokedex=b"")
+    TrainerStats.objects.bulk_update(
+        [
+            TrainerStats(user_id=user_id, pokedex=from_species(ids))
+            for user_id, ids in species.items()
+        ],
+        ["pokedex"],
+        batch_size=batch_size,
+    )
+    # Cache vidé maintenant et au commit (lectures pendant le recalcul)
+    user_ids = list(TrainerStats.objects.values_list("user", flat=True))
+    forget(user_ids)
+    transaction.on_commit(lambda: forget(user_ids))
+
+
+@transaction.atomic
+def rebuild(batch_size=5000):
+    """
+    Recalcule TrainerStats et SpeciesCaught depuis les captures et les
+    combats (après une dérive). Retourne le nombre de dresseurs classés.
+    """
+    TrainerStats.objects.bulk_create(
+        (TrainerStats(user_id=pk) for pk in User.objects.values_list("pk", flat=True)),
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+
+    SpeciesCaught.objects.all().delete()
+    SpeciesCaught.objects.bulk_create(
+        (
+            SpeciesCaught(
+                user_id=row["user"], pokemon_id=row["pokemon_id"], count=row["n"]
+            )
+            for row in PokemonCapture.objects.values("user", "pokemon_id")
+            .annotate(n=Count("id"))
+            .order_by()
+        ),
+        batch_size=batch_size,
+    )
+
+    wins = FightResult.objects.filter(winner="team1")
+    TrainerStats.objects.update(
+        fights=_per_user(FightResult.objects, Count("id")),
+        wins=_per_user(wins, Count("id")),
+        losses=_per_user(FightResult.objects.exclude(winner="team1"), Count("id")),
+        captures=_per_user(PokemonCapture.objects, Count("id")),
+        species_count=_per_user(SpeciesCaught.objects, Count("id")),
+    )
+    TrainerStats.objects.update(
+        win_rate=Case(
+            When(fights=0, then=Value(0.0)), default=F("wins") * 1.0 / F("fights")
+        )
+    )
+    TrainerStats.refresh_best_level(User.objects.values("pk"))
+    _rebuild_pokedex(batch_size)
+    return TrainerStats.objects.count()
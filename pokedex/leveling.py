@@ -0,0 +1,60 @@
+"""
+Courbe d'expérience : passer du niveau L au niveau L+1 coûte 100 × L XP.
+
+Un Pokémon de niveau L avec `experience` XP en cours a donc cumulé
+T = 50 × L × (L - 1) + experience depuis le niveau 1, et le niveau atteint
+avec T XP cumulés se calcule directement (plus grand L tel que
+50 × L × (L - 1) <= T) : L = (5 + √(25 + 2T)) // 10 pour 100 XP par niveau.
+Pas de boucle niveau par niveau, quel que soit le gain.
+
+`experience_update()` écrit la même formule en SQL, pour créditer un
+queryset entier en une seule requête UPDATE.
+"""
+
+from math import isqrt
+
+from django.db.models import F, IntegerField
+from django.db.models.functions import Cast, Floor, Sqrt
+
+XP_PER_LEVEL = 100  # XP pour passer du niveau 1 au niveau 2 (puis × niveau)
+
+
+def total_experience(level, experience=0):
+    """XP cumulée depuis le niveau 1."""
+    return XP_PER_LEVEL * level * (level - 1) // 2 + experience
+
+
+def level_for(total):
+    """Niveau atteint avec `total` XP cumulée (racine entière, exacte)."""
+    return (XP_PER_LEVEL + isqrt(XP_PER_LEVEL**2 + 8 * XP_PER_LEVEL * total)) // (
+        2 * XP_PER_LEVEL
+    )
+
+
+def apply_experience(level, experience, amount):
+    """(niveau, XP en cours) après un gain de `amount` XP."""
+    total = total_experience(level, experience) + amount
+    new_level = level_for(total)
+    return new_level, total - total_experience(new_level)
+
+
+def experience_update(amount):
+    """
+    Arguments de QuerySet.update() qui créditent `amount` XP à chaque ligne.
+    Le nouveau niveau est calculé par la base à partir des valeurs de la
+    ligne au moment de l'UPDATE : pas de lecture préalable, donc pas de gain
+    perdu si deux combats créditent le même Pokémon en même temps.
+    """
+    # Dans un UPDATE, chaque expression lit les anciennes valeurs de la ligne
+    total = XP_PER_LEVEL * F("level") * (F("level") - 1) / 2 + F("experience") + amount
+    level = Cast(
+        Floor(
+            (XP_PER_LEVEL + Sqrt(XP_PER_LEVEL**2 + 8 * XP_PER_LEVEL * total))
+            / (2 * XP_PER_LEVEL)
+        ),
+        IntegerField(),
+    )
+    return {
+        "level": level,
+        "experience": total - XP_PER_LEVEL * level * (level - 1) / 2,
+    }
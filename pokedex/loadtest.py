@@ -0,0 +1,176 @@
+"""
+Test de charge scripté (voir manage.py load_test).
+
+Des dresseurs virtuels (un thread et une session HTTP chacun) jouent le
+parcours complet contre un serveur lancé à part : inscription, connexion,
+index, fiche d'un Pokémon, captures, profil, composition d'une équipe puis
+un combat PvE tour par tour. Chaque requête est chronométrée et rangée sous
+le nom de la vue appelée (le même que dans benchmarks.BUDGETS) ; `report()`
+en tire p50 / p95 / p99 et le débit par vue.
+
+Pour mesurer sans dépendre de pokeapi.co, lancer le site avec
+POKEAPI_BASE_URL pointé sur le faux PokeAPI (manage.py fake_pokeapi).
+"""
+
+import random
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+
+import requests
+from django.urls import Resolver404, resolve
+
+from .benchmarks import percentile
+from .fake_pokeapi import SPECIES_COUNT
+
+PASSWORD = "Charge-test-2024!"
+
+_AVAILABLE = re.compile(r'name="pokemon_id" value="(\d+)"')
+_TEAM = re.compile(r'name="team1_id" value="(\d+)"')
+_FIGHT = re.compile(r"/fights/([0-9a-f-]{36})/")
+
+
+class Recorder:
+    """Temps de réponse (ms) par vue, partagé entre les threads."""
+
+    def __init__(self):
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def add(self, view, elapsed_ms, failed=False):
+        with self._lock:
+            self.timings[view].append(elapsed_ms)
+            self.errors[view] += failed
+
+
+class VirtualUser:
+    def __init__(self, base_url, recorder, rng, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.rng = rng
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.username = f"charge-{uuid.uuid4().hex[:12]}"
+
+    def request(self, method, path, data=None):
+        """
+        Une requête, sans suivre les redirections : on chronomètre la vue
+        appelée, pas la page vers laquelle elle renvoie.
+        """
+        url = urljoin(self.base_url + "/", path.lstrip("/"))
+        if data is not None:
+            data = {
+                "csrfmiddlewaretoken": self.session.cookies.get("csrftoken"),
+                **data,
+            }
+        start = time.perf_counter()
+        response = self.session.request(
+            method,
+            url,
+            data=data,
+            headers={"Referer": url},
+            allow_redirects=False,
+            timeout=self.timeout,
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        self.recorder.add(_view_name(url), elapsed, response.status_code >= 400)
+        return response
+
+    def get(self, path):
+        return self.request("get", path)
+
+    def post(self, path, **data):
+        return self.request("post", path, data)
+
+    def sign_up(self):
+        self.get("/signup/")
+        self.post(
+            "/signup/",
+            username=self.username,
+            password1=PASSWORD,
+            password2=PASSWORD,
+        )
+        self.get("/accounts/login/")
+        self.post("/accounts/login/", username=self.username, password=PASSWORD)
+
+    def play(self, captures=5, turns=10):
+        """Un passage du parcours : navigation, captures, équipe, combat."""
+        self.get("/")
+        pokemon_id = self.rng.randint(1, SPECIES_COUNT)
+        self.get(f"/pokemon/{pokemon_id}/")
+        for _ in range(captures):
+            pokemon_id = self.rng.randint(1, SPECIES_COUNT)
+            self.post(
+                "/capture/", pokemon_id=pokemon_id, pokemon_name=f"pokemon{pokemon_id}"
+            )
+        self.get("/profile/")
+
+        # Équipe 1 complétée avec les premières captures disponibles
+        page = self.get("/teams/?team=0").text
+        for capture_id in _AVAILABLE.findall(page)[:5]:
+            self.post("/teams/?team=0", action="add_pokemon", pokemon_id=capture_id)
+
+        teams = _TEAM.findall(self.get("/fights/").text)
+        if not teams:
+            return
+        response = self.post(
+            "/fights/", action_type="start", mode="pve", team1_id=teams[0]
+        )
+        match = _FIGHT.search(response.headers.get("Location", ""))
+        if match is None:
+            return  # équipe pas prête ou pas d'adversaire
+        fight = f"/fights/{match.group(1)}/"
+        self.get(fight)
+        for _ in range(turns):
+            self.post(fight, action_type="turn", move="attack")
+        self.post(fight, action_type="quit")
+
+
+def _view_name(url):
+    try:
+        return resolve(urlparse(url).path).url_name or "?"
+    except Resolver404:
+        return "?"
+
+
+def run(base_url, users=10, iterations=3, captures=5, turns=10, seed=None):
+    """
+    Lance `users` dresseurs virtuels en parallèle, `iterations` parcours
+    chacun. Retourne (Recorder, durée totale en secondes).
+    """
+    recorder = Recorder()
+    rng = random.Random(seed)
+    seeds = [rng.random() for _ in range(users)]
+
+    def scenario(user_seed):
+        user = VirtualUser(base_url, recorder, random.Random(user_seed))
+        user.sign_up()
+        for _ in range(iterations):
+            user.play(captures=captures, turns=turns)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        # list() : remonte la première exception d'un dresseur
+        list(executor.map(scenario, seeds))
+    return recorder, time.perf_counter() - start
+
+
+def report(recorder, elapsed):
+    """Une ligne par vue : requêtes, erreurs, p50 / p95 / p99 (ms), débit."""
+    return [
+        {
+            "name": view,
+            "count": len(timings),
+            "errors": recorder.errors[view],
+            "p50": percentile(timings, 50),
+            "p95": percentile(timings, 95),
+            "p99": percentile(timings, 99),
+            "rps": len(timings) / elapsed if elapsed else 0.0,
+        }
+        for view, timings in sorted(recorder.timings.items())
+    ]
@@ -0,0 +1,81 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from pokedex import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Suite de performance : remplit une base de test avec des volumes "
+        "réalistes, appelle chaque route et vérifie les budgets (requêtes SQL, "
+        "p95). Échoue si une route dépasse son budget. Tourne hors ligne."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users", type=int, default=2000, help="Dresseurs (défaut: 2000)."
+        )
+        parser.add_argument(
+            "--captures",
+            type=int,
+            default=500,
+            help="Captures par dresseur (défaut: 500, soit 1 million).",
+        )
+        parser.add_argument(
+            "--results",
+            type=int,
+            default=50,
+            help="Combats terminés par dresseur (défaut: 50).",
+        )
+        parser.add_argument(
+            "--runs", type=int, default=30, help="Appels par route (défaut: 30)."
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Garde la base de test (et ses données) pour le prochain passage.",
+        )
+
+    def handle(self, *args, **options):
+        # Base de test dédiée : la base de développement n'est jamais touchée
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options["keepdb"]
+        )
+        try:
+            if not User.objects.filter(username="bench-staff").exists():
+                self.stdout.write("Création des données...")
+                benchmarks.seed(
+                    users=options["users"],
+                    captures=options["captures"],
+                    results=options["results"],
+                    log=self.stdout.write,
+                )
+            results = benchmarks.run(runs=options["runs"])
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+            teardown_test_environment()
+
+        self.stdout.write(
+            f"{'route':<22}{'requêtes':>10}{'p50 ms':>10}{'p95 ms':>10}"
+            f"{'p99 ms':>10}  budget"
+        )
+        for r in results:
+            budget = r["budget"]
+            line = (
+                f"{r['name']:<22}{r['queries']:>10}{r['p50']:>10.1f}"
+                f"{r['p95']:>10.1f}{r['p99']:>10.1f}  "
+                f"{budget.queries} req. / {budget.p95_ms} ms"
+            )
+            style = self.style.SUCCESS if r["ok"] else self.style.ERROR
+            self.stdout.write(style(line))
+
+        over = [r["name"] for r in results if not r["ok"]]
+        if over:
+            raise CommandError(f"Budget dépassé : {', '.join(over)}")
+        self.stdout.write(self.style.SUCCESS("Tous les budgets sont respectés."))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from pokedex.sprites import KINDS, build_atlas, mirror
+
+
+class Command(BaseCommand):
+    help = (
+        "Regroupe les images du miroir en planches (sprite atlas) avec leur "
+        "feuille de style. Les espèces absentes du miroir sont d'abord copiées."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=151,
+            help="Espèces à copier dans le miroir avant (défaut: 151).",
+        )
+        parser.add_argument(
+            "--kind",
+            choices=list(KINDS),
+            action="append",
+            help="Type d'image (sprite, artwork ; défaut: les deux).",
+        )
+
+    def handle(self, *args, **options):
+        kinds = options["kind"] or tuple(KINDS)
+        _, failed = mirror(range(1, options["limit"] + 1), kinds=kinds)
+        for kind, pokemon_id in failed:
+            self.stderr.write(f"Absent des planches : {kind} #{pokemon_id}")
+
+        sheets = build_atlas(kinds)
+        if not sheets:
+            raise CommandError("Aucune image dans le miroir.")
+        self.stdout.write(self.style.SUCCESS(f"{sheets} planches construites."))
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from pokedex.models import Fight
+
+
+class Command(BaseCommand):
+    help = "Supprime en une requête les combats abandonnés (sans action récente)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=settings.FIGHT_EXPIRY_HOURS,
+            help="Inactivité en heures avant expiration (défaut: FIGHT_EXPIRY_HOURS).",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["hours"])
+        count, _ = Fight.objects.filter(updated_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"{count} combats expirés supprimés."))
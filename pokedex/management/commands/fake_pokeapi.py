@@ -0,0 +1,83 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from pokedex.fake_pokeapi import FakePokeAPIServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Lance un faux PokeAPI local pour les tests de charge : JSON enregistré "
+        "ou généré, latence et erreurs injectées. Brancher le site dessus avec "
+        "POKEAPI_BASE_URL=http://<host>:<port>/api/v2."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1", help="Défaut: 127.0.0.1.")
+        parser.add_argument("--port", type=int, default=8001, help="Défaut: 8001.")
+        parser.add_argument(
+            "--fixtures",
+            help="Dossier de JSON enregistrés (<endpoint>/<id>.json), "
+            "servis en priorité.",
+        )
+        parser.add_argument(
+            "--record-from",
+            metavar="URL",
+            help="Vraie API à interroger pour les ressources absentes des fixtures "
+            "(ex. https://pokeapi.co/api/v2) ; les réponses y sont enregistrées.",
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0,
+            help="Latence ajoutée à chaque réponse, en ms (défaut: 0).",
+        )
+        parser.add_argument(
+            "--jitter",
+            type=float,
+            default=0,
+            help="Latence aléatoire en plus, entre 0 et cette valeur en ms.",
+        )
+        parser.add_argument(
+            "--error-rate",
+            type=float,
+            default=0,
+            help="Part des requêtes en erreur, entre 0 et 1 (défaut: 0).",
+        )
+        parser.add_argument(
+            "--error-status",
+            type=int,
+            default=503,
+            help="Code HTTP des erreurs injectées (défaut: 503).",
+        )
+        parser.add_argument("--seed", type=int, help="Graine aléatoire.")
+
+    def handle(self, *args, **options):
+        if not 0 <= options["error_rate"] <= 1:
+            raise CommandError("--error-rate doit être entre 0 et 1.")
+        if options["record_from"] and not options["fixtures"]:
+            raise CommandError("--record-from demande un dossier --fixtures.")
+
+        server = FakePokeAPIServer(
+            (options["host"], options["port"]),
+            fixtures=options["fixtures"],
+            upstream=options["record_from"],
+            latency=options["latency"] / 1000,
+            jitter=options["jitter"] / 1000,
+            error_rate=options["error_rate"],
+            error_status=options["error_status"],
+            seed=options["seed"],
+            verbose=options["verbosity"] > 1,
+        )
+        self.stdout.write(
+            f"Faux PokeAPI sur {server.url} (Ctrl+C pour arrêter).\n"
+            f"Lancer le site avec POKEAPI_BASE_URL={server.url}"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(
+                f"{server.requests} requêtes servies, "
+                f"{server.errors} erreurs injectées."
+            )
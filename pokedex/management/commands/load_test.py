@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from pokedex import loadtest
+
+
+class Command(BaseCommand):
+    help = (
+        "Test de charge : des dresseurs virtuels jouent le parcours complet "
+        "(index, fiche, captures, équipe, combat) contre un serveur déjà lancé. "
+        "Affiche p50 / p95 / p99 et le débit par vue."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url",
+            default="http://127.0.0.1:8000",
+            help="Serveur à tester (défaut: http://127.0.0.1:8000).",
+        )
+        parser.add_argument(
+            "--users", type=int, default=10, help="Dresseurs simultanés (défaut: 10)."
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=3,
+            help="Parcours par dresseur (défaut: 3).",
+        )
+        parser.add_argument(
+            "--captures", type=int, default=5, help="Captures par parcours (défaut: 5)."
+        )
+        parser.add_argument(
+            "--turns", type=int, default=10, help="Tours par combat (défaut: 10)."
+        )
+        parser.add_argument("--seed", type=int, help="Graine aléatoire.")
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["iterations"] < 1:
+            raise CommandError("--users et --iterations doivent être positifs.")
+
+        recorder, elapsed = loadtest.run(
+            options["base_url"],
+            users=options["users"],
+            iterations=options["iterations"],
+            captures=options["captures"],
+            turns=options["turns"],
+            seed=options["seed"],
+        )
+        results = loadtest.report(recorder, elapsed)
+
+        self.stdout.write(
+            f"{'vue':<22}{'requêtes':>10}{'erreurs':>9}{'p50 ms':>10}"
+            f"{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}"
+        )
+        for r in results:
+            line = (
+                f"{r['name']:<22}{r['count']:>10}{r['errors']:>9}{r['p50']:>10.1f}"
+                f"{r['p95']:>10.1f}{r['p99']:>10.1f}{r['rps']:>9.1f}"
+            )
+            style = self.style.ERROR if r["errors"] else self.style.SUCCESS
+            self.stdout.write(style(line))
+
+        total = sum(r["count"] for r in results)
+        self.stdout.write(
+            f"{total} requêtes en {elapsed:.1f}s ({total / elapsed:.1f} req/s)."
+        )
+        if any(r["errors"] for r in results):
+            raise CommandError("Des requêtes ont échoué (HTTP >= 400).")
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from pokedex.sprites import KINDS, mirror, mirror_dir
+
+
+class Command(BaseCommand):
+    help = (
+        "Télécharge sprites et artworks dans le miroir local (SPRITE_MIRROR_DIR) "
+        "et produit leurs variantes réduites en PNG et WebP."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=151,
+            help="Nombre d'espèces à copier (défaut: 151).",
+        )
+        parser.add_argument(
+            "--kind",
+            choices=list(KINDS),
+            action="append",
+            help="Type d'image (sprite, artwork ; défaut: les deux).",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=6, help="Téléchargements parallèles."
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Retélécharge aussi les images déjà présentes.",
+        )
+
+    def handle(self, *args, **options):
+        added, failed = mirror(
+            range(1, options["limit"] + 1),
+            kinds=options["kind"] or tuple(KINDS),
+            workers=options["workers"],
+            force=options["force"],
+        )
+        if failed and not added:
+            raise CommandError(f"Aucune image téléchargée ({len(failed)} échecs).")
+        for kind, pokemon_id in failed:
+            self.stderr.write(f"Échec : {kind} #{pokemon_id}")
+        self.stdout.write(
+            self.style.SUCCESS(f"{added} images ajoutées dans {mirror_dir()}.")
+        )
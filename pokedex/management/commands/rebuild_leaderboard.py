@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from pokedex.leaderboard import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule les compteurs du classement (victoires, meilleur niveau, "
+        "espèces différentes) depuis les captures et les combats enregistrés."
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{count} dresseurs classés."))
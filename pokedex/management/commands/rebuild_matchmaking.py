@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from pokedex.matchmaking import rebuild_pool
+
+
+class Command(BaseCommand):
+    help = "Reconstruit le pool de matchmaking depuis la composition des équipes."
+
+    def handle(self, *args, **options):
+        count = rebuild_pool()
+        self.stdout.write(self.style.SUCCESS(f"{count} équipes prêtes dans le pool."))
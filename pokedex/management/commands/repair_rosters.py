@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from pokedex.matchmaking import rebuild_pool
+from pokedex.models import Team
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule roster_size / is_ready de chaque équipe depuis la table "
+        "des Pokémon (après un import SQL, une modification hors Django...)."
+    )
+
+    def handle(self, *args, **options):
+        wrong = []
+        for team in Team.objects.annotate(size=Count("pokemons")):
+            if team.roster_size != team.size or team.is_ready != (team.size == 5):
+                team.roster_size = team.size
+                team.is_ready = team.size == 5
+                wrong.append(team)
+        Team.objects.bulk_update(wrong, ["roster_size", "is_ready"], batch_size=500)
+
+        # Le pool de matchmaking dépend de is_ready
+        if wrong:
+            rebuild_pool()
+        self.stdout.write(self.style.SUCCESS(f"{len(wrong)} équipes corrigées."))
@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pokedex.models import Team
+from pokedex.simulation import simulate
+
+
+class Command(BaseCommand):
+    help = (
+        "Simule un grand nombre de combats PvE entre deux équipes et affiche "
+        "les taux de victoire et la distribution du nombre de tours."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--team1", type=int, required=True, help="ID équipe 1.")
+        parser.add_argument("--team2", type=int, required=True, help="ID équipe 2.")
+        parser.add_argument(
+            "--n",
+            type=int,
+            default=1_000_000,
+            help="Nombre de combats à simuler (défaut: 1000000).",
+        )
+        parser.add_argument(
+            "--seed", type=int, help="Graine aléatoire (résultats reproductibles)."
+        )
+
+    def handle(self, *args, **options):
+        species1, levels1 = self._roster(options["team1"])
+        species2, levels2 = self._roster(options["team2"])
+        if options["n"] < 1:
+            raise CommandError("--n doit être positif.")
+
+        start = time.perf_counter()
+        result = simulate(
+            levels1,
+            levels2,
+            options["n"],
+            seed=options["seed"],
+            species1=species1,
+            species2=species2,
+        )
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"{result.n} combats simulés en {elapsed:.2f}s "
+            f"(niveaux {levels1} contre {levels2})."
+        )
+        self.stdout.write(f"Victoires équipe 1 : {result.win_rate(1):.2%}")
+        self.stdout.write(f"Victoires équipe 2 : {result.win_rate(2):.2%}")
+
+        percentiles = result.turn_percentiles()
+        self.stdout.write(
+            f"Tours : moyenne {result.turns.mean():.1f}, "
+            f"min {result.turns.min()}, max {result.turns.max()}, "
+            + ", ".join(f"p{p} {value}" for p, value in percentiles.items())
+        )
+        for turn, count in result.turn_histogram().items():
+            self.stdout.write(f"  {turn:>4} tours : {count / result.n:7.2%}")
+
+    def _roster(self, team_id):
+        # Même ordre que FightManager (team.pokemons.all())
+        try:
+            team = Team.objects.get(pk=team_id)
+        except Team.DoesNotExist:
+            raise CommandError(f"Équipe {team_id} introuvable.")
+        pokemons = list(team.pokemons.all())
+        if not pokemons:
+            raise CommandError(f"L'équipe {team_id} est vide.")
+        return [p.pokemon_id for p in pokemons], [p.level for p in pokemons]
@@ -0,0 +1,51 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pokedex.catalog import fetch_records, store_records
+
+
+class Command(BaseCommand):
+    help = (
+        "Remplit le catalogue local des espèces (Species / SpeciesStats) "
+        "depuis PokeAPI ou depuis un dump JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=151,
+            help="Nombre d'espèces à synchroniser depuis PokeAPI (défaut: 151).",
+        )
+        parser.add_argument(
+            "--source",
+            help="Dump JSON local à charger au lieu d'appeler PokeAPI.",
+        )
+        parser.add_argument(
+            "--dump",
+            help="Écrit les espèces synchronisées dans ce fichier JSON.",
+        )
+
+    def handle(self, *args, **options):
+        if options["source"]:
+            try:
+                with open(options["source"], encoding="utf-8") as f:
+                    records = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Dump illisible : {e}")
+        else:
+            wanted = range(1, options["limit"] + 1)
+            records = fetch_records(wanted)
+            if len(records) < len(wanted):
+                fetched = {record["id"] for record in records}
+                missing = [p_id for p_id in wanted if p_id not in fetched]
+                raise CommandError(f"PokeAPI injoignable (espèces {missing}).")
+
+        count = store_records(records)
+
+        if options["dump"]:
+            with open(options["dump"], "w", encoding="utf-8") as f:
+                json.dump(records, f, ensure_ascii=False)
+
+        self.stdout.write(self.style.SUCCESS(f"{count} espèces synchronisées."))
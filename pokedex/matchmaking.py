@@ -0,0 +1,112 @@
+"""
+Pool des équipes prêtes au combat, pour choisir un adversaire PvE.
+
+Le pool (MatchmakingEntry) est mis à jour par les signaux de signals.py
+quand une équipe change. Ses `slot` restent denses : tirer un adversaire
+coûte un nombre fixe de requêtes, quel que soit le nombre de joueurs. Les
+slots ne sont alloués ou déplacés que sous le verrou du pool
+(MatchmakingPool.lock) : deux requêtes ne prennent jamais le même slot.
+"""
+
+import random
+
+from django.db import transaction
+from django.db.models import Avg, Max
+
+from .models import MatchmakingEntry, MatchmakingPool, Team
+
+
+def refresh_team(team_id):
+    """Ajoute, met à jour ou retire l'équipe du pool selon Team.is_ready."""
+    level = Team.objects.filter(pk=team_id, is_ready=True).aggregate(
+        level=Avg("pokemons__level")
+    )["level"]
+    entries = MatchmakingEntry.objects.filter(team_id=team_id)
+    if level is None:
+        # Le trou laissé par le slot est comblé par fill_slot (post_delete,
+        # verrou pris en pre_delete)
+        entries.delete()
+        return
+
+    with transaction.atomic():
+        if entries.update(avg_level=level):
+            return
+        MatchmakingPool.lock()
+        # Relu sous le verrou : une autre requête a pu l'ajouter entre-temps
+        if entries.update(avg_level=level):
+            return
+        last = MatchmakingEntry.objects.order_by("-slot").first()
+        MatchmakingEntry.objects.create(
+            team_id=team_id, slot=last.slot + 1 if last else 0, avg_level=level
+        )
+
+
+def fill_slot(slot):
+    """Le dernier slot vient boucher le trou : les slots restent 0..n-1."""
+    with transaction.atomic():
+        MatchmakingPool.lock()
+        last = MatchmakingEntry.objects.order_by("-slot").first()
+        if last is not None and last.slot > slot:
+            MatchmakingEntry.objects.filter(pk=last.pk).update(slot=slot)
+
+
+def rebuild_pool():
+    """Reconstruit le pool depuis les équipes (migration, réparation)."""
+    ready = (
+        Team.objects.filter(is_ready=True)
+        .annotate(level=Avg("pokemons__level"))
+        .order_by("pk")
+        .values_list("pk", "level")
+    )
+    with transaction.atomic():
+        MatchmakingPool.lock()
+        # Un seul DELETE, sans post_delete : pas de fill_slot par ligne, le
+        # pool est recréé juste après
+        entries = MatchmakingEntry.objects.all()
+        entries._raw_delete(entries.db)
+        MatchmakingEntry.objects.bulk_create(
+            MatchmakingEntry(team_id=pk, slot=slot, avg_level=level)
+            for slot, (pk, level) in enumerate(ready)
+        )
+    return len(ready)
+
+
+def pick_opponent(team, level_band=None):
+    """
+    Équipe adverse tirée au hasard dans le pool (hors `team`), ou None.
+    Avec `level_band`, on cherche d'abord un niveau moyen à ± level_band de
+    celui de `team`, puis dans tout le pool si personne n'est dans la tranche.
+    """
+    own = MatchmakingEntry.objects.filter(team=team).first()
+    pool = MatchmakingEntry.objects.select_related("team")
+
+    if level_band and own is not None:
+        band = (
+            pool.filter(
+                avg_level__range=(
+                    own.avg_level - level_band,
+                    own.avg_level + level_band,
+                )
+            )
+            .exclude(team=team)
+            .order_by("avg_level", "slot")
+        )
+        # Tirage uniforme dans la tranche : COUNT puis lecture au rang tiré,
+        # les deux sur l'index (avg_level, slot) sans parcourir le reste du pool
+        count = band.count()
+        if count:
+            return band[random.randrange(count)].team
+
+    last = MatchmakingEntry.objects.aggregate(last=Max("slot"))["last"]
+    if last is None:
+        return None
+    size = last + 1 - (own is not None)
+    if size <= 0:
+        return None
+
+    # Tirage parmi les autres slots : on saute celui de l'équipe elle-même
+    slot = random.randrange(size)
+    if own is not None and slot >= own.slot:
+        slot += 1
+    entry = pool.filter(slot__gte=slot).exclude(team=team).order_by("slot").first()
+    return entry.team if entry else None
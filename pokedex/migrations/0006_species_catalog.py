@@ -0,0 +1,60 @@
+# Generated by Django 6.0 on 2026-10-18 17:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pokedex", "0005_remove_pokemoncapture_in_team"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Species",
+            fields=[
+                (
+                    "id",
+                    models.PositiveSmallIntegerField(primary_key=True, serialize=False),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("name_fr", models.CharField(db_index=True, max_length=100)),
+                ("type1", models.CharField(max_length=20)),
+                ("type2", models.CharField(blank=True, max_length=20)),
+                ("height", models.PositiveSmallIntegerField(default=0)),
+                ("weight", models.PositiveIntegerField(default=0)),
+                ("description_fr", models.TextField(blank=True)),
+                ("sprite", models.URLField(blank=True)),
+                ("artwork", models.URLField(blank=True)),
+                ("synced_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "species",
+                "ordering": ["id"],
+            },
+        ),
+        migrations.CreateModel(
+            name="SpeciesStats",
+            fields=[
+                (
+                    "species",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="pokedex.species",
+                    ),
+                ),
+                ("hp", models.PositiveSmallIntegerField()),
+                ("attack", models.PositiveSmallIntegerField()),
+                ("defense", models.PositiveSmallIntegerField()),
+                ("special_attack", models.PositiveSmallIntegerField()),
+                ("special_defense", models.PositiveSmallIntegerField()),
+                ("speed", models.PositiveSmallIntegerField()),
+            ],
+            options={
+                "verbose_name_plural": "species stats",
+            },
+        ),
+    ]
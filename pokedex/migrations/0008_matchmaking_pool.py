@@ -0,0 +1,48 @@
+# Generated by Django 6.0 on 2026-10-18 17:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Avg, Count
+
+
+def fill_pool(apps, schema_editor):
+    # Équipes déjà complètes avant l'apparition du pool
+    Team = apps.get_model("pokedex", "Team")
+    MatchmakingEntry = apps.get_model("pokedex", "MatchmakingEntry")
+    ready = (
+        Team.objects.annotate(size=Count("pokemons"), level=Avg("pokemons__level"))
+        .filter(size=5)
+        .order_by("pk")
+        .values_list("pk", "level")
+    )
+    MatchmakingEntry.objects.bulk_create(
+        MatchmakingEntry(team_id=pk, slot=slot, avg_level=level)
+        for slot, (pk, level) in enumerate(ready)
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pokedex", "0007_fight"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MatchmakingEntry",
+            fields=[
+                (
+                    "team",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="matchmaking",
+                        serialize=False,
+                        to="pokedex.team",
+                    ),
+                ),
+                ("slot", models.PositiveIntegerField(unique=True)),
+                ("avg_level", models.FloatField(db_index=True)),
+            ],
+        ),
+        migrations.RunPython(fill_pool, migrations.RunPython.noop),
+    ]
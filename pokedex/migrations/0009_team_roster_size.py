@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-18 17:42
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_rosters(apps, schema_editor):
+    Team = apps.get_model("pokedex", "Team")
+    teams = list(Team.objects.annotate(size=Count("pokemons")))
+    for team in teams:
+        team.roster_size = team.size
+        team.is_ready = team.size == 5
+    Team.objects.bulk_update(teams, ["roster_size", "is_ready"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pokedex", "0008_matchmaking_pool"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="team",
+            name="is_ready",
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AddField(
+            model_name="team",
+            name="roster_size",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(count_rosters, migrations.RunPython.noop),
+    ]
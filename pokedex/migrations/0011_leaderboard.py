@@ -0,0 +1,122 @@
+# Generated by Django 6.0 on 2026-10-18 18:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_leaderboard(apps, schema_editor):
+    # Compteurs des dresseurs existants (voir leaderboard.rebuild)
+    User = apps.get_model("auth", "User")
+    PokemonCapture = apps.get_model("pokedex", "PokemonCapture")
+    SpeciesCaught = apps.get_model("pokedex", "SpeciesCaught")
+    TrainerStats = apps.get_model("pokedex", "TrainerStats")
+
+    TrainerStats.objects.bulk_create(
+        (TrainerStats(user_id=pk) for pk in User.objects.values_list("pk", flat=True)),
+        ignore_conflicts=True,
+    )
+    SpeciesCaught.objects.bulk_create(
+        SpeciesCaught(user_id=row["user"], pokemon_id=row["pokemon_id"], count=row["n"])
+        for row in PokemonCapture.objects.values("user", "pokemon_id")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    species = (
+        SpeciesCaught.objects.filter(user=OuterRef("user"))
+        .order_by()
+        .values("user")
+        .annotate(n=Count("id"))
+        .values("n")
+    )
+    best = (
+        PokemonCapture.objects.filter(user=OuterRef("user"))
+        .order_by("-level")
+        .values("level")[:1]
+    )
+    TrainerStats.objects.update(
+        species_count=Coalesce(Subquery(species), 0),
+        best_level=Coalesce(Subquery(best), 0),
+    )
+    for stats in TrainerStats.objects.filter(fights__gt=0):
+        stats.win_rate = stats.wins / stats.fights
+        stats.save(update_fields=["win_rate"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pokedex", "0010_fight_result"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SpeciesCaught",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("pokemon_id", models.IntegerField()),
+                ("count", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="trainerstats",
+            name="best_level",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="trainerstats",
+            name="species_count",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="trainerstats",
+            name="win_rate",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="trainerstats",
+            index=models.Index(fields=["-wins", "user"], name="leaderboard_wins"),
+        ),
+        migrations.AddIndex(
+            model_name="trainerstats",
+            index=models.Index(
+                fields=["-win_rate", "user"], name="leaderboard_win_rate"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trainerstats",
+            index=models.Index(
+                fields=["-best_level", "user"], name="leaderboard_level"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trainerstats",
+            index=models.Index(
+                fields=["-species_count", "user"], name="leaderboard_species"
+            ),
+        ),
+        migrations.AddField(
+            model_name="speciescaught",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="speciescaught",
+            unique_together={("user", "pokemon_id")},
+        ),
+        migrations.RunPython(fill_leaderboard, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-18 18:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pokedex", "0011_leaderboard"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="pokemoncapture",
+            index=models.Index(
+                fields=["user", "-captured_at", "-id"], name="capture_collection"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pokemoncapture",
+            index=models.Index(
+                fields=["user", "pokemon_id", "-captured_at", "-id"],
+                name="capture_species",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pokemoncapture",
+            index=models.Index(fields=["user", "level"], name="capture_level"),
+        ),
+        migrations.AddIndex(
+            model_name="pokemoncapture",
+            index=models.Index(fields=["user", "nickname"], name="capture_nickname"),
+        ),
+    ]
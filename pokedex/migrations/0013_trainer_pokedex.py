@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-18 18:19
+
+from django.db import migrations, models
+
+from pokedex.collection import from_species
+
+
+def fill_pokedex(apps, schema_editor):
+    # Bitmap des espèces possédées ; from_species ignore les numéros hors du
+    # Pokédex que l'ancienne vue de capture a pu enregistrer
+    SpeciesCaught = apps.get_model("pokedex", "SpeciesCaught")
+    TrainerStats = apps.get_model("pokedex", "TrainerStats")
+
+    species = {}
+    for user_id, pokemon_id in SpeciesCaught.objects.values_list(
+        "user", "pokemon_id"
+    ).iterator():
+        species.setdefault(user_id, []).append(pokemon_id)
+    TrainerStats.objects.bulk_update(
+        [
+            TrainerStats(user_id=user_id, pokedex=from_species(pokemon_ids))
+            for user_id, pokemon_ids in species.items()
+        ],
+        ["pokedex"],
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pokedex", "0012_capture_collection_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="trainerstats",
+            name="pokedex",
+            field=models.BinaryField(default=b""),
+        ),
+        migrations.RunPython(fill_pokedex, migrations.RunPython.noop),
+    ]
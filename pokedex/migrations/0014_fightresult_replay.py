@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-18 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pokedex", "0013_trainer_pokedex"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fightresult",
+            name="replay",
+            field=models.BinaryField(default=b""),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-18 18:59
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_captures(apps, schema_editor):
+    # Nombre de captures de chaque dresseur, en un seul UPDATE
+    PokemonCapture = apps.get_model("pokedex", "PokemonCapture")
+    TrainerStats = apps.get_model("pokedex", "TrainerStats")
+
+    counts = (
+        PokemonCapture.objects.filter(user=OuterRef("user"))
+        .order_by()
+        .values("user")
+        .annotate(n=Count("id"))
+        .values("n")
+    )
+    TrainerStats.objects.update(captures=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pokedex", "0014_fightresult_replay"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="trainerstats",
+            name="captures",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_captures, migrations.RunPython.noop),
+    ]
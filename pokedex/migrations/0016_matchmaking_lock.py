@@ -0,0 +1,42 @@
+# Generated by Django 6.0 on 2026-10-18 19:11
+
+from django.db import migrations, models
+
+
+def create_pool(apps, schema_editor):
+    # Ligne unique du verrou (recréée au besoin par MatchmakingPool.lock)
+    apps.get_model("pokedex", "MatchmakingPool").objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pokedex", "0015_trainer_captures"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MatchmakingPool",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("changes", models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="matchmakingentry",
+            name="avg_level",
+            field=models.FloatField(),
+        ),
+        migrations.AddIndex(
+            model_name="matchmakingentry",
+            index=models.Index(fields=["avg_level", "slot"], name="matchmaking_band"),
+        ),
+        migrations.RunPython(create_pool, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,108 @@
+import uuid
+
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, OuterRef, Subquery, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .fight_logic import encode_replay, replay
+from .leveling import experience_update
+from .utils import TYPE_TRANSLATIONS
+
+
+class Species(models.Model):
+    """
+    Catalogue local des espèces, rempli par `manage.py sync_catalog`.
+    Les vues lisent ces lignes au lieu d'interroger PokeAPI à chaque page.
+    """
+
+    id = models.PositiveSmallIntegerField(primary_key=True)  # N° du Pokédex
+    name = models.CharField(max_length=100, unique=True)  # Nom anglais (PokeAPI)
+    name_fr = models.CharField(max_length=100, db_index=True)
+
+    type1 = models.CharField(max_length=20)
+    type2 = models.CharField(max_length=20, blank=True)
+
+    height = models.PositiveSmallIntegerField(default=0)  # En décimètres
+    weight = models.PositiveIntegerField(default=0)  # En hectogrammes
+    description_fr = models.TextField(blank=True)
+
+    sprite = models.URLField(blank=True)
+    artwork = models.URLField(blank=True)
+
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["id"]
+        verbose_name_plural = "species"
+
+    def __str__(self):
+        return f"#{self.id} {self.name_fr}"
+
+    @property
+    def type_display(self):
+        """(Type Français, couleur tailwind) du type principal."""
+        return TYPE_TRANSLATIONS.get(self.type1, (self.type1, "gray"))
+
+
+class SpeciesStats(models.Model):
+    # Ordre de PokeAPI, utilisé pour l'affichage
+    STAT_NAMES = [
+        "hp",
+        "attack",
+        "defense",
+        "special-attack",
+        "special-defense",
+        "speed",
+    ]
+
+    species = models.OneToOneField(
+        Species, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    hp = models.PositiveSmallIntegerField()
+    attack = models.PositiveSmallIntegerField()
+    defense = models.PositiveSmallIntegerField()
+    special_attack = models.PositiveSmallIntegerField()
+    special_defense = models.PositiveSmallIntegerField()
+    speed = models.PositiveSmallIntegerField()
+
+    class Meta:
+        verbose_name_plural = "species stats"
+
+    def __str__(self):
+        return f"Stats de {self.species_id}"
+
+    def base_stats(self):
+        """Liste de (nom PokeAPI, stat de base) dans l'ordre de PokeAPI."""
+        return [
+            (name, getattr(self, name.replace("-", "_"))) for name in self.STAT_NAMES
+        ]
+
+
+class PokemonCaptureQuerySet(models.QuerySet):
+    def gain_experience(self, amount):
+        """
+        Crédite `amount` XP (entier, ou expression évaluée par ligne) à chaque
+        Pokémon du queryset en une requête UPDATE (voir leveling.py), sans
+        risque de perte face à un combat concurrent.
+        Retourne le nombre de Pokémon crédités.
+        """
+        team_ids = list(
+            Team.objects.filter(pokemons__in=self).values_list("pk", flat=True)
+        )
+        user_ids = list(self.order_by().values_list("user", flat=True).distinct())
+        updated = self.update(**experience_update(amount))
+
+        # update() ne déclenche pas post_save : niveau moyen du matchmaking
+        # et meilleur niveau du classement
+        from .matchmaking import refresh_team
+
+        for team_id in set(team_ids):
+            refresh_team(team_id)
+        TrainerStats.refresh_best_level(user_ids)
+        return updated
 
 
 class PokemonCapture(models.Model):
@@ -15,29 +117,35 @@ class PokemonCapture(models.Model):
 
     captured_at = models.DateTimeField(auto_now_add=True)
 
+    objects = PokemonCaptureQuerySet.as_manager()
+
+    class Meta:
+        # Collection du profil : pagination par clé et filtres (views.profile)
+        indexes = [
+            models.Index(
+                fields=["user", "-captured_at", "-id"], name="capture_collection"
+            ),
+            models.Index(
+                fields=["user", "pokemon_id", "-captured_at", "-id"],
+                name="capture_species",
+            ),
+            models.Index(fields=["user", "level"], name="capture_level"),
+            models.Index(fields=["user", "nickname"], name="capture_nickname"),
+        ]
+
     def __str__(self):
         return f"{self.name} (Dresseur: {self.user.username})"
 
     def gain_experience(self, amount):
         """
         Méthode pour ajouter de l'XP et gérer la montée de niveau automatiquement.
-        À utiliser par le module de Combat.
+        À utiliser par le module de Combat. Pour toute une équipe, préférer
+        Team.gain_experience (une seule requête).
         """
-        self.experience += amount
-
-        # Formule simple : Il faut 100 XP * le niveau actuel pour monter
-        xp_needed = 100 * self.level
-
-        # On utilise une boucle 'while' au cas où on gagne BEAUCOUP d'XP d'un coup
-        leveled_up = False
-        while self.experience >= xp_needed:
-            self.level += 1
-            self.experience -= xp_needed
-            xp_needed = 100 * self.level  # Le seuil augmente pour le prochain niveau
-            leveled_up = True
-
-        self.save()
-        return leveled_up
+        old_level = self.level
+        PokemonCapture.objects.filter(pk=self.pk).gain_experience(amount)
+        self.refresh_from_db(fields=["level", "experience"])
+        return self.level > old_level
 
 
 class Team(models.Model):
@@ -56,12 +164,17 @@ class Team(models.Model):
     # Avec position_choice on oblige à avoir entre 0 et 4
     position = models.IntegerField(choices=POSITION_CHOICES, default=0)
 
+    # Copie de pokemons.count(), tenue à jour par signals.py (m2m_changed)
+    # et réparable avec manage.py repair_rosters : pas de COUNT à l'affichage
+    roster_size = models.PositiveSmallIntegerField(default=0)
+    is_ready = models.BooleanField(default=False, db_index=True)
+
     def __str__(self):
         return f"{self.name} (Position {self.position + 1}) de {self.user.username}"
 
     def add_pokemon(self, pokemon):
         # check le nombre de pokemon
-        if self.pokemons.count() >= 5:
+        if self.roster_size >= 5:
             raise ValidationError("Une équipe ne peut pas avoir plus de 5 pokémons.")
 
         self.pokemons.add(pokemon)
@@ -72,7 +185,19 @@ class Team(models.Model):
         self.save()
 
     def is_ready_for_battle(self):
-        return self.pokemons.count() == 5
+        return self.is_ready
+
+    def gain_experience(self, amount):
+        """XP de fin de combat pour toute l'équipe, en une requête UPDATE."""
+        return self.pokemons.all().gain_experience(amount)
+
+    def refresh_roster(self):
+        """Recompte les Pokémon de l'équipe (en base et sur l'instance)."""
+        self.roster_size = self.pokemons.count()
+        self.is_ready = self.roster_size == 5
+        Team.objects.filter(pk=self.pk).update(
+            roster_size=self.roster_size, is_ready=self.is_ready
+        )
 
     def clean(self):
         super().clean()
@@ -87,3 +212,275 @@ class Team(models.Model):
     class Meta:
         unique_together = ("user", "position")
         ordering = ["position"]
+
+
+class MatchmakingEntry(models.Model):
+    """
+    Équipe prête au combat (5 Pokémon), tenue à jour par signals.py.
+    Les `slot` sont denses (0..n-1) : un tirage au hasard est une lecture
+    par index, quel que soit le nombre d'équipes (voir matchmaking.py).
+    """
+
+    team = models.OneToOneField(
+        Team, on_delete=models.CASCADE, primary_key=True, related_name="matchmaking"
+    )
+    slot = models.PositiveIntegerField(unique=True)
+    avg_level = models.FloatField()
+
+    class Meta:
+        # Tranche de niveau de pick_opponent : comptage et tirage sur l'index
+        indexes = [models.Index(fields=["avg_level", "slot"], name="matchmaking_band")]
+
+    def __str__(self):
+        return f"{self.team.name} (slot {self.slot}, Nv. moyen {self.avg_level:.1f})"
+
+
+class MatchmakingPool(models.Model):
+    """
+    Ligne unique qui sert de verrou au pool : les slots ne sont alloués ou
+    déplacés qu'après un UPDATE de cette ligne (voir matchmaking.py).
+    """
+
+    changes = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def lock(cls):
+        """
+        UPDATE de la ligne (créée si besoin) : verrou de ligne sous PostgreSQL,
+        verrou d'écriture de la base sous SQLite, jusqu'à la fin de la
+        transaction. select_for_update ne suffit pas : SQLite l'ignore et il
+        n'empêche pas l'insertion d'un slot plus haut.
+        """
+        if not cls.objects.filter(pk=1).update(changes=F("changes") + 1):
+            cls.objects.get_or_create(pk=1)
+            cls.objects.filter(pk=1).update(changes=F("changes") + 1)
+
+
+class Fight(models.Model):
+    """
+    Combat en cours, identifié par un UUID (plusieurs combats par joueur).
+    L'état est le journal binaire de fight_logic.encode_replay (graine,
+    équipes de départ, actions), rejoué à chaque chargement ; chaque tour
+    fait un seul UPDATE conditionné par `version` (verrou optimiste).
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="fights")
+    team1 = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="+")
+    team2 = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="+")
+
+    state = models.BinaryField()
+    version = models.PositiveIntegerField(default=0)
+    # PvP local : joueur dont on attend l'action, et action déjà choisie par J1
+    input_phase = models.CharField(max_length=2, default="p1")
+    pending_action = models.JSONField(null=True, blank=True)
+    winner = models.CharField(max_length=5, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Mis à jour à chaque tour : sert à expirer les combats abandonnés
+    updated_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ["-updated_at"]
+
+    def __str__(self):
+        return f"{self.team1.name} vs {self.team2.name} ({self.user.username})"
+
+    @classmethod
+    def start(cls, user, manager):
+        return cls.objects.create(
+            user=user,
+            team1=manager.team1,
+            team2=manager.team2,
+            state=encode_replay(manager),
+        )
+
+    def load(self):
+        """FightManager rejoué depuis l'état, ou None s'il est illisible."""
+        return replay(self.state, self.team1, self.team2)
+
+    def save_state(self, manager, **fields):
+        """
+        Enregistre l'état du manager (et `fields`) si personne ne l'a modifié
+        depuis la lecture. Retourne False en cas de conflit de version.
+        """
+        values = {
+            "state": encode_replay(manager),
+            "winner": manager.winner or "",
+            "updated_at": timezone.now(),
+            **fields,
+        }
+        # Le tour qui désigne le vainqueur enregistre aussi le résultat :
+        # tout est écrit, ou rien (conflit de version, erreur en cours)
+        with transaction.atomic():
+            updated = Fight.objects.filter(pk=self.pk, version=self.version).update(
+                version=F("version") + 1, **values
+            )
+            if not updated:
+                return False
+            if manager.winner and not self.winner:
+                FightResult.record(self, manager)
+
+        self.version += 1
+        for name, value in values.items():
+            setattr(self, name, value)
+        return True
+
+
+class FightResult(models.Model):
+    """
+    Combat terminé, enregistré par Fight.save_state au tour de la victoire
+    (avec l'XP des participants et les compteurs TrainerStats). L'historique
+    d'un dresseur se lit par clé (id décroissant), sans OFFSET. `replay` garde
+    le journal du combat (fight_logic.encode_replay) pour le revoir tour par
+    tour.
+    """
+
+    # XP par Pokémon : niveau moyen de l'équipe adverse × ce coefficient
+    WIN_XP = 20
+    LOSS_XP = 5
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="fight_results"
+    )
+    team1 = models.ForeignKey(
+        Team, on_delete=models.SET_NULL, null=True, related_name="+"
+    )
+    team2 = models.ForeignKey(
+        Team, on_delete=models.SET_NULL, null=True, related_name="+"
+    )
+    mode = models.CharField(max_length=3)
+    winner = models.CharField(max_length=5)
+    turns = models.PositiveIntegerField()
+    duration = models.DurationField()
+    finished_at = models.DateTimeField(default=timezone.now)
+    replay = models.BinaryField(default=b"")
+
+    class Meta:
+        ordering = ["-id"]
+        indexes = [models.Index(fields=["user", "-id"], name="fightresult_history")]
+
+    def __str__(self):
+        return f"Combat {self.pk} de {self.user.username} : victoire {self.winner}"
+
+    @classmethod
+    def experience_for(cls, manager, side):
+        """XP gagnée par chaque Pokémon de `side` ("team1" ou "team2")."""
+        opponents = manager.team2_state if side == "team1" else manager.team1_state
+        average = sum(p.level for p in opponents) / max(len(opponents), 1)
+        rate = cls.WIN_XP if manager.winner == side else cls.LOSS_XP
+        return max(1, round(average * rate))
+
+    @classmethod
+    def record(cls, fight, manager):
+        """
+        Résultat, XP et compteurs d'un combat terminé. Nombre de requêtes
+        borné : une écriture par table, plus le niveau moyen des équipes.
+        """
+        now = timezone.now()
+        result = cls.objects.create(
+            user=fight.user,
+            team1=fight.team1,
+            team2=fight.team2,
+            mode=manager.mode,
+            winner=manager.winner,
+            turns=manager.turn,
+            duration=now - fight.created_at,
+            finished_at=now,
+            replay=encode_replay(manager),
+        )
+
+        # XP des deux équipes en un seul UPDATE (montant choisi par ligne),
+        # limité aux Pokémon du joueur : en PvE, l'équipe adverse appartient à
+        # un autre dresseur qui n'a pas joué ce combat
+        team1_ids = [p.id for p in manager.team1_state]
+        team2_ids = [p.id for p in manager.team2_state]
+        PokemonCapture.objects.filter(
+            pk__in=team1_ids + team2_ids, user=fight.user_id
+        ).gain_experience(
+            Case(
+                When(pk__in=team1_ids, then=cls.experience_for(manager, "team1")),
+                default=cls.experience_for(manager, "team2"),
+            )
+        )
+
+        # Compteurs du joueur (taux calculé sur les anciennes valeurs + ce combat)
+        won = int(manager.winner == "team1")
+        TrainerStats.bump(
+            fight.user_id,
+            fights=F("fights") + 1,
+            wins=F("wins") + won,
+            losses=F("losses") + (1 - won),
+            win_rate=(F("wins") + won) * 1.0 / (F("fights") + 1),
+        )
+        return result
+
+
+class TrainerStats(models.Model):
+    """
+    Compteurs d'un dresseur pour le classement (voir leaderboard.py) : combats
+    du joueur 1 (FightResult.record), meilleur niveau, captures, espèces
+    différentes et Pokédex (signaux des captures). Réparables avec
+    manage.py rebuild_leaderboard.
+    """
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="trainer_stats"
+    )
+    fights = models.PositiveIntegerField(default=0)
+    wins = models.PositiveIntegerField(default=0)
+    losses = models.PositiveIntegerField(default=0)
+    win_rate = models.FloatField(default=0)
+    best_level = models.PositiveIntegerField(default=0)
+    captures = models.PositiveIntegerField(default=0)
+    species_count = models.PositiveSmallIntegerField(default=0)
+    # Un bit par espèce possédée (voir collection.py)
+    pokedex = models.BinaryField(default=b"")
+
+    class Meta:
+        # Un index par tri du classement : chaque page est une lecture d'index
+        indexes = [
+            models.Index(fields=["-wins", "user"], name="leaderboard_wins"),
+            models.Index(fields=["-win_rate", "user"], name="leaderboard_win_rate"),
+            models.Index(fields=["-best_level", "user"], name="leaderboard_level"),
+            models.Index(fields=["-species_count", "user"], name="leaderboard_species"),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} : {self.wins} V / {self.losses} D"
+
+    @classmethod
+    def bump(cls, user_id, **values):
+        """UPDATE des compteurs du dresseur, en créant sa ligne si besoin."""
+        if not cls.objects.filter(user_id=user_id).update(**values):
+            cls.objects.get_or_create(user_id=user_id)
+            cls.objects.filter(user_id=user_id).update(**values)
+
+    @classmethod
+    def refresh_best_level(cls, user_ids, **values):
+        """
+        Recalcule le meilleur niveau (un MAX par dresseur, sur son index), et
+        les autres compteurs de `values` dans le même UPDATE.
+        """
+        best = (
+            PokemonCapture.objects.filter(user=OuterRef("user"))
+            .order_by("-level")
+            .values("level")[:1]
+        )
+        cls.objects.filter(user_id__in=user_ids).update(
+            best_level=Coalesce(Subquery(best), 0), **values
+        )
+
+
+class SpeciesCaught(models.Model):
+    """Captures d'un dresseur par espèce : une ligne = une espèce différente."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    pokemon_id = models.IntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("user", "pokemon_id")
+
+    def __str__(self):
+        return f"{self.user.username} : #{self.pokemon_id} × {self.count}"
@@ -0,0 +1,201 @@
+"""
+Client PokeAPI partagé.
+
+Une seule `requests.Session` par processus (connexions keep-alive réutilisées,
+pas de nouvelle poignée de main TLS à chaque appel), un timeout sur chaque
+requête, un nombre de tentatives borné, et `fetch_many()` pour lancer en
+parallèle les appels indépendants d'une même page.
+
+`aget_json()` / `afetch_many()` exposent le même client aux vues async :
+chaque appel bloquant part dans un thread, la boucle d'événements reste libre.
+
+Si un cache est fourni (voir api_cache.py), une entrée fraîche évite l'appel,
+et une entrée expirée est revalidée avec If-None-Match / If-Modified-Since.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from .api_cache import TieredCache
+
+API_URL = "https://pokeapi.co/api/v2"
+
+# Codes HTTP pour lesquels une nouvelle tentative a du sens
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class PokeAPIClient:
+    def __init__(
+        self,
+        base_url=API_URL,
+        timeout=5.0,
+        retries=2,
+        backoff=0.2,
+        max_workers=6,
+        cache=None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.cache = cache
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_workers = max_workers
+
+        # Pool de connexions dimensionné pour les appels parallèles
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def url(self, path):
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.base_url}/{path.strip('/')}/"
+
+    def endpoint(self, url):
+        # "https://pokeapi.co/api/v2/pokemon-species/1/" -> "pokemon-species"
+        return url.removeprefix(self.base_url).strip("/").split("/")[0]
+
+    def get_json(self, path, timeout=None, retries=None):
+        """
+        GET sur l'API et retourne le JSON décodé (via le cache si présent).
+        Retourne None si la ressource n'existe pas ou si l'API reste
+        injoignable après `retries` nouvelles tentatives ; dans ce dernier
+        cas une entrée de cache périmée est servie si elle existe.
+        """
+        url = self.url(path)
+        entry = self.cache.get(url) if self.cache else None
+        if entry is not None and self.cache.is_fresh(entry):
+            return entry["data"]
+
+        headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self._get(url, headers, timeout, retries)
+
+        if response is None:
+            if entry is not None:
+                self.cache.stats.incr("stale_served")
+                return entry["data"]
+            return None
+        if response.status_code == 304 and entry is not None:
+            return self.cache.refresh(url, self.endpoint(url), entry)["data"]
+        if response.status_code != 200:
+            return None
+
+        data = response.json()
+        if self.cache:
+            self.cache.set(
+                url,
+                self.endpoint(url),
+                data,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        return data
+
+    def _get(self, url, headers, timeout, retries):
+        """GET avec timeout et budget de tentatives. None si l'API est HS."""
+        timeout = self.timeout if timeout is None else timeout
+        retries = self.retries if retries is None else retries
+
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                response = self.session.get(url, headers=headers, timeout=timeout)
+            except requests.exceptions.RequestException:
+                continue
+
+            if response.status_code not in RETRY_STATUSES:
+                return response
+        return None
+
+    def fetch_many(self, paths, timeout=None, retries=None):
+        """
+        Lance les GET en parallèle : la durée totale suit l'appel le plus lent
+        et non la somme. Les résultats sont dans l'ordre de `paths`.
+        """
+        paths = list(paths)
+        if len(paths) <= 1:
+            return [self.get_json(path, timeout, retries) for path in paths]
+
+        return list(
+            self.executor.map(lambda path: self.get_json(path, timeout, retries), paths)
+        )
+
+    async def aget_json(self, path, timeout=None, retries=None):
+        """Version async de get_json() pour les vues ASGI."""
+        return await asyncio.to_thread(self.get_json, path, timeout, retries)
+
+    async def afetch_many(self, paths, timeout=None, retries=None):
+        """Version async de fetch_many() : les appels sont attendus ensemble."""
+        return list(
+            await asyncio.gather(
+                *(self.aget_json(path, timeout, retries) for path in paths)
+            )
+        )
+
+    @property
+    def executor(self):
+        # Créé à la première utilisation, puis partagé par toutes les requêtes
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="pokeapi"
+                )
+        return self._executor
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Client partagé du processus, configuré par les réglages POKEAPI_*."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = PokeAPIClient(
+                base_url=settings.POKEAPI_BASE_URL,
+                timeout=settings.POKEAPI_TIMEOUT,
+                retries=settings.POKEAPI_RETRIES,
+                max_workers=settings.POKEAPI_MAX_WORKERS,
+                cache=TieredCache(
+                    lru_size=settings.POKEAPI_CACHE["LRU_SIZE"],
+                    backend=settings.POKEAPI_CACHE["BACKEND"],
+                    directory=settings.POKEAPI_CACHE["DIR"],
+                    ttls=settings.POKEAPI_CACHE["TTLS"],
+                ),
+            )
+    return _client
+
+
+@contextmanager
+def override_client(client):
+    """
+    Remplace le client partagé le temps du bloc (benchmarks) : le client
+    d'origine, et son cache disque, ne sont pas touchés.
+    """
+    global _client
+    with _client_lock:
+        previous, _client = _client, client
+    try:
+        yield client
+    finally:
+        with _client_lock:
+            _client = previous
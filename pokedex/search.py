@@ -0,0 +1,142 @@
+"""
+Index de recherche en mémoire pour la barre de recherche de l'accueil.
+
+Construit une seule fois par processus à partir des noms anglais et français
+de `utils.py` (dans l'ordre du Pokédex, donc l'ID est la position + 1).
+Gère les IDs, les préfixes, les sous-chaînes, les accents et les fautes de
+frappe (similarité de trigrammes), sans aucun appel réseau.
+"""
+
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from functools import cache
+
+from .utils import FRENCH_TO_ENGLISH
+
+# Score minimum (coefficient de Dice sur les trigrammes) pour une faute de frappe
+FUZZY_THRESHOLD = 0.4
+
+
+def normalize(text):
+    """'Salamèche' -> 'salameche', 'Mr. Mime' -> 'mrmime'."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if c.isalnum())
+
+
+def trigrams(key):
+    # Les espaces de bordure donnent du poids au début et à la fin du mot
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b):
+    """Distance de Levenshtein (noms courts : le calcul reste négligeable)."""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (char_a != char_b),
+                )
+            )
+        previous = current
+    return previous[-1]
+
+
+class SearchIndex:
+    def __init__(self, names):
+        """`names` : liste de (pokemon_id, nom) ; plusieurs noms par ID possibles."""
+        self.ids = set()
+        self.keys = []  # (clé normalisée, id) triés, pour les préfixes
+        self.grams = {}  # clé -> trigrammes
+        self.postings = defaultdict(set)  # trigramme -> clés
+
+        for pokemon_id, name in names:
+            key = normalize(name)
+            if not key:
+                continue
+            self.ids.add(pokemon_id)
+            self.keys.append((key, pokemon_id))
+            if key not in self.grams:
+                self.grams[key] = trigrams(key)
+                for gram in self.grams[key]:
+                    self.postings[gram].add(key)
+        self.keys.sort()
+
+        self.ids_by_key = defaultdict(set)
+        for key, pokemon_id in self.keys:
+            self.ids_by_key[key].add(pokemon_id)
+
+    def search(self, query, limit=6):
+        """IDs correspondant à la recherche, les meilleurs en premier."""
+        query = query.strip()
+        if query.isdigit():
+            return [int(query)] if int(query) in self.ids else []
+
+        key = normalize(query)
+        if not key:
+            return []
+
+        # Rang : 0 exact, 1 préfixe, 2 sous-chaîne, [3, 4[ faute de frappe
+        ranks = {}
+
+        def add(pokemon_ids, rank):
+            for pokemon_id in pokemon_ids:
+                if rank < ranks.get(pokemon_id, (4,))[0]:
+                    ranks[pokemon_id] = (rank, pokemon_id)
+
+        add(self.ids_by_key.get(key, ()), 0)
+
+        start = bisect_left(self.keys, (key,))
+        for candidate, pokemon_id in self.keys[start:]:
+            if not candidate.startswith(key):
+                break
+            add([pokemon_id], 1)
+
+        for candidate in self._substring_candidates(key):
+            if key in candidate:
+                add(self.ids_by_key[candidate], 2)
+
+        # Fautes de frappe : seulement si rien ne correspond directement
+        if not ranks:
+            for candidate in self._fuzzy(key):
+                # Départage par distance d'édition, relative à la longueur
+                distance = edit_distance(key, candidate)
+                rank = 3 + distance / max(len(key), len(candidate))
+                add(self.ids_by_key[candidate], rank)
+
+        return [pokemon_id for _, pokemon_id in sorted(ranks.values())][:limit]
+
+    def _substring_candidates(self, key):
+        if len(key) < 3:
+            return self.grams.keys()
+        # Une clé qui contient la recherche contient tous ses trigrammes internes
+        inner = [key[i : i + 3] for i in range(len(key) - 2)]
+        postings = sorted((self.postings.get(g, set()) for g in inner), key=len)
+        return set.intersection(*postings)
+
+    def _fuzzy(self, key):
+        query_grams = trigrams(key)
+        shared = defaultdict(int)
+        for gram in query_grams:
+            for candidate in self.postings.get(gram, ()):
+                shared[candidate] += 1
+
+        matches = []
+        for candidate, count in shared.items():
+            score = 2 * count / (len(query_grams) + len(self.grams[candidate]))
+            if score >= FUZZY_THRESHOLD:
+                matches.append(candidate)
+        return matches
+
+
+@cache
+def get_search_index():
+    names = []
+    for position, (name_fr, name_en) in enumerate(FRENCH_TO_ENGLISH.items()):
+        names += [(position + 1, name_fr), (position + 1, name_en)]
+    return SearchIndex(names)
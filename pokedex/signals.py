@@ -0,0 +1,69 @@
+"""
+Signaux qui gardent à jour les données dérivées des équipes :
+Team.roster_size / is_ready et le pool de matchmaking (voir matchmaking.py),
+ainsi que les compteurs du classement (voir leaderboard.py).
+Branchés dans PokedexConfig.ready().
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .leaderboard import capture_added, capture_leveled, capture_removed
+from .matchmaking import fill_slot, refresh_team
+from .models import MatchmakingEntry, MatchmakingPool, PokemonCapture, Team
+
+
+def rosters_changed(teams):
+    for team in teams:
+        team.refresh_roster()
+        refresh_team(team.pk)
+
+
+@receiver(m2m_changed, sender=Team.pokemons.through)
+def team_roster_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # team.pokemons.add/remove/clear(...) : on met aussi l'instance à jour
+        if action in ("post_add", "post_remove", "post_clear"):
+            rosters_changed([instance])
+    elif action == "pre_clear":
+        # pokemon.teams.clear() : les équipes ne sont plus connues après coup
+        instance._cleared_teams = list(instance.teams.all())
+    elif action == "post_clear":
+        rosters_changed(instance._cleared_teams)
+    elif action in ("post_add", "post_remove"):
+        rosters_changed(Team.objects.filter(pk__in=pk_set))
+
+
+@receiver(post_save, sender=PokemonCapture)
+def capture_saved(sender, instance, created, **kwargs):
+    if created:
+        capture_added(instance)
+        return
+    # Le niveau a pu changer : niveau moyen des équipes concernées
+    for team_id in instance.teams.values_list("pk", flat=True):
+        refresh_team(team_id)
+    capture_leveled(instance)
+
+
+@receiver(pre_delete, sender=PokemonCapture)
+def capture_deleting(sender, instance, **kwargs):
+    # Les lignes de la table M2M partent en cascade, sans m2m_changed
+    instance._deleted_from_teams = list(instance.teams.all())
+
+
+@receiver(post_delete, sender=PokemonCapture)
+def capture_deleted(sender, instance, **kwargs):
+    rosters_changed(getattr(instance, "_deleted_from_teams", ()))
+    capture_removed(instance)
+
+
+@receiver(pre_delete, sender=MatchmakingEntry)
+def matchmaking_entry_deleting(sender, instance, **kwargs):
+    # Verrou du pool avant le DELETE (y compris en cascade depuis Team) :
+    # fill_slot déplacera le dernier slot sans qu'un autre ne l'ait pris
+    MatchmakingPool.lock()
+
+
+@receiver(post_delete, sender=MatchmakingEntry)
+def matchmaking_entry_deleted(sender, instance, **kwargs):
+    fill_slot(instance.slot)
@@ -0,0 +1,142 @@
+"""
+Simulation de combats en masse avec NumPy, pour l'équilibrage.
+
+Mêmes règles que `FightManager` en mode PvE, le joueur 1 jouant la
+politique la plus simple (attaquer, ou envoyer le premier Pokémon vivant
+quand l'actif est KO) :
+
+- PV max = stats réelles de l'espèce à son niveau (stats.py)
+- dégâts = max(1, (niveau * 2 + aléa entier dans [-5, 5]) * efficacité du
+  type principal de l'attaquant contre les types du défenseur (type_chart.py)
+- le joueur 1 frappe en premier ; un switch lui coûte son attaque
+- l'IA remplace son Pokémon KO au tour suivant, puis attaque
+
+Chaque étape NumPy fait avancer d'un tour tous les combats encore en cours ;
+les combats terminés sont retirés des tableaux au fil de l'eau.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from . import stats
+from .type_chart import DUAL, species_types
+
+# Taille des lots : borne la mémoire quel que soit le nombre de combats
+BATCH_SIZE = 100_000
+
+
+def _species(levels, species):
+    # Sans n° d'espèce : espèce inconnue (stats par défaut, type normal)
+    if species is None:
+        return np.zeros(len(levels), dtype=np.intp)
+    return species
+
+
+def max_hp(levels, species=None):
+    """PV max de chaque Pokémon ; espèce inconnue si `species` est absent."""
+    return stats.max_hp(_species(levels, species), levels)
+
+
+def multipliers(attackers, defenders):
+    """Efficacité de chaque Pokémon de `attackers` contre chaque défenseur."""
+    attack_types, _ = species_types(attackers)
+    _, defense_pairs = species_types(defenders)
+    return DUAL[attack_types[:, None], defense_pairs[None, :]]
+
+
+@dataclass
+class SimulationResult:
+    winners: np.ndarray  # 1 ou 2 pour chaque combat
+    turns: np.ndarray  # nombre de tours de chaque combat
+
+    @property
+    def n(self):
+        return len(self.winners)
+
+    def win_rate(self, team):
+        return float(np.mean(self.winners == team))
+
+    def turn_percentiles(self, percentiles=(50, 90, 99)):
+        values = np.percentile(self.turns, percentiles, method="lower")
+        return dict(zip(percentiles, (int(v) for v in values)))
+
+    def turn_histogram(self):
+        """{nombre de tours: nombre de combats}, trié."""
+        counts = np.bincount(self.turns)
+        return {turn: int(c) for turn, c in enumerate(counts) if c}
+
+
+def simulate(
+    levels1, levels2, n, seed=None, batch_size=BATCH_SIZE, species1=None, species2=None
+):
+    """
+    Simule `n` combats indépendants entre deux équipes (listes de niveaux,
+    et des n° d'espèces pour leurs PV et leurs types).
+    """
+    if not len(levels1) or not len(levels2):
+        raise ValueError("Chaque équipe doit avoir au moins un Pokémon.")
+    species1, species2 = _species(levels1, species1), _species(levels2, species2)
+    hp1, hp2 = max_hp(levels1, species1), max_hp(levels2, species2)
+    fight = (hp1, hp2, multipliers(species1, species2), multipliers(species2, species1))
+
+    rng = np.random.default_rng(seed)
+    winners = np.empty(n, dtype=np.int8)
+    turns = np.empty(n, dtype=np.int32)
+    for start in range(0, n, batch_size):
+        stop = min(n, start + batch_size)
+        winners[start:stop], turns[start:stop] = _simulate_batch(
+            levels1, levels2, *fight, stop - start, rng
+        )
+    return SimulationResult(winners, turns)
+
+
+def _simulate_batch(levels1, levels2, max_hp1, max_hp2, mult12, mult21, size, rng):
+    levels1 = np.asarray(levels1, dtype=np.int32)
+    levels2 = np.asarray(levels2, dtype=np.int32)
+
+    # Un combat par ligne ; on ne garde que les combats en cours
+    hp1 = np.tile(max_hp1, (size, 1))
+    hp2 = np.tile(max_hp2, (size, 1))
+    active1 = np.zeros(size, dtype=np.intp)
+    active2 = np.zeros(size, dtype=np.intp)
+    running = np.arange(size)
+
+    winners = np.zeros(size, dtype=np.int8)
+    turns = np.zeros(size, dtype=np.int32)
+    turn = 0
+
+    while running.size:
+        turn += 1
+        rows = np.arange(running.size)
+
+        # Switchs : premier Pokémon vivant à la place de l'actif KO
+        switch1 = hp1[rows, active1] == 0
+        active1 = np.where(switch1, (hp1 > 0).argmax(axis=1), active1)
+        switch2 = hp2[rows, active2] == 0
+        active2 = np.where(switch2, (hp2 > 0).argmax(axis=1), active2)
+
+        # P1 attaque (sauf s'il vient de switcher)
+        dmg = levels1[active1] * 2 + rng.integers(-5, 6, rows.size)
+        dmg = np.maximum(1, (dmg * mult12[active1, active2]).astype(np.int32))
+        hp2[rows, active2] -= np.where(switch1, 0, dmg)
+        np.maximum(hp2, 0, out=hp2)
+        won1 = ~(hp2 > 0).any(axis=1)
+
+        # P2 riposte si son Pokémon est encore debout
+        dmg = levels2[active2] * 2 + rng.integers(-5, 6, rows.size)
+        dmg = np.maximum(1, (dmg * mult21[active2, active1]).astype(np.int32))
+        hp1[rows, active1] -= np.where(hp2[rows, active2] > 0, dmg, 0)
+        np.maximum(hp1, 0, out=hp1)
+        won2 = ~(hp1 > 0).any(axis=1)
+
+        done = won1 | won2
+        winners[running[done]] = np.where(won1[done], 1, 2)
+        turns[running[done]] = turn
+
+        keep = ~done
+        running = running[keep]
+        hp1, hp2 = hp1[keep], hp2[keep]
+        active1, active2 = active1[keep], active2[keep]
+
+    return winners, turns
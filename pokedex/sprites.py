@@ -0,0 +1,234 @@
+"""
+Miroir local des sprites et artworks (manage.py mirror_sprites).
+
+Chaque image de raw.githubusercontent.com est téléchargée une fois puis
+déclinée en largeurs réduites (VARIANTS), en PNG et en WebP. Les fichiers
+sont nommés par le hash de leur contenu : une URL ne change jamais de
+contenu, elle est servie avec un cache « immutable » (vue sprite_file) et
+une nouvelle image a une nouvelle URL. manifest.json associe chaque
+espèce à ses variantes.
+
+`build_atlas()` regroupe les images du miroir en quelques planches et une
+feuille de style (une classe par espèce) : les pages qui montrent des
+dizaines de Pokémon (équipes, sélecteurs de combat) ne chargent que ces
+planches, une fois, au lieu d'une image par Pokémon.
+
+`sprite_url()` (tag {% sprite %}) choisit la plus petite variante qui
+remplit l'emplacement et retombe sur l'image distante si l'espèce n'est
+pas encore dans le miroir.
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from django.conf import settings
+from django.urls import reverse
+from PIL import Image
+
+REMOTE_URL = "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon"
+
+# Image d'origine par type, et largeurs produites (px) en plus de l'original
+KINDS = {
+    "sprite": f"{REMOTE_URL}/{{id}}.png",
+    "artwork": f"{REMOTE_URL}/other/official-artwork/{{id}}.png",
+}
+VARIANTS = {
+    "sprite": (),  # pixel art 96 px : déjà petit, réduit il devient illisible
+    "artwork": (64, 96, 128, 192, 256),
+}
+FORMATS = ("webp", "png")
+
+# Planches (manage.py build_sprite_atlas) : cases de 96 px, 16 × 8 par planche
+ATLAS_TILE = 96
+ATLAS_COLUMNS = 16
+ATLAS_ROWS = 8
+
+# Nom d'un fichier du miroir : hash du contenu + extension
+FILE_NAME = re.compile(r"^[0-9a-f]{20}\.(webp|png|css)$")
+CONTENT_TYPES = {"webp": "image/webp", "png": "image/png", "css": "text/css"}
+
+_manifest = {"key": None, "data": {}}
+
+
+def mirror_dir():
+    return Path(settings.SPRITE_MIRROR_DIR)
+
+
+def _write(data, ext):
+    """Écrit `data` sous le hash de son contenu ; retourne le nom du fichier."""
+    name = f"{hashlib.sha256(data).hexdigest()[:20]}.{ext}"
+    path = mirror_dir() / name
+    if not path.exists():
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    return name
+
+
+def _store(image, fmt, lossless=False):
+    buffer = io.BytesIO()
+    if fmt == "webp":
+        image.save(buffer, "WEBP", quality=85, method=6, lossless=lossless)
+    else:
+        image.save(buffer, "PNG", optimize=True)
+    return _write(buffer.getvalue(), fmt)
+
+
+def variants(data, kind):
+    """
+    Décline une image : [[largeur, {format: nom}]], par largeur croissante
+    (l'original en dernier).
+    """
+    mirror_dir().mkdir(parents=True, exist_ok=True)
+    original = Image.open(io.BytesIO(data))
+    original.load()
+    if original.mode not in ("RGBA", "RGB"):
+        original = original.convert("RGBA")
+
+    widths = [w for w in VARIANTS[kind] if w < original.width] + [original.width]
+    result = []
+    for width in widths:
+        image = original
+        if width != original.width:
+            height = round(original.height * width / original.width)
+            image = original.resize((width, height), Image.Resampling.LANCZOS)
+        result.append([width, {fmt: _store(image, fmt) for fmt in FORMATS}])
+    return result
+
+
+def load_manifest():
+    """Manifest du miroir, relu seulement quand le fichier change."""
+    path = mirror_dir() / "manifest.json"
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return {}
+    if (path, mtime) != _manifest["key"]:
+        _manifest["data"] = json.loads(path.read_text(encoding="utf-8"))
+        _manifest["key"] = (path, mtime)
+    return _manifest["data"]
+
+
+def save_manifest(data):
+    path = mirror_dir() / "manifest.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def mirror(pokemon_ids, kinds=tuple(KINDS), workers=6, force=False, session=None):
+    """
+    Télécharge et décline les images manquantes (toutes si `force`).
+    Retourne (images ajoutées, échecs) ; le manifest est écrit à la fin.
+    """
+    mirror_dir().mkdir(parents=True, exist_ok=True)
+    manifest = dict(load_manifest())
+    session = session or requests.Session()
+
+    todo = [
+        (kind, pokemon_id)
+        for kind in kinds
+        for pokemon_id in pokemon_ids
+        if force or str(pokemon_id) not in manifest.get(kind, {})
+    ]
+
+    def fetch(job):
+        kind, pokemon_id = job
+        try:
+            response = session.get(KINDS[kind].format(id=pokemon_id), timeout=10)
+            response.raise_for_status()
+            return job, variants(response.content, kind)
+        except (requests.RequestException, OSError):
+            return job, None
+
+    added, failed = 0, []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for (kind, pokemon_id), result in executor.map(fetch, todo):
+            if result is None:
+                failed.append((kind, pokemon_id))
+                continue
+            manifest.setdefault(kind, {})[str(pokemon_id)] = result
+            added += 1
+    save_manifest(manifest)
+    return added, failed
+
+
+def sprite_url(pokemon_id, kind="artwork", size=None, fmt="webp"):
+    """
+    URL de l'image de l'espèce : la plus petite variante d'au moins `size`
+    px de large (l'original si aucune ou si size est None), sinon l'image
+    distante.
+    """
+    entries = load_manifest().get(kind, {}).get(str(pokemon_id))
+    if not entries:
+        return KINDS[kind].format(id=pokemon_id)
+    names = entries[-1][1]
+    if size is not None:
+        names = next((n for width, n in entries if width >= int(size)), names)
+    return reverse("sprite_file", args=[names[fmt]])
+
+
+def _tile(entries):
+    """Case de la planche : la plus petite variante qui la remplit, centrée."""
+    names = next((n for width, n in entries if width >= ATLAS_TILE), entries[-1][1])
+    image = Image.open(mirror_dir() / names["png"]).convert("RGBA")
+    image.thumbnail((ATLAS_TILE, ATLAS_TILE), Image.Resampling.LANCZOS)
+    tile = Image.new("RGBA", (ATLAS_TILE, ATLAS_TILE))
+    tile.paste(
+        image, ((ATLAS_TILE - image.width) // 2, (ATLAS_TILE - image.height) // 2)
+    )
+    return tile
+
+
+def build_atlas(kinds=tuple(KINDS)):
+    """
+    Planches des espèces du miroir et leur feuille de style. Positions en
+    pourcentage : une case s'affiche à n'importe quelle taille (w-8, w-24).
+    Retourne le nombre de planches.
+    """
+    manifest = dict(load_manifest())
+    per_sheet = ATLAS_COLUMNS * ATLAS_ROWS
+    rules = [
+        ".atlas{display:inline-block;background-repeat:no-repeat;"
+        f"background-size:{ATLAS_COLUMNS * 100}% {ATLAS_ROWS * 100}%}}"
+    ]
+    species, sheets = {}, 0
+    for kind in kinds:
+        ids = sorted(manifest.get(kind, {}), key=int)
+        for start in range(0, len(ids), per_sheet):
+            chunk = ids[start : start + per_sheet]
+            sheet = Image.new(
+                "RGBA", (ATLAS_COLUMNS * ATLAS_TILE, ATLAS_ROWS * ATLAS_TILE)
+            )
+            for i, pokemon_id in enumerate(chunk):
+                x, y = i % ATLAS_COLUMNS, i // ATLAS_COLUMNS
+                sheet.paste(
+                    _tile(manifest[kind][pokemon_id]), (x * ATLAS_TILE, y * ATLAS_TILE)
+                )
+            url = reverse("sprite_file", args=[_store(sheet, "webp", lossless=True)])
+            sheets += 1
+            for i, pokemon_id in enumerate(chunk):
+                x = i % ATLAS_COLUMNS * 100 / (ATLAS_COLUMNS - 1)
+                y = i // ATLAS_COLUMNS * 100 / (ATLAS_ROWS - 1)
+                rules.append(
+                    f".atlas-{kind}-{pokemon_id}{{background-image:url({url});"
+                    f"background-position:{x:.4g}% {y:.4g}%}}"
+                )
+        species[kind] = ids
+
+    css = _write("\n".join(rules).encode(), "css")
+    manifest["atlas"] = {"css": css, "species": species}
+    save_manifest(manifest)
+    return sheets
+
+
+def atlas():
+    """Planches du manifest : {"css": nom, "species": {type: [ids]}}, ou None."""
+    return load_manifest().get("atlas")
@@ -0,0 +1,127 @@
+"""
+Stats réelles des Pokémon, calculées en NumPy.
+
+Les stats de base du catalogue (SpeciesStats) sont chargées une fois par
+processus dans un tableau espèces × 6 (ordre de PokeAPI : PV, Attaque,
+Défense, Atq. Spé., Déf. Spé., Vitesse). `real_stats()` calcule ensuite les
+stats d'un lot quelconque de (espèce, niveau) en une opération vectorisée,
+sans appel à PokeAPI :
+
+- PV = 2 * base * niveau // 100 + niveau + 10
+- autres = 2 * base * niveau // 100 + 5
+
+Une espèce absente du catalogue prend DEFAULT_BASE partout. La version du
+catalogue est lue en base (nombre d'espèces, dernière synchro) au plus une
+fois toutes les CATALOG_CHECK_INTERVAL secondes par processus : un
+sync_catalog lancé à part est vu par tous les workers après ce délai, et
+store_records() force la relecture dans son propre processus.
+"""
+
+import time
+
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+
+from .utils import FRENCH_TO_ENGLISH
+
+# Colonnes du tableau, dans l'ordre de SpeciesStats.STAT_NAMES
+HP, ATTACK, DEFENSE, SPECIAL_ATTACK, SPECIAL_DEFENSE, SPEED = range(6)
+STAT_LABELS = ["PV", "Attaque", "Défense", "Atq. Spé.", "Déf. Spé.", "Vitesse"]
+DEFAULT_BASE = 50
+
+# Délai (s) entre deux lectures de la version du catalogue
+CATALOG_CHECK_INTERVAL = 30
+
+_version = {"value": None, "checked": None}
+_table = {"version": None, "base": None}
+
+
+def catalog_changed():
+    """À appeler quand le catalogue change (catalog.store_records)."""
+    _version["checked"] = None
+
+
+def _version_is_old():
+    checked = _version["checked"]
+    return checked is None or time.monotonic() - checked >= CATALOG_CHECK_INTERVAL
+
+
+def _read_version():
+    # Import local : fight_logic (importé par models) utilise ce module
+    from .models import Species
+
+    row = Species.objects.aggregate(count=Count("id"), synced=Max("synced_at"))
+    _version.update(value=(row["count"], row["synced"]), checked=time.monotonic())
+    return _version["value"]
+
+
+def catalog_version():
+    """(nombre d'espèces, dernière synchro) du catalogue, relu en base si ancien."""
+    if _version_is_old():
+        return _read_version()
+    return _version["value"]
+
+
+async def acatalog_version():
+    if _version_is_old():
+        return await sync_to_async(_read_version)()
+    return _version["value"]
+
+
+def _load(version):
+    # Import local : fight_logic (importé par models) utilise ce module
+    from .models import SpeciesStats
+
+    fields = [name.replace("-", "_") for name in SpeciesStats.STAT_NAMES]
+    rows = np.array(
+        SpeciesStats.objects.values_list("species_id", *fields), dtype=np.int32
+    ).reshape(-1, 7)
+    size = max(len(FRENCH_TO_ENGLISH), int(rows[:, 0].max(initial=0))) + 1
+    # Ligne 0 : stats par défaut (espèce inconnue)
+    base = np.full((size, 6), DEFAULT_BASE, dtype=np.int32)
+    base[rows[:, 0]] = rows[:, 1:]
+    _table.update(version=version, base=base)
+    return base
+
+
+def base_table():
+    """Tableau des stats de base (ligne = n° du Pokédex), à jour du catalogue."""
+    version = catalog_version()
+    if _table["base"] is None or _table["version"] != version:
+        return _load(version)
+    return _table["base"]
+
+
+async def abase_table():
+    version = await acatalog_version()
+    if _table["base"] is None or _table["version"] != version:
+        return await sync_to_async(_load)(version)
+    return _table["base"]
+
+
+def compute(base, species_ids, levels):
+    """Stats réelles (forme de species_ids + (6,)) à partir d'un tableau de base."""
+    species = np.asarray(species_ids, dtype=np.intp)
+    levels = np.asarray(levels, dtype=np.int32)
+    species = np.where((species > 0) & (species < len(base)), species, 0)
+
+    real = base[species] * 2 * levels[..., None] // 100 + 5
+    real[..., HP] += levels + 5
+    return real
+
+
+def real_stats(species_ids, levels):
+    """
+    Stats réelles d'un lot : real_stats([25, 1], [10, 12]) -> tableau 2 × 6.
+    Un couple de scalaires donne une seule ligne de 6 stats.
+    """
+    return compute(base_table(), species_ids, levels)
+
+
+async def areal_stats(species_ids, levels):
+    return compute(await abase_table(), species_ids, levels)
+
+
+def max_hp(species_ids, levels):
+    return real_stats(species_ids, levels)[..., HP]
@@ -0,0 +1,48 @@
+from django import template
+
+from pokedex.fight_logic import (
+    DAMAGE,
+    KO,
+    NO_POKEMON,
+    SWITCH,
+    SWITCH_FAILED,
+    TURN,
+    VICTORY,
+)
+
+register = template.Library()
+
+
+def describe(event, state):
+    """Texte d'un événement du journal, avec les noms tirés de l'état."""
+    team = state["team1" if event.side == 1 else "team2"]
+    other = state["team2" if event.side == 1 else "team1"]
+
+    if event.kind == TURN:
+        return f"--- Tour {event.value} ---"
+    if event.kind == SWITCH:
+        nickname = team["pokemons"][event.index].nickname
+        if event.side == 2 and state["mode"] == "pve":
+            return f"L'adversaire envoie {nickname} !"
+        return f"{team['trainer']} envoie {nickname} !"
+    if event.kind == SWITCH_FAILED:
+        if event.side == 1:
+            return f"Switch impossible vers {event.value}."
+        return f"Switch inv. P2 vers {event.value}."
+    if event.kind == DAMAGE:
+        attacker = team["pokemons"][event.index].nickname
+        defender = other["pokemons"][event.target].nickname
+        return f"{attacker} attaque ! {event.value} dégâts à {defender}."
+    if event.kind == KO:
+        return f"{team['pokemons'][event.index].nickname} est KO !"
+    if event.kind == NO_POKEMON:
+        return "L'adversaire n'a plus de Pokémon !"
+    if event.kind == VICTORY:
+        return f"{team['name']} remporte la victoire !"
+    return ""
+
+
+@register.filter
+def battle_log(state):
+    """{% for line in state|battle_log %} : le journal en texte, au rendu."""
+    return [describe(event, state) for event in state["log"]]
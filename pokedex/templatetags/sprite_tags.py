@@ -0,0 +1,51 @@
+from django import template
+from django.urls import reverse
+from django.utils.html import format_html
+
+from pokedex.sprites import atlas, sprite_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def sprite(pokemon_id, kind="artwork", size=None):
+    """
+    {% sprite p.pokemon_id "artwork" 128 %} : URL de la plus petite variante
+    du miroir d'au moins 128 px de large (image distante hors miroir).
+    """
+    return sprite_url(pokemon_id, kind, size)
+
+
+@register.simple_tag
+def sprite_atlas_css():
+    """<link> de la feuille de style des planches, si elles sont construites."""
+    sheets = atlas()
+    if not sheets:
+        return ""
+    return format_html(
+        '<link rel="stylesheet" href="{}">',
+        reverse("sprite_file", args=[sheets["css"]]),
+    )
+
+
+@register.simple_tag
+def sprite_icon(pokemon_id, kind="sprite", css_class="", alt=""):
+    """
+    {% sprite_icon p.pokemon_id "sprite" "w-8 h-8" p.name %} : case de la
+    planche (aucune image à charger en plus), ou <img> si l'espèce n'y est pas.
+    """
+    sheets = atlas()
+    if sheets and str(pokemon_id) in sheets["species"].get(kind, ()):
+        return format_html(
+            '<span class="atlas atlas-{}-{} {}" role="img" aria-label="{}"></span>',
+            kind,
+            pokemon_id,
+            css_class,
+            alt,
+        )
+    return format_html(
+        '<img src="{}" class="{} object-contain" alt="{}" loading="lazy">',
+        sprite_url(pokemon_id, kind, 96),
+        css_class,
+        alt,
+    )
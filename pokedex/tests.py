@@ -1,9 +1,93 @@
+import io
+import json
+import random
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+from urllib.parse import quote
+
+import requests
+from django.apps import apps as django_apps
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.http import QueryDict
+from django.test import LiveServerTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import (
+    benchmarks,
+    collection,
+    leaderboard,
+    loadtest,
+    sprites,
+    stats,
+    type_chart,
+)
+from . import urls as pokedex_urls
+from .api_cache import TieredCache
+from .benchmarks import BUDGETS
+from .catalog import fetch_records, store_records
+from .fake_pokeapi import FakePokeAPIServer, pokemon_payload
+from .fight_logic import (
+    DAMAGE,
+    LOG_SIZE,
+    TURN,
+    FightManager,
+    encode_replay,
+    replay,
+)
+from .leveling import apply_experience
+from .matchmaking import pick_opponent, rebuild_pool
+from .models import (
+    Fight,
+    FightResult,
+    MatchmakingEntry,
+    MatchmakingPool,
+    PokemonCapture,
+    Species,
+    SpeciesCaught,
+    Team,
+    TrainerStats,
+)
+from .pokeapi import PokeAPIClient, get_client
+from .search import get_search_index
+from .simulation import simulate
+from .templatetags.fight_tags import battle_log
+
 
-from .fight_logic import FightManager
-from .models import PokemonCapture, Team
+def make_record(pokemon_id, name, name_fr, types=("normal",), base=50):
+    # Enregistrement au format des dumps de sync_catalog
+    return {
+        "id": pokemon_id,
+        "name": name,
+        "name_fr": name_fr,
+        "types": list(types),
+        "height": 7,
+        "weight": 69,
+        "description_fr": f"Description de {name_fr}.",
+        "sprite": f"https://example.com/{pokemon_id}.png",
+        "artwork": f"https://example.com/artwork/{pokemon_id}.png",
+        "stats": {
+            "hp": base,
+            "attack": base,
+            "defense": base,
+            "special-attack": base,
+            "special-defense": base,
+            "speed": base,
+        },
+    }
 
 
 class TeamTests(TestCase):
@@ -102,6 +186,106 @@ class TeamTests(TestCase):
         self.assertEqual(teams[1].position, 1)
         self.assertEqual(teams[2].position, 2)
 
+    # Test du compteur dénormalisé roster_size / is_ready
+    def test_roster_size_follows_changes(self):
+        team = Team.objects.create(user=self.user, name="Équipe 1", position=0)
+        team.pokemons.add(*self.pokemons[:5])
+        self.assertEqual(team.roster_size, 5)
+        self.assertTrue(team.is_ready_for_battle())
+
+        team.pokemons.remove(self.pokemons[0])
+        self.pokemons[1].delete()
+        self.pokemons[2].teams.clear()
+        self.pokemons[5].teams.add(team)
+
+        team.refresh_from_db()
+        self.assertEqual(team.roster_size, 3)
+        self.assertFalse(team.is_ready)
+
+    def test_repair_rosters_command(self):
+        team = Team.objects.create(user=self.user, name="Équipe 1", position=0)
+        team.pokemons.add(*self.pokemons[:5])
+        Team.objects.filter(pk=team.pk).update(roster_size=0, is_ready=False)
+
+        out = StringIO()
+        call_command("repair_rosters", stdout=out)
+        self.assertIn("1 équipes corrigées", out.getvalue())
+        team.refresh_from_db()
+        self.assertEqual((team.roster_size, team.is_ready), (5, True))
+        self.assertTrue(MatchmakingEntry.objects.filter(team=team).exists())
+
+
+class LevelingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="xp", password="pw")
+
+    def _loop(self, level, experience, amount):
+        # Ancienne montée de niveau, niveau par niveau
+        experience += amount
+        while experience >= 100 * level:
+            experience -= 100 * level
+            level += 1
+        return level, experience
+
+    def test_closed_form_matches_level_by_level(self):
+        rng = random.Random(0)
+        for _ in range(2000):
+            level = rng.randint(1, 100)
+            experience = rng.randrange(100 * level)
+            amount = rng.choice([0, 1, 99, 100, rng.randint(0, 10**7)])
+            self.assertEqual(
+                apply_experience(level, experience, amount),
+                self._loop(level, experience, amount),
+            )
+
+    def test_gain_experience(self):
+        capture = PokemonCapture.objects.create(
+            user=self.user, pokemon_id=1, name="P", level=3, experience=250
+        )
+
+        self.assertFalse(capture.gain_experience(49))
+        self.assertTrue(capture.gain_experience(10**6))
+        self.assertEqual(
+            (capture.level, capture.experience), self._loop(3, 250, 49 + 10**6)
+        )
+
+    def test_concurrent_gains_are_not_lost(self):
+        capture = PokemonCapture.objects.create(user=self.user, pokemon_id=1, name="P")
+        first = PokemonCapture.objects.get(pk=capture.pk)
+        second = PokemonCapture.objects.get(pk=capture.pk)
+
+        # Deux combats chargent le même Pokémon avant de le créditer
+        first.gain_experience(60)
+        second.gain_experience(60)
+
+        self.assertEqual((second.level, second.experience), (2, 20))
+
+    def test_team_gain_experience_in_bulk(self):
+        team = Team.objects.create(user=self.user, name="T", position=0)
+        for level in (1, 5, 10, 20, 40):
+            team.pokemons.add(
+                PokemonCapture.objects.create(
+                    user=self.user, pokemon_id=1, name="P", level=level
+                )
+            )
+        outsider = PokemonCapture.objects.create(user=self.user, pokemon_id=1, name="P")
+
+        # Équipes et dresseurs concernés, l'UPDATE, puis le niveau moyen du
+        # matchmaking et le meilleur niveau du classement
+        with self.assertNumQueries(8):
+            self.assertEqual(team.gain_experience(2500), 5)
+
+        levels = [
+            (p.level, p.experience) for p in team.pokemons.order_by("level", "pk")
+        ]
+        self.assertEqual(levels, [self._loop(lv, 0, 2500) for lv in (1, 5, 10, 20, 40)])
+        outsider.refresh_from_db()
+        self.assertEqual(outsider.level, 1)
+        team.matchmaking.refresh_from_db()
+        self.assertEqual(
+            team.matchmaking.avg_level, sum(lv for lv, _ in levels) / len(levels)
+        )
+
 
 class FightTests(TestCase):
     def setUp(self):
@@ -191,6 +375,279 @@ class FightTests(TestCase):
         self.assertTrue(last_p["fainted"])
         self.assertEqual(manager.winner, "team1")
 
+    def _play(self, manager, turns):
+        # Attaquer, switcher si KO ; un switch vers 2 au tour 3
+        for turn in range(turns):
+            if manager.winner:
+                break
+            state = manager.team1_state
+            if turn == 2:
+                manager.execute_turn({"type": "switch", "index": 2})
+            elif state[manager.active_p1].fainted:
+                alive = next(i for i, p in enumerate(state) if not p.fainted)
+                manager.execute_turn({"type": "switch", "index": alive})
+            else:
+                manager.execute_turn({"type": "attack"})
+        return manager
+
+    def test_replay_roundtrip(self):
+        manager = self._play(FightManager(self.team1, self.team2), 8)
+        restored = replay(encode_replay(manager))
+
+        self.assertEqual(restored.turn, manager.turn)
+        self.assertEqual(restored.active_p1, manager.active_p1)
+        self.assertEqual(restored.winner, manager.winner)
+        self.assertEqual(list(restored.log), list(manager.log))
+        self.assertEqual(restored.actions, manager.actions)
+        for before, after in zip(manager.team1_state, restored.team1_state):
+            self.assertEqual(after.nickname, before.nickname)
+            self.assertEqual(after.current_hp, before.current_hp)
+            self.assertEqual(after.fainted, before.fainted)
+
+        # Le combat rejoué continue comme l'original (même générateur)
+        manager.execute_turn({"type": "attack"})
+        restored.execute_turn({"type": "attack"})
+        self.assertEqual(list(restored.log), list(manager.log))
+
+    def test_same_seed_same_fight(self):
+        first = self._play(FightManager(self.team1, self.team2, seed=7), 30)
+        second = self._play(FightManager(self.team1, self.team2, seed=7), 30)
+        self.assertEqual(list(first.log), list(second.log))
+        self.assertEqual(encode_replay(first), encode_replay(second))
+
+    def test_fast_forward_to_turn(self):
+        blob = encode_replay(
+            self._play(FightManager(self.team1, self.team2, seed=3), 6)
+        )
+
+        for turn in range(7):
+            live = self._play(FightManager(self.team1, self.team2, seed=3), turn)
+            at_turn = replay(blob, turns=turn)
+            self.assertEqual(at_turn.turn, live.turn)
+            self.assertEqual(list(at_turn.log), list(live.log))
+            self.assertEqual(
+                [p.current_hp for p in at_turn.team2_state],
+                [p.current_hp for p in live.team2_state],
+            )
+
+    def test_replay_log_is_compact(self):
+        # Switchs invalides des deux côtés : personne ne tombe KO
+        manager = FightManager(self.team1, self.team2, mode="pvp")
+        invalid = {"type": "switch", "index": 9}
+        start = len(encode_replay(manager))
+        for _ in range(200):
+            manager.execute_turn(invalid, invalid)
+
+        # Deux octets par tour en PvP ; le journal affiché reste un anneau
+        self.assertEqual(len(encode_replay(manager)), start + 400)
+        self.assertEqual(len(manager.log), LOG_SIZE)
+        restored = replay(encode_replay(manager))
+        self.assertEqual(restored.log[-3], (TURN, 0, 0, 0, 200))
+        self.assertEqual(restored.log[-2].value, 9)
+
+    def test_replay_of_100_turns_is_fast(self):
+        manager = FightManager(self.team1, self.team2, mode="pvp")
+        for _ in range(100):
+            manager.execute_turn({"type": "switch", "index": 9}, {"type": "attack"})
+        blob = encode_replay(manager)
+
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            replay(blob)
+            timings.append(time.perf_counter() - start)
+        self.assertLess(min(timings), 0.001)
+
+    def test_decode_rejects_unknown_state(self):
+        self.assertIsNone(replay(b""))
+        self.assertIsNone(replay({"turn": 1}))
+        self.assertIsNone(replay(b"\x63" + bytes(20)))
+
+    def test_log_is_rendered_from_events(self):
+        manager = FightManager(self.team1, self.team2)
+        manager.execute_turn({"type": "attack"})
+        self.assertEqual(manager.log[0].kind, TURN)
+        self.assertEqual(manager.log[1].kind, DAMAGE)
+
+        lines = battle_log(manager.get_state())
+        self.assertEqual(lines[0], "--- Tour 1 ---")
+        self.assertRegex(lines[1], r"^P1-0 attaque ! \d+ dégâts à P2-0\.$")
+
+    def _start_fight(self):
+        response = self.client.post(
+            reverse("fight"), {"action_type": "start", "team1_id": self.team1.id}
+        )
+        return Fight.objects.get(id=response.url.rstrip("/").split("/")[-1])
+
+    def test_fight_view_stores_state_by_id(self):
+        self.client.force_login(self.user1)
+        fight = self._start_fight()
+        url = reverse("fight_detail", args=[fight.id])
+        self.client.post(url, {"action_type": "turn", "move": "attack"})
+
+        fight.refresh_from_db()
+        self.assertEqual(fight.version, 1)
+        self.assertEqual(fight.load().turn, 1)
+        self.assertNotIn("fight_state", self.client.session)
+        self.assertContains(self.client.get(url), "Tour 1")
+
+    def test_several_fights_per_user(self):
+        self.client.force_login(self.user1)
+        first, second = self._start_fight(), self._start_fight()
+        self.client.post(
+            reverse("fight_detail", args=[first.id]),
+            {"action_type": "turn", "move": "attack"},
+        )
+
+        self.assertEqual(Fight.objects.get(id=first.id).load().turn, 1)
+        self.assertEqual(Fight.objects.get(id=second.id).load().turn, 0)
+        self.assertContains(self.client.get(reverse("fight")), "Combats en cours")
+
+    def test_fight_of_another_user_is_hidden(self):
+        self.client.force_login(self.user1)
+        fight = self._start_fight()
+        self.client.force_login(self.user2)
+        response = self.client.get(reverse("fight_detail", args=[fight.id]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_concurrent_turn_is_rejected(self):
+        manager = FightManager(self.team1, self.team2)
+        fight = Fight.start(self.user1, manager)
+        stale = Fight.objects.get(id=fight.id)
+
+        fresh = fight.load()
+        fresh.execute_turn({"type": "attack"})
+        self.assertTrue(fight.save_state(fresh))
+
+        # Version lue avant la sauvegarde précédente : refusée
+        old = stale.load()
+        old.execute_turn({"type": "attack"})
+        self.assertFalse(stale.save_state(old))
+        fight.refresh_from_db()
+        self.assertEqual(fight.version, 1)
+
+    def test_victory_records_result_once(self):
+        fight = Fight.start(self.user1, FightManager(self.team1, self.team2))
+        manager = fight.load()
+        while not manager.winner:
+            alive = [i for i, p in enumerate(manager.team1_state) if not p.fainted]
+            if manager.active_p1 in alive:
+                manager.execute_turn({"type": "attack"})
+            else:
+                manager.execute_turn({"type": "switch", "index": alive[0]})
+            with CaptureQueriesContext(connection) as queries:
+                self.assertTrue(fight.save_state(manager))
+        self.assertTrue(fight.save_state(manager))
+
+        # Tour de la victoire : résultat, XP des 2 équipes, compteurs
+        self.assertLessEqual(len(queries), 17)
+
+        result = FightResult.objects.get()
+        self.assertEqual(
+            (result.user, result.winner, result.turns),
+            (self.user1, manager.winner, manager.turn),
+        )
+        replayed = replay(result.replay)
+        self.assertEqual(list(replayed.log), list(manager.log))
+        self.assertEqual(replayed.winner, manager.winner)
+        stats = TrainerStats.objects.get(user=self.user1)
+        won = manager.winner == "team1"
+        self.assertEqual((stats.fights, stats.wins, stats.losses), (1, won, not won))
+
+        # Seule l'équipe du joueur gagne de l'XP : 20 ou 5 × niveau adverse
+        # (10) ; l'équipe adverse appartient à un autre dresseur
+        rate = FightResult.WIN_XP if won else FightResult.LOSS_XP
+        self.assertEqual({p.experience for p in self.team1.pokemons.all()}, {rate * 10})
+        self.assertEqual({p.experience for p in self.team2.pokemons.all()}, {0})
+        self.assertFalse(TrainerStats.objects.filter(user=self.user2, fights__gt=0))
+
+    def test_pvp_result_credits_both_teams_of_the_player(self):
+        # PvP local : les deux équipes sont au joueur, toutes deux créditées
+        local = Team.objects.create(name="Team 3", user=self.user1, position=1)
+        for i in range(5):
+            local.pokemons.add(
+                PokemonCapture.objects.create(
+                    user=self.user1, pokemon_id=i + 20, name=f"P3-{i}", level=10
+                )
+            )
+        manager = FightManager(local, self.team1, mode="pvp")
+        manager.winner = "team1"
+        FightResult.record(Fight.start(self.user1, manager), manager)
+        self.assertEqual(
+            {p.experience for p in local.pokemons.all()}, {FightResult.WIN_XP * 10}
+        )
+        self.assertEqual(
+            {p.experience for p in self.team1.pokemons.all()},
+            {FightResult.LOSS_XP * 10},
+        )
+
+    def test_fight_history_keyset_pagination(self):
+        FightResult.objects.bulk_create(
+            FightResult(
+                user=self.user1 if i % 2 else self.user2,
+                team1=self.team1,
+                team2=self.team2,
+                mode="pve",
+                winner="team1",
+                turns=i,
+                duration=timedelta(minutes=1),
+            )
+            for i in range(60)
+        )
+        self.client.force_login(self.user1)
+
+        with self.assertNumQueries(4):
+            first = self.client.get(reverse("fight_history"))
+        self.assertEqual([r.turns for r in first.context["results"]][:2], [59, 57])
+        self.assertEqual(len(first.context["results"]), 20)
+
+        second = self.client.get(
+            reverse("fight_history"), {"before": first.context["next_before"]}
+        )
+        self.assertEqual(
+            [r.turns for r in second.context["results"]], list(range(19, 0, -2))
+        )
+        self.assertIsNone(second.context["next_before"])
+
+    def test_fight_replay_view(self):
+        manager = self._play(FightManager(self.team1, self.team2), 4)
+        result = FightResult.objects.create(
+            user=self.user1,
+            team1=self.team1,
+            team2=self.team2,
+            mode="pve",
+            winner="team1",
+            turns=manager.turn,
+            duration=timedelta(minutes=1),
+            replay=encode_replay(manager),
+        )
+        url = reverse("fight_replay", args=[result.id])
+        self.client.force_login(self.user1)
+
+        response = self.client.get(url, {"turn": 2})
+        self.assertContains(response, "Tour 2 / 4")
+        self.assertContains(response, "?turn=3")
+        self.assertEqual(response.context["state"]["turn"], 2)
+        self.assertEqual(self.client.get(url).context["state"]["turn"], 4)
+        self.assertContains(self.client.get(reverse("fight_history")), url)
+
+        # Résultat sans journal, ou d'un autre dresseur
+        FightResult.objects.filter(id=result.id).update(replay=b"")
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.client.force_login(self.user2)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_expire_fights_command(self):
+        manager = FightManager(self.team1, self.team2)
+        old = Fight.start(self.user1, manager)
+        recent = Fight.start(self.user1, manager)
+        Fight.objects.filter(id=old.id).update(
+            updated_at=timezone.now() - timedelta(hours=48)
+        )
+
+        call_command("expire_fights", hours=24, stdout=StringIO())
+        self.assertEqual(list(Fight.objects.values_list("id", flat=True)), [recent.id])
+
 
 class PvpTests(TestCase):
     def setUp(self):
@@ -250,3 +707,1154 @@ class PvpTests(TestCase):
         # Both take damage
         self.assertLess(manager.team1_state[0]["current_hp"], p1_hp_start)
         self.assertLess(manager.team2_state[0]["current_hp"], p2_hp_start)
+
+
+def make_payloads(pokemon_id, name, name_fr):
+    # Réponses minimales de /pokemon/{id} et /pokemon-species/{id}
+    pokemon = {
+        "id": pokemon_id,
+        "name": name,
+        "types": [{"slot": 1, "type": {"name": "water"}}],
+        "height": 5,
+        "weight": 90,
+        "sprites": {
+            "front_default": None,
+            "other": {"official-artwork": {"front_default": None}},
+        },
+        "stats": [
+            {"stat": {"name": stat}, "base_stat": 44}
+            for stat in ["hp", "attack", "defense", "speed"]
+        ],
+    }
+    species = {
+        "names": [{"language": {"name": "fr"}, "name": name_fr}],
+        "flavor_text_entries": [
+            {"language": {"name": "fr"}, "flavor_text": "Une\ncarapace."}
+        ],
+    }
+    return {
+        f"pokemon/{pokemon_id}": pokemon,
+        f"pokemon-species/{pokemon_id}": species,
+    }
+
+
+# PokeAPI ne doit jamais être appelée quand le catalogue est rempli
+@mock.patch("pokedex.pokeapi.PokeAPIClient.get_json", side_effect=AssertionError)
+class CatalogTests(TestCase):
+    def setUp(self):
+        store_records(
+            [
+                make_record(1, "bulbasaur", "Bulbizarre", ("grass", "poison"), 45),
+                make_record(4, "charmander", "Salamèche", ("fire",), 39),
+                make_record(6, "charizard", "Dracaufeu", ("fire", "flying"), 78),
+                make_record(25, "pikachu", "Pikachu", ("electric",), 35),
+            ]
+        )
+        self.user = User.objects.create_user(username="dresseur", password="pw")
+
+    def test_sync_catalog_from_dump(self, _):
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as dump:
+            json.dump([make_record(7, "squirtle", "Carapuce", ("water",))], dump)
+            dump.flush()
+            call_command("sync_catalog", source=dump.name, stdout=mock.Mock())
+
+        species = Species.objects.select_related("stats").get(id=7)
+        self.assertEqual(species.name_fr, "Carapuce")
+        self.assertEqual(species.type1, "water")
+        self.assertEqual(species.stats.hp, 50)
+
+    def test_sync_catalog_updates_existing_rows(self, _):
+        store_records([make_record(25, "pikachu", "Pikachu", ("electric",), 90)])
+
+        self.assertEqual(Species.objects.filter(id=25).count(), 1)
+        self.assertEqual(Species.objects.get(id=25).stats.attack, 90)
+
+    def test_index_reads_catalog(self, _):
+        session = self.client.session
+        session["random_team_ids"] = [1, 4, 6, 25]
+        session.save()
+
+        response = self.client.get(reverse("index"))
+
+        names = [p["name"] for p in response.context["pokemons"]]
+        self.assertEqual(names, ["Bulbizarre", "Salamèche", "Dracaufeu", "Pikachu"])
+
+    def test_index_search_french_and_id(self, _):
+        response = self.client.get(reverse("index"), {"q": "dracaufeu"})
+        self.assertEqual([p["id"] for p in response.context["pokemons"]], [6])
+
+        response = self.client.get(reverse("index"), {"q": "salam"})
+        self.assertEqual([p["id"] for p in response.context["pokemons"]], [4])
+
+        response = self.client.get(reverse("index"), {"q": "25"})
+        self.assertEqual([p["id"] for p in response.context["pokemons"]], [25])
+
+    def test_pokemon_detail_reads_catalog(self, _):
+        response = self.client.get(reverse("pokemon_detail", args=[4]))
+
+        pokemon = response.context["pokemon"]
+        self.assertEqual(pokemon["name"], "Salamèche")
+        self.assertEqual(pokemon["type"], "Feu")
+        self.assertEqual(pokemon["stats"][0], {"name": "PV", "value": 39})
+
+    def test_capture_detail_reads_catalog(self, _):
+        capture = PokemonCapture.objects.create(
+            user=self.user, pokemon_id=1, name="Bulbizarre", level=10
+        )
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse("capture_detail", args=[capture.id]))
+
+        self.assertEqual(response.context["description"], "Description de Bulbizarre.")
+        # PV = 45 * 2 * 10 / 100 + 10 + 10
+        self.assertEqual(response.context["stats"][0]["value"], 29)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        store_records([make_record(25, "pikachu", "Pikachu", ("electric",), 35)])
+
+    async def test_pokemon_detail_under_async_client(self):
+        with mock.patch.object(PokeAPIClient, "get_json", side_effect=AssertionError):
+            response = await self.async_client.get(reverse("pokemon_detail", args=[25]))
+
+        self.assertEqual(response.context["pokemon"]["name"], "Pikachu")
+
+    def test_missing_species_fetched_concurrently_and_stored(self):
+        payloads = make_payloads(7, "squirtle", "Carapuce")
+        session = self.client.session
+        session["random_team_ids"] = [7, 25]
+        session.save()
+
+        with mock.patch.object(
+            PokeAPIClient, "get_json", side_effect=lambda path, *a: payloads[path]
+        ) as get_json:
+            response = self.client.get(reverse("index"))
+
+        self.assertEqual(get_json.call_count, 2)
+        names = [p["name"] for p in response.context["pokemons"]]
+        self.assertEqual(names, ["Carapuce", "Pikachu"])
+        self.assertEqual(Species.objects.get(id=7).description_fr, "Une carapace.")
+
+
+class FakeAdapter(requests.adapters.BaseAdapter):
+    """Transport HTTP simulé : renvoie les statuts demandés, dans l'ordre."""
+
+    def __init__(self, statuses=(200,), delay=0, etag=None):
+        super().__init__()
+        self.statuses = list(statuses)
+        self.delay = delay
+        self.etag = etag
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        with self.lock:
+            self.calls.append((request.url, kwargs.get("timeout")))
+            status = (
+                self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+            )
+        time.sleep(self.delay)
+
+        response = requests.Response()
+        if self.etag:
+            response.headers["ETag"] = self.etag
+            if request.headers.get("If-None-Match") == self.etag:
+                status = 304
+        response.status_code = status
+        response.url = request.url
+        response._content = json.dumps({"url": request.url}).encode()
+        return response
+
+    def close(self):
+        pass
+
+
+class PokeAPIClientTests(TestCase):
+    def make_client(self, adapter, **kwargs):
+        client = PokeAPIClient(base_url="http://pokeapi.test/api/v2", **kwargs)
+        client.session.mount("http://", adapter)
+        return client
+
+    def test_get_json_uses_timeout(self):
+        adapter = FakeAdapter()
+        client = self.make_client(adapter, timeout=1.5)
+
+        data = client.get_json("pokemon/25")
+
+        self.assertEqual(data["url"], "http://pokeapi.test/api/v2/pokemon/25/")
+        self.assertEqual(adapter.calls[0][1], 1.5)
+
+    def test_get_json_retries_within_budget(self):
+        adapter = FakeAdapter(statuses=[503, 503, 200])
+        client = self.make_client(adapter, retries=2, backoff=0)
+
+        self.assertIsNotNone(client.get_json("pokemon/1"))
+        self.assertEqual(len(adapter.calls), 3)
+
+    def test_get_json_gives_up_after_budget(self):
+        adapter = FakeAdapter(statuses=[503])
+        client = self.make_client(adapter, retries=1, backoff=0)
+
+        self.assertIsNone(client.get_json("pokemon/1"))
+        self.assertEqual(len(adapter.calls), 2)
+
+    def test_get_json_does_not_retry_not_found(self):
+        adapter = FakeAdapter(statuses=[404])
+        client = self.make_client(adapter, retries=3, backoff=0)
+
+        self.assertIsNone(client.get_json("pokemon/9999"))
+        self.assertEqual(len(adapter.calls), 1)
+
+    def test_fetch_many_runs_concurrently(self):
+        adapter = FakeAdapter(delay=0.2)
+        client = self.make_client(adapter, max_workers=6)
+
+        start = time.perf_counter()
+        results = client.fetch_many([f"pokemon/{i}" for i in range(1, 7)])
+        elapsed = time.perf_counter() - start
+
+        # 6 appels de 200 ms : en parallèle, bien moins que la somme (1.2 s)
+        self.assertLess(elapsed, 0.8)
+        self.assertEqual(
+            [r["url"] for r in results],
+            [f"http://pokeapi.test/api/v2/pokemon/{i}/" for i in range(1, 7)],
+        )
+
+
+class TieredCacheTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def make_cache(self, **kwargs):
+        return TieredCache(directory=self.directory.name, **kwargs)
+
+    def test_lru_is_bounded_and_counts_evictions(self):
+        cache = TieredCache(lru_size=2)
+        for i in range(3):
+            cache.set(f"k{i}", "pokemon", {"id": i})
+
+        self.assertEqual(cache.info()["lru_size"], 2)
+        self.assertEqual(cache.info()["lru_evictions"], 1)
+        self.assertIsNone(cache.get("k0"))
+        self.assertEqual(cache.info()["misses"], 1)
+
+    def test_disk_tier_survives_restart(self):
+        self.make_cache().set("k", "pokemon", {"id": 25})
+
+        # Nouveau processus : LRU vide, l'entrée remonte depuis le disque
+        cache = self.make_cache()
+        self.assertEqual(cache.get("k")["data"], {"id": 25})
+        self.assertEqual(cache.get("k")["data"], {"id": 25})
+        self.assertEqual(cache.info()["disk_hits"], 1)
+        self.assertEqual(cache.info()["lru_hits"], 1)
+
+    def test_clear_keeps_other_site_keys(self):
+        cache.set("pokedex:owned:1", b"\x02")
+        for alias in ("pokeapi", "default"):
+            tiered = TieredCache(backend=alias)
+            tiered.set("k", "pokemon", {"id": 25})
+            tiered.clear()
+            self.assertIsNone(TieredCache(backend=alias).get("k"))
+        self.assertEqual(cache.get("pokedex:owned:1"), b"\x02")
+
+    def test_per_endpoint_ttl(self):
+        cache = TieredCache(ttls={"pokemon-species": 100, "default": 0})
+
+        self.assertTrue(cache.is_fresh(cache.set("a", "pokemon-species", {})))
+        self.assertFalse(cache.is_fresh(cache.set("b", "type", {})))
+
+    def test_client_serves_fresh_entries_from_cache(self):
+        adapter = FakeAdapter()
+        client = PokeAPIClient(
+            base_url="http://pokeapi.test/api/v2", cache=TieredCache()
+        )
+        client.session.mount("http://", adapter)
+
+        client.get_json("pokemon/1")
+        client.get_json("pokemon/1")
+
+        self.assertEqual(len(adapter.calls), 1)
+
+    def test_client_revalidates_expired_entries(self):
+        adapter = FakeAdapter(etag='"v1"')
+        cache = TieredCache(ttls={"default": 0})
+        client = PokeAPIClient(base_url="http://pokeapi.test/api/v2", cache=cache)
+        client.session.mount("http://", adapter)
+
+        first = client.get_json("pokemon/1")
+        second = client.get_json("pokemon/1")
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(adapter.calls), 2)
+        self.assertEqual(cache.info()["revalidations"], 1)
+
+    def test_client_serves_stale_entry_when_api_is_down(self):
+        cache = TieredCache(ttls={"default": 0})
+        client = PokeAPIClient(
+            base_url="http://pokeapi.test/api/v2", cache=cache, backoff=0
+        )
+        client.session.mount("http://", FakeAdapter())
+        client.get_json("pokemon/1")
+
+        client.session.mount("http://", FakeAdapter(statuses=[503]))
+        self.assertIsNotNone(client.get_json("pokemon/1"))
+        self.assertEqual(cache.info()["stale_served"], 1)
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.index = get_search_index()
+
+    def test_search_by_id(self):
+        self.assertEqual(self.index.search("25"), [25])
+        self.assertEqual(self.index.search("999"), [])
+
+    def test_search_french_and_english_names(self):
+        self.assertEqual(self.index.search("dracaufeu"), [6])
+        self.assertEqual(self.index.search("Charizard"), [6])
+
+    def test_search_french_prefix_and_accents(self):
+        self.assertEqual(self.index.search("salam"), [4])
+        self.assertEqual(self.index.search("Salamèche"), [4])
+
+    def test_search_substring(self):
+        self.assertIn(6, self.index.search("zard"))
+
+    def test_search_tolerates_typos(self):
+        self.assertEqual(self.index.search("dracofeu")[0], 6)
+        self.assertEqual(self.index.search("pikachuu"), [25])
+
+    def test_search_limit(self):
+        self.assertEqual(self.index.search("nidoran"), [29, 32])
+        self.assertEqual(len(self.index.search("ch", limit=6)), 6)
+
+
+class SimulationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="sim", password="pw")
+        self.team1 = self._team("Bleus", 0, [10, 12])
+        self.team2 = self._team("Rouges", 1, [11, 11])
+
+    def _team(self, name, position, levels):
+        team = Team.objects.create(user=self.user, name=name, position=position)
+        for level in levels:
+            team.pokemons.add(
+                PokemonCapture.objects.create(
+                    user=self.user, pokemon_id=1, name=name, level=level
+                )
+            )
+        return team
+
+    def _fight_manager_sample(self, n):
+        # Même politique que le simulateur : attaquer, switcher si KO
+        random.seed(0)
+        wins, turns = 0, 0
+        for _ in range(n):
+            manager = FightManager(self.team1, self.team2)
+            while not manager.winner:
+                state = manager.team1_state
+                if state[manager.active_p1]["fainted"]:
+                    alive = next(i for i, p in enumerate(state) if not p["fainted"])
+                    manager.execute_turn({"type": "switch", "index": alive})
+                else:
+                    manager.execute_turn({"type": "attack"})
+            wins += manager.winner == "team1"
+            turns += manager.turn
+        return wins / n, turns / n
+
+    def test_matches_fight_manager(self):
+        win_rate, mean_turns = self._fight_manager_sample(300)
+        result = simulate(
+            [10, 12], [11, 11], 20_000, seed=0, species1=[1, 1], species2=[1, 1]
+        )
+
+        self.assertAlmostEqual(result.win_rate(1), win_rate, delta=0.08)
+        self.assertAlmostEqual(result.turns.mean(), mean_turns, delta=0.5)
+        self.assertEqual(result.win_rate(1) + result.win_rate(2), 1)
+
+    def test_seed_is_reproducible(self):
+        first = simulate([10], [10, 5], 1000, seed=42, batch_size=300)
+        second = simulate([10], [10, 5], 1000, seed=42, batch_size=300)
+        self.assertTrue((first.winners == second.winners).all())
+        self.assertTrue((first.turns == second.turns).all())
+
+    def test_simulate_fights_command(self):
+        out = StringIO()
+        call_command(
+            "simulate_fights",
+            team1=self.team1.pk,
+            team2=self.team2.pk,
+            n=1000,
+            seed=1,
+            stdout=out,
+        )
+        self.assertIn("1000 combats simulés", out.getvalue())
+        self.assertIn("Victoires équipe 1", out.getvalue())
+
+
+class MatchmakingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="mm", password="pw")
+
+    def _team(self, position, level=10, size=5):
+        team = Team.objects.create(
+            user=self.user, name=f"T{position}", position=position
+        )
+        for _ in range(size):
+            team.pokemons.add(
+                PokemonCapture.objects.create(
+                    user=self.user, pokemon_id=1, name="P", level=level
+                )
+            )
+        return team
+
+    def _slots(self):
+        return sorted(MatchmakingEntry.objects.values_list("slot", flat=True))
+
+    def test_pool_follows_rosters(self):
+        team = self._team(0, size=4)
+        self.assertFalse(MatchmakingEntry.objects.exists())
+
+        capture = PokemonCapture.objects.create(
+            user=self.user, pokemon_id=1, name="P", level=20
+        )
+        capture.teams.add(team)
+        self.assertEqual(team.matchmaking.avg_level, 12)
+
+        capture.level = 30
+        capture.save()
+        team.matchmaking.refresh_from_db()
+        self.assertEqual(team.matchmaking.avg_level, 14)
+
+        capture.delete()
+        self.assertFalse(MatchmakingEntry.objects.exists())
+
+    def test_slots_stay_dense(self):
+        teams = [self._team(i) for i in range(4)]
+        self.assertEqual(self._slots(), [0, 1, 2, 3])
+
+        teams[1].pokemons.remove(teams[1].pokemons.first())
+        self.assertEqual(self._slots(), [0, 1, 2])
+        teams[2].delete()
+        self.assertEqual(self._slots(), [0, 1])
+
+        call_command("rebuild_matchmaking", stdout=StringIO())
+        self.assertEqual(self._slots(), [0, 1])
+
+    def _contended(self, team, slot):
+        """
+        Verrou du pool obtenu juste après une autre requête, qui a ajouté
+        `team` au slot `slot` (au premier appel seulement).
+        """
+        lock = MatchmakingPool.lock
+
+        def contended_lock():
+            if not MatchmakingEntry.objects.filter(team=team).exists():
+                MatchmakingEntry.objects.create(team=team, slot=slot, avg_level=10)
+            lock()
+
+        return mock.patch.object(MatchmakingPool, "lock", contended_lock)
+
+    def test_concurrent_additions_take_distinct_slots(self):
+        self._team(0)
+        team, other = self._team(1, size=4), self._team(2, size=4)
+        with self._contended(other, 1):
+            team.pokemons.add(
+                PokemonCapture.objects.create(user=self.user, pokemon_id=1, name="P")
+            )
+        self.assertEqual(self._slots(), [0, 1, 2])
+        self.assertEqual(team.matchmaking.slot, 2)
+
+    def test_concurrent_addition_of_same_team(self):
+        team = self._team(0, size=4)
+        with self._contended(team, 0):
+            team.pokemons.add(
+                PokemonCapture.objects.create(user=self.user, pokemon_id=1, name="P")
+            )
+        self.assertEqual(self._slots(), [0])
+
+    def test_concurrent_addition_during_delete(self):
+        team, _ = self._team(0), self._team(1)
+        other = self._team(2, size=4)
+        with self._contended(other, 2):
+            team.delete()
+        # Le slot ajouté pendant la suppression vient boucher le trou
+        self.assertEqual(self._slots(), [0, 1])
+        self.assertEqual(MatchmakingEntry.objects.get(team=other).slot, 0)
+
+    def test_rebuild_does_not_fill_slots_row_by_row(self):
+        for i in range(6):
+            self._team(i)
+        # Verrou, lecture des équipes, DELETE, INSERT (+ savepoint) : pas de
+        # fill_slot
+        with self.assertNumQueries(6):
+            self.assertEqual(rebuild_pool(), 6)
+        self.assertEqual(self._slots(), list(range(6)))
+
+    def test_pick_opponent_excludes_own_team(self):
+        team, other = self._team(0), self._team(1)
+        for _ in range(20):
+            self.assertEqual(pick_opponent(team), other)
+        other.pokemons.clear()
+        self.assertIsNone(pick_opponent(team))
+
+    def test_pick_opponent_prefers_level_band(self):
+        team = self._team(0, level=10)
+        close = self._team(1, level=12)
+        self._team(2, level=50)
+        for _ in range(20):
+            self.assertEqual(pick_opponent(team, level_band=5), close)
+
+    def test_pick_opponent_is_uniform_in_level_band(self):
+        team = self._team(0, level=10)
+        # Une équipe de la tranche juste après une longue série hors tranche
+        # ne doit pas être tirée plus souvent que les autres
+        first = self._team(1, level=11)
+        for position in range(2, 9):
+            self._team(position, level=50)
+        after_gap, last = self._team(9, level=12), self._team(10, level=9)
+
+        random.seed(0)
+        picks = [pick_opponent(team, level_band=5) for _ in range(300)]
+        for band_team in (first, after_gap, last):
+            self.assertGreater(picks.count(band_team), 70)
+            self.assertLess(picks.count(band_team), 130)
+
+    def test_pick_opponent_query_count_is_constant(self):
+        team = self._team(0)
+        for position in range(1, 5):
+            self._team(position)
+        other_user = User.objects.create_user(username="mm2", password="pw")
+        for position in range(5):
+            Team.objects.create(user=other_user, name="X", position=position)
+
+        with self.assertNumQueries(3):
+            self.assertIsNotNone(pick_opponent(team))
+        with self.assertNumQueries(3):
+            self.assertIsNotNone(pick_opponent(team, level_band=5))
+
+
+class QueryBudgetTests(TestCase):
+    # Session + utilisateur + requêtes propres à la page
+    TEAMS_PAGE_QUERIES = 5
+    FIGHTS_PAGE_QUERIES = 5
+    FIGHT_DETAIL_QUERIES = 3
+    PROFILE_PAGE_QUERIES = 4
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="budget", password="pw")
+        self.client.force_login(self.user)
+
+    def _collection(self, captures):
+        PokemonCapture.objects.bulk_create(
+            PokemonCapture(user=self.user, pokemon_id=i % 151 + 1, name="P", level=5)
+            for i in range(captures)
+        )
+        pokemons = list(PokemonCapture.objects.filter(user=self.user)[:10])
+        for position in range(5):
+            team = Team.objects.create(user=self.user, name="T", position=position)
+            team.pokemons.add(*pokemons[position * 2 : position * 2 + 2])
+
+    def _assert_budgets(self):
+        with self.assertNumQueries(self.TEAMS_PAGE_QUERIES):
+            self.client.get(reverse("team"), {"team": 2})
+        with self.assertNumQueries(self.FIGHTS_PAGE_QUERIES):
+            self.client.get(reverse("fight"))
+        with self.assertNumQueries(self.PROFILE_PAGE_QUERIES):
+            self.client.get(reverse("profile"))
+
+    def test_small_collection(self):
+        self._collection(10)
+        self._assert_budgets()
+
+    def test_large_collection(self):
+        self._collection(50_000)
+        self._assert_budgets()
+        first = self.client.get(reverse("team"))
+        after = first.context["next_after"]
+        with self.assertNumQueries(self.TEAMS_PAGE_QUERIES):
+            second = self.client.get(reverse("team"), {"after": after})
+        page1 = [p.id for p in first.context["available_pokemons"]]
+        page2 = [p.id for p in second.context["available_pokemons"]]
+        self.assertEqual(len(page2), 60)
+        self.assertFalse(set(page1) & set(page2))
+        self.assertIsNotNone(second.context["next_after"])
+        self.assertContains(second, "after=" + quote(second.context["next_after"]))
+
+    def test_fight_detail(self):
+        self._collection(10)
+        team = Team.objects.get(user=self.user, position=0)
+        team.pokemons.add(*PokemonCapture.objects.filter(user=self.user)[2:5])
+        fight = Fight.start(self.user, FightManager(team, team))
+        with self.assertNumQueries(self.FIGHT_DETAIL_QUERIES):
+            self.client.get(reverse("fight_detail", args=[fight.id]))
+
+
+class ProfileTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="collector", password="pw")
+        self.client.force_login(self.user)
+        # Même date de capture pour tous : l'id départage les ex aequo
+        PokemonCapture.objects.bulk_create(
+            PokemonCapture(
+                user=self.user,
+                pokemon_id=i % 3 + 1,
+                name="P",
+                nickname=f"Pika{i}" if i % 2 else f"bulbi{i}",
+                level=i % 50 + 1,
+            )
+            for i in range(150)
+        )
+        PokemonCapture.objects.update(captured_at=timezone.now())
+
+    def walk(self, **params):
+        ids, query = [], params
+        while True:
+            response = self.client.get(reverse("profile"), query)
+            ids += [c.id for c in response.context["captures"]]
+            if not response.context["next_query"]:
+                return ids
+            query = QueryDict(response.context["next_query"])
+
+    def test_capture_total_comes_from_trainer_stats(self):
+        # bulk_create sans signaux : le total vient du recalcul
+        leaderboard.rebuild()
+        capture = PokemonCapture.objects.create(user=self.user, pokemon_id=4, name="P")
+        self.assertEqual(
+            self.client.get(reverse("profile")).context["capture_count"], 151
+        )
+
+        capture.delete()
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse("profile"))
+        self.assertEqual(response.context["capture_count"], 150)
+
+    def test_keyset_pages_cover_collection_once(self):
+        ids = self.walk()
+
+        self.assertEqual(len(ids), 150)
+        self.assertEqual(ids, sorted(ids, reverse=True))
+
+    def test_filters_apply_across_pages(self):
+        self.assertEqual(len(self.walk(species=2)), 50)
+        self.assertEqual(len(self.walk(level_min=10, level_max=19)), 30)
+        self.assertEqual(len(self.walk(q="pika")), 75)
+        # bulbi10, 12... 18 puis bulbi100, 102... 148
+        self.assertEqual(len(self.walk(q="bulbi1")), 30)
+
+    def test_capture_detail_neighbours_follow_profile_order(self):
+        store_records([make_record(i, f"p{i}", f"P{i}") for i in (1, 2, 3)])
+        profile_order = self.walk()
+
+        capture_id, visited = profile_order[0], []
+        for _ in range(len(profile_order) + 1):
+            response = self.client.get(reverse("capture_detail", args=[capture_id]))
+            visited.append(capture_id)
+            capture_id = response.context["next_capture_id"]
+
+        # Suivantes dans l'ordre du profil, puis retour à la première
+        self.assertEqual(visited, profile_order + profile_order[:1])
+        response = self.client.get(reverse("capture_detail", args=[profile_order[0]]))
+        self.assertEqual(response.context["prev_capture_id"], profile_order[-1])
+
+    def test_fragment_renders_cards_only(self):
+        first = self.client.get(reverse("profile"))
+        response = self.client.get(
+            reverse("profile") + "?" + first.context["next_query"], {"fragment": 1}
+        )
+
+        self.assertTemplateUsed(response, "pokedex/capture_cards.html")
+        self.assertTemplateNotUsed(response, "pokedex/base.html")
+        self.assertContains(response, "data-next-page", count=1)
+
+
+class BenchmarkTests(TestCase):
+    def test_every_route_has_a_budget(self):
+        self.assertEqual({p.name for p in pokedex_urls.urlpatterns}, set(BUDGETS))
+
+    def test_small_run_respects_query_budgets(self):
+        with (
+            tempfile.TemporaryDirectory() as mirror,
+            self.settings(SPRITE_MIRROR_DIR=mirror),
+        ):
+            benchmarks.seed(users=3, captures=12)
+            results = benchmarks.run(runs=2)
+            # L'artwork factice va dans un miroir temporaire, pas dans celui-ci
+            self.assertEqual(list(Path(mirror).iterdir()), [])
+
+        self.assertEqual(len(results), len(BUDGETS))
+        for result in results:
+            self.assertLessEqual(
+                result["queries"], result["budget"].queries, result["name"]
+            )
+
+    def test_seed_leaves_pokeapi_cache_untouched(self):
+        # Client partagé recréé depuis les réglages : cache disque temporaire
+        with tempfile.TemporaryDirectory() as directory:
+            config = {**settings.POKEAPI_CACHE, "DIR": directory}
+            with (
+                self.settings(POKEAPI_CACHE=config),
+                mock.patch("pokedex.pokeapi._client", None),
+            ):
+                benchmarks.seed(users=2, captures=5)
+                client = get_client()
+                self.assertIsNone(client.cache.get(client.url("pokemon/25")))
+            self.assertEqual(list(Path(directory).iterdir()), [])
+
+
+class FakePokeAPITests(TestCase):
+    def start_server(self, **kwargs):
+        server = FakePokeAPIServer(**kwargs)
+        server.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def test_serves_payloads_with_etag(self):
+        server = self.start_server()
+        cache = TieredCache(ttls={"default": 0})
+        client = PokeAPIClient(base_url=server.url, cache=cache)
+
+        self.assertEqual(client.get_json("pokemon/25"), pokemon_payload(25))
+        self.assertEqual(client.get_json("pokemon/25"), pokemon_payload(25))
+        self.assertIsNone(client.get_json("pokemon/9999"))
+        self.assertEqual(cache.info()["revalidations"], 1)
+
+    def test_injected_errors_use_retry_budget(self):
+        server = self.start_server(error_rate=1, latency=0.05)
+        client = PokeAPIClient(base_url=server.url, retries=1, backoff=0)
+
+        start = time.perf_counter()
+        self.assertIsNone(client.get_json("pokemon/1"))
+        self.assertGreaterEqual(time.perf_counter() - start, 0.1)
+        self.assertEqual((server.requests, server.errors), (2, 2))
+
+    def test_records_from_upstream_into_fixtures(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        upstream = self.start_server()
+        server = self.start_server(fixtures=directory.name, upstream=upstream.url)
+        client = PokeAPIClient(base_url=server.url)
+
+        client.get_json("pokemon-species/4")
+        upstream.shutdown()
+
+        # Servi depuis le fichier enregistré, sans l'API d'origine
+        client.get_json("pokemon-species/4")
+        self.assertEqual(upstream.requests, 1)
+        with open(f"{directory.name}/pokemon-species/4.json") as f:
+            self.assertEqual(json.load(f)["id"], 4)
+
+
+class LoadTestTests(LiveServerTestCase):
+    def test_scenario_reports_every_view(self):
+        api = FakePokeAPIServer()
+        api.start()
+        self.addCleanup(api.server_close)
+        self.addCleanup(api.shutdown)
+        client = PokeAPIClient(base_url=api.url)
+
+        with mock.patch("pokedex.catalog.get_client", return_value=client):
+            store_records(fetch_records(range(1, 152)))
+            # Un seul dresseur : le serveur de test partage une connexion
+            # SQLite en mémoire entre ses threads
+            recorder, elapsed = loadtest.run(
+                self.live_server_url, users=1, iterations=2, turns=3, seed=0
+            )
+        results = {r["name"]: r for r in loadtest.report(recorder, elapsed)}
+
+        self.assertLessEqual(
+            {"index", "pokemon_detail", "capture_pokemon", "profile", "team"},
+            set(results),
+        )
+        self.assertIn("fight_detail", results)
+        self.assertEqual(sum(r["errors"] for r in results.values()), 0)
+        self.assertEqual(results["capture_pokemon"]["count"], 10)
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="ash")
+
+    def stats(self, user=None):
+        return TrainerStats.objects.get(user=user or self.user)
+
+    def capture(self, pokemon_id, level=5, user=None):
+        return PokemonCapture.objects.create(
+            user=user or self.user, pokemon_id=pokemon_id, name="P", level=level
+        )
+
+    def test_captures_and_releases_update_counters(self):
+        first = self.capture(25, level=12)
+        second = self.capture(25, level=30)
+        self.capture(4)
+        self.assertEqual((self.stats().species_count, self.stats().best_level), (2, 30))
+
+        second.delete()
+        self.assertEqual((self.stats().species_count, self.stats().best_level), (2, 12))
+        first.delete()
+        self.assertEqual((self.stats().species_count, self.stats().best_level), (1, 5))
+        self.assertFalse(SpeciesCaught.objects.filter(pokemon_id=25).exists())
+
+    def test_level_up_updates_best_level(self):
+        capture = self.capture(1)
+        capture.gain_experience(10**5)
+
+        self.assertEqual(self.stats().best_level, capture.level)
+
+    def test_rebuild_repairs_drift(self):
+        for pokemon_id in (1, 1, 2, 3):
+            self.capture(pokemon_id, level=pokemon_id * 10)
+        expected = TrainerStats.objects.values().get(user=self.user)
+
+        TrainerStats.objects.update(species_count=0, best_level=0, wins=7)
+        SpeciesCaught.objects.all().delete()
+        call_command("rebuild_leaderboard", stdout=StringIO())
+
+        self.assertEqual(TrainerStats.objects.values().get(user=self.user), expected)
+        self.assertEqual(SpeciesCaught.objects.get(pokemon_id=1).count, 2)
+
+    def test_pages_follow_the_index(self):
+        TrainerStats.objects.create(user=self.user)
+        for i in range(5):
+            user = User.objects.create(username=f"t{i}")
+            TrainerStats.objects.create(user=user, wins=i // 2)
+
+        cursor, ranks = None, []
+        for _ in range(3):
+            rows, cursor = leaderboard.page("wins", leaderboard.parse_cursor(cursor), 2)
+            ranks += [(rank, stats.user.username) for rank, stats in rows]
+        self.assertIsNone(cursor)
+        self.assertEqual(
+            ranks,
+            [(1, "t4"), (2, "t2"), (3, "t3"), (4, "ash"), (5, "t0"), (6, "t1")],
+        )
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("leaderboard"), {"sort": "species"})
+        self.assertEqual(len(response.context["rows"]), 6)
+
+
+class PokedexBitmapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="ash")
+        TrainerStats.objects.create(user=self.user)
+        store_records(
+            [
+                make_record(1, "bulbasaur", "Bulbizarre", ("grass", "poison")),
+                make_record(25, "pikachu", "Pikachu", ("electric",)),
+            ]
+        )
+
+    def capture(self, pokemon_id):
+        return PokemonCapture.objects.create(
+            user=self.user, pokemon_id=pokemon_id, name="P"
+        )
+
+    def test_bits(self):
+        bitmap = collection.from_species([1, 25, 151])
+        self.assertTrue(collection.has_species(bitmap, 25))
+        self.assertFalse(collection.has_species(bitmap, 26))
+        self.assertFalse(collection.has_species(bitmap, 500))
+        self.assertEqual(collection.completion(bitmap), (3, 2))
+        self.assertEqual(
+            collection.with_species(bitmap, 151, owned=False),
+            collection.from_species([1, 25]),
+        )
+
+    def test_out_of_range_species(self):
+        bitmap = collection.from_species([1, 25, -1, 10**7])
+        self.assertEqual(bitmap, collection.from_species([1, 25]))
+        self.assertFalse(collection.has_species(b"\xff", -1))
+        for pokemon_id in (0, -1, collection.POKEDEX_SIZE + 1, 10**7):
+            with self.assertRaises(ValueError):
+                collection.with_species(bitmap, pokemon_id)
+
+        # Capture postée hors du Pokédex : refusée, le bitmap ne bouge pas
+        self.capture(25)
+        self.client.force_login(self.user)
+        for pokemon_id in ("10000000", "-1", "0", "abc"):
+            response = self.client.post(
+                reverse("capture_pokemon"),
+                {"pokemon_id": pokemon_id, "pokemon_name": "x"},
+            )
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(PokemonCapture.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(
+            bytes(TrainerStats.objects.get(user=self.user).pokedex),
+            collection.from_species([25]),
+        )
+
+    def test_backfill_skips_out_of_range_species(self):
+        # Numéros enregistrés par l'ancienne vue de capture, sans contrôle
+        for pokemon_id in (-3, 25, 10**7):
+            SpeciesCaught.objects.create(user=self.user, pokemon_id=pokemon_id, count=1)
+        migration = import_module("pokedex.migrations.0013_trainer_pokedex")
+        migration.fill_pokedex(django_apps, None)
+        self.assertEqual(
+            bytes(TrainerStats.objects.get(user=self.user).pokedex),
+            collection.from_species([25]),
+        )
+
+    def test_captures_and_releases_update_bitmap(self):
+        first = self.capture(25)
+        second = self.capture(25)
+        self.capture(1)
+        self.assertEqual(
+            collection.owned_species(self.user), collection.from_species([1, 25])
+        )
+
+        second.delete()
+        self.assertTrue(collection.has_species(collection.owned_species(self.user), 25))
+        first.delete()
+        self.assertEqual(
+            collection.owned_species(self.user), collection.from_species([1])
+        )
+
+    def test_cached_bitmap_expires(self):
+        self.assertEqual(collection.owned_species(self.user), b"")
+        # Capture vue par un autre worker : la base change, pas ce cache
+        bitmap = collection.from_species([25])
+        TrainerStats.objects.filter(user=self.user).update(pokedex=bitmap)
+        self.assertEqual(collection.owned_species(self.user), b"")
+
+        later = time.time() + collection.CACHE_TIMEOUT + 1
+        with mock.patch("time.time", return_value=later):
+            self.assertEqual(collection.owned_species(self.user), bitmap)
+
+    def test_badges_and_completion(self):
+        self.capture(25)
+        self.client.force_login(self.user)
+        collection.owned_species(self.user)  # cache rempli
+
+        response = self.client.get(reverse("pokemon_detail", args=[25]))
+        self.assertTrue(response.context["owned"])
+        response = self.client.get(reverse("pokemon_detail", args=[1]))
+        self.assertFalse(response.context["owned"])
+
+        session = self.client.session
+        session["random_team_ids"] = [1, 25]
+        session.save()
+        response = self.client.get(reverse("index"))
+        owned = {card["id"]: card["owned"] for card in response.context["pokemons"]}
+        self.assertEqual(owned, {1: False, 25: True})
+
+        response = self.client.get(reverse("profile"))
+        self.assertEqual(response.context["species_owned"], 1)
+        self.assertContains(response, "1/151 espèces")
+
+    def test_rebuild_recomputes_bitmap(self):
+        self.capture(1)
+        self.capture(25)
+        TrainerStats.objects.update(pokedex=b"")
+        collection.owned_species(self.user)
+
+        leaderboard.rebuild()
+        self.assertEqual(
+            collection.owned_species(self.user), collection.from_species([1, 25])
+        )
+
+
+class SpriteMirrorTests(TestCase):
+    def setUp(self):
+        mirror = tempfile.TemporaryDirectory()
+        self.addCleanup(mirror.cleanup)
+        override = self.settings(SPRITE_MIRROR_DIR=mirror.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def png(self, size):
+        buffer = io.BytesIO()
+        Image.new("RGBA", (size, size), (200, 30, 30, 255)).save(buffer, "PNG")
+        return buffer.getvalue()
+
+    def test_mirror_builds_variants_and_tag_picks_smallest(self):
+        session = mock.Mock()
+        session.get.return_value.content = self.png(475)
+        added, failed = sprites.mirror([25], kinds=["artwork"], session=session)
+        self.assertEqual((added, failed), (1, []))
+
+        entries = sprites.load_manifest()["artwork"]["25"]
+        self.assertEqual([width for width, _ in entries], [64, 96, 128, 192, 256, 475])
+        names = dict(entries)
+        self.assertEqual(
+            sprites.sprite_url(25, "artwork", 100),
+            reverse("sprite_file", args=[names[128]["webp"]]),
+        )
+        self.assertEqual(
+            sprites.sprite_url(25, "artwork", 1000),
+            reverse("sprite_file", args=[names[475]["webp"]]),
+        )
+        # Hors miroir : l'image distante
+        self.assertEqual(
+            sprites.sprite_url(26, "sprite"), f"{sprites.REMOTE_URL}/26.png"
+        )
+
+        # Déjà copiée : pas de nouveau téléchargement
+        self.assertEqual(
+            sprites.mirror([25], kinds=["artwork"], session=session), (0, [])
+        )
+        self.assertEqual(session.get.call_count, 1)
+
+    def test_files_are_content_addressed_and_immutable(self):
+        first = dict(sprites.variants(self.png(475), "artwork"))
+        self.assertEqual(first, dict(sprites.variants(self.png(475), "artwork")))
+        name = first[64]["webp"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("sprite_file", args=[name]))
+        self.assertEqual(response["Content-Type"], "image/webp")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(Image.open(io.BytesIO(response.getvalue())).width, 64)
+
+        missing = reverse("sprite_file", args=["0" * 20 + ".png"])
+        self.assertEqual(self.client.get(missing).status_code, 404)
+        self.assertEqual(
+            self.client.get("/sprites/..%2Fmanifest.json").status_code, 404
+        )
+
+    def test_atlas_replaces_images_with_one_sheet(self):
+        session = mock.Mock()
+        session.get.side_effect = lambda url, timeout: mock.Mock(
+            content=self.png(475 if "artwork" in url else 96)
+        )
+        sprites.mirror([1, 4, 25], session=session)
+        self.assertEqual(sprites.build_atlas(), 2)
+
+        sheets = sprites.atlas()
+        self.assertEqual(sheets["species"]["sprite"], ["1", "4", "25"])
+        css = self.client.get(reverse("sprite_file", args=[sheets["css"]]))
+        self.assertEqual(css["Content-Type"], "text/css")
+        rules = css.getvalue().decode()
+        self.assertIn(".atlas-sprite-25{", rules)
+        self.assertIn("background-position:13.33% 0%", rules)
+
+        user = User.objects.create_user(username="misty", password="pw")
+        PokemonCapture.objects.create(user=user, pokemon_id=25, name="Pikachu")
+        PokemonCapture.objects.create(user=user, pokemon_id=7, name="Carapuce")
+        Team.objects.create(user=user, name="T", position=0)
+        self.client.force_login(user)
+        response = self.client.get(reverse("team"))
+        self.assertContains(response, sheets["css"])
+        self.assertContains(response, 'class="atlas atlas-artwork-25')
+        # Hors planche : l'image seule
+        self.assertContains(response, f"{sprites.REMOTE_URL}/other/official-artwork/7")
+
+
+class StatsTests(TestCase):
+    def setUp(self):
+        store_records(
+            [
+                make_record(1, "bulbasaur", "Bulbizarre", ("grass", "poison"), 45),
+                make_record(25, "pikachu", "Pikachu", ("electric",), 35),
+            ]
+        )
+
+    def test_batch_matches_formulas(self):
+        values = stats.real_stats([1, 25, 999], [10, 50, 10])
+        self.assertEqual(values.shape, (3, 6))
+        # PV = 2 * base * niveau // 100 + niveau + 10, autres : ... + 5
+        self.assertEqual(values[0].tolist(), [29, 14, 14, 14, 14, 14])
+        self.assertEqual(values[1, stats.HP], 35 + 50 + 10)
+        # Espèce inconnue : stats de base par défaut
+        self.assertEqual(values[2, stats.HP], 2 * stats.DEFAULT_BASE * 10 // 100 + 20)
+        self.assertEqual(stats.real_stats(25, 50).tolist(), values[1].tolist())
+
+    def test_table_follows_catalog(self):
+        self.assertEqual(stats.max_hp(4, 10), 30)
+        store_records([make_record(4, "charmander", "Salamèche", ("fire",), 39)])
+        self.assertEqual(stats.max_hp(4, 10), 27)
+
+        with self.assertNumQueries(0):
+            stats.real_stats([4] * 1000, range(1000))
+
+    def test_sync_from_another_process_is_seen(self):
+        self.assertEqual(stats.max_hp(25, 10), 27)
+        # sync_catalog lancé à part : la base change, pas ce processus
+        with mock.patch("pokedex.catalog.catalog_changed"):
+            store_records([make_record(25, "pikachu", "Pikachu", ("electric",), 55)])
+        self.assertEqual(stats.max_hp(25, 10), 27)
+
+        later = time.monotonic() + stats.CATALOG_CHECK_INTERVAL
+        with mock.patch("time.monotonic", return_value=later):
+            self.assertEqual(stats.max_hp(25, 10), 31)
+
+    def test_fight_uses_real_hp(self):
+        user = User.objects.create_user(username="brock", password="pw")
+        team = Team.objects.create(user=user, name="T", position=0)
+        team.pokemons.add(
+            PokemonCapture.objects.create(user=user, pokemon_id=25, name="P", level=20)
+        )
+        manager = FightManager(team, team)
+        self.assertEqual(manager.team1_state[0].max_hp, 14 + 20 + 10)
+
+        self.client.force_login(user)
+        response = self.client.get(reverse("team"))
+        self.assertEqual(response.context["team_pokemons"][0].hp, 44)
+        self.assertEqual(response.context["team_summary"][0], ("PV", 44))
+
+
+class TypeChartTests(TestCase):
+    def test_dual_types_are_one_lookup(self):
+        self.assertEqual(type_chart.DUAL.shape, (18, 171))
+        self.assertEqual(type_chart.effectiveness("electric", "water", "flying"), 4)
+        self.assertEqual(type_chart.effectiveness("ground", "fire", "flying"), 0)
+        self.assertEqual(type_chart.effectiveness("fire", "grass", "poison"), 2)
+        self.assertEqual(type_chart.effectiveness("grass", "grass", "poison"), 0.25)
+        self.assertEqual(type_chart.effectiveness("dragon", "fairy"), 0)
+        self.assertEqual(
+            type_chart.pair_of("poison", "grass"), type_chart.pair_of("grass", "poison")
+        )
+
+    def test_types_follow_sync_from_another_process(self):
+        store_records([make_record(25, "pikachu", "Pikachu", ("electric",))])
+        electric = type_chart.TYPE_INDEX["electric"]
+        self.assertEqual(type_chart.species_types([25])[0].tolist(), [electric])
+
+        # sync_catalog lancé à part : la base change, pas ce processus
+        with mock.patch("pokedex.catalog.catalog_changed"):
+            store_records([make_record(25, "pikachu", "Pikachu", ("fire",))])
+        later = time.monotonic() + stats.CATALOG_CHECK_INTERVAL
+        with mock.patch("time.monotonic", return_value=later):
+            attack, pair = type_chart.species_types([25])
+        self.assertEqual(attack.tolist(), [type_chart.TYPE_INDEX["fire"]])
+        self.assertEqual(pair.tolist(), [type_chart.pair_of("fire")])
+
+    def test_damage_uses_species_types(self):
+        store_records(
+            [
+                make_record(25, "pikachu", "Pikachu", ("electric",)),
+                make_record(7, "squirtle", "Carapuce", ("water",)),
+                make_record(50, "diglett", "Taupiqueur", ("ground",)),
+            ]
+        )
+        user = User.objects.create_user(username="surge", password="pw")
+        teams = []
+        for position, pokemon_id in enumerate((25, 7, 50)):
+            team = Team.objects.create(user=user, name="T", position=position)
+            team.pokemons.add(
+                PokemonCapture.objects.create(
+                    user=user, pokemon_id=pokemon_id, name="P", level=20
+                )
+            )
+            teams.append(team)
+
+        pikachu, squirtle, diglett = (
+            FightManager(team, team).team1_state[0] for team in teams
+        )
+        manager = FightManager(teams[0], teams[1])
+        with mock.patch.object(manager.rng, "randint", return_value=0):
+            self.assertEqual(manager._calculate_damage(pikachu, squirtle), 80)
+            self.assertEqual(manager._calculate_damage(squirtle, pikachu), 40)
+            # Immunité : le minimum de 1
+            self.assertEqual(manager._calculate_damage(pikachu, diglett), 1)
+
+        # Les types survivent à la sauvegarde du combat
+        restored = replay(encode_replay(manager))
+        self.assertEqual(
+            restored.team1_state[0].attack_type, type_chart.TYPE_INDEX["electric"]
+        )
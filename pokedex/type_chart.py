@@ -0,0 +1,174 @@
+"""
+Table des types (18 types, efficacités de la 6e génération) en NumPy.
+
+CHART[attaquant, défenseur] est le multiplicateur d'un type contre un
+autre. Un défenseur à deux types est une « paire » : 18 paires d'un seul
+type puis les 153 combinaisons de deux types, soit 171 colonnes. DUAL
+(18 × 171) précalcule le produit des deux multiplicateurs : l'efficacité
+contre un Pokémon à double type est un seul accès au tableau.
+
+Les types de chaque espèce viennent du catalogue local (Species), chargés
+par processus et rechargés quand la version du catalogue lue en base change
+(stats.catalog_version(), partagée avec les stats) : `species_types()`
+donne le type d'attaque (type principal) et la paire de défense.
+"""
+
+from itertools import combinations
+
+import numpy as np
+
+from . import stats
+from .utils import FRENCH_TO_ENGLISH
+
+TYPES = (
+    "normal",
+    "fire",
+    "water",
+    "electric",
+    "grass",
+    "ice",
+    "fighting",
+    "poison",
+    "ground",
+    "flying",
+    "psychic",
+    "bug",
+    "rock",
+    "ghost",
+    "dragon",
+    "dark",
+    "steel",
+    "fairy",
+)
+TYPE_INDEX = {name: i for i, name in enumerate(TYPES)}
+
+# Attaquant -> (super efficace ×2, peu efficace ×0.5, sans effet ×0)
+_MATCHUPS = {
+    "normal": ((), ("rock", "steel"), ("ghost",)),
+    "fire": (
+        ("grass", "ice", "bug", "steel"),
+        ("fire", "water", "rock", "dragon"),
+        (),
+    ),
+    "water": (("fire", "ground", "rock"), ("water", "grass", "dragon"), ()),
+    "electric": (
+        ("water", "flying"),
+        ("electric", "grass", "dragon"),
+        ("ground",),
+    ),
+    "grass": (
+        ("water", "ground", "rock"),
+        ("fire", "grass", "poison", "flying", "bug", "dragon", "steel"),
+        (),
+    ),
+    "ice": (
+        ("grass", "ground", "flying", "dragon"),
+        ("fire", "water", "ice", "steel"),
+        (),
+    ),
+    "fighting": (
+        ("normal", "ice", "rock", "dark", "steel"),
+        ("poison", "flying", "psychic", "bug", "fairy"),
+        ("ghost",),
+    ),
+    "poison": (
+        ("grass", "fairy"),
+        ("poison", "ground", "rock", "ghost"),
+        ("steel",),
+    ),
+    "ground": (
+        ("fire", "electric", "poison", "rock", "steel"),
+        ("grass", "bug"),
+        ("flying",),
+    ),
+    "flying": (("grass", "fighting", "bug"), ("electric", "rock", "steel"), ()),
+    "psychic": (("fighting", "poison"), ("psychic", "steel"), ("dark",)),
+    "bug": (
+        ("grass", "psychic", "dark"),
+        ("fire", "fighting", "poison", "flying", "ghost", "steel", "fairy"),
+        (),
+    ),
+    "rock": (
+        ("fire", "ice", "flying", "bug"),
+        ("fighting", "ground", "steel"),
+        (),
+    ),
+    "ghost": (("psychic", "ghost"), ("dark",), ("normal",)),
+    "dragon": (("dragon",), ("steel",), ("fairy",)),
+    "dark": (("psychic", "ghost"), ("fighting", "dark", "fairy"), ()),
+    "steel": (
+        ("ice", "rock", "fairy"),
+        ("fire", "water", "electric", "steel"),
+        (),
+    ),
+    "fairy": (
+        ("fighting", "dragon", "dark"),
+        ("fire", "poison", "steel"),
+        (),
+    ),
+}
+
+
+def _build_chart():
+    chart = np.ones((len(TYPES), len(TYPES)))
+    for attacker, groups in _MATCHUPS.items():
+        for multiplier, defenders in zip((2.0, 0.5, 0.0), groups):
+            for defender in defenders:
+                chart[TYPE_INDEX[attacker], TYPE_INDEX[defender]] = multiplier
+    return chart
+
+
+CHART = _build_chart()
+
+# Paires de défense : (t, t) pour un seul type, puis (t1, t2) avec t1 < t2
+PAIRS = [(i, i) for i in range(len(TYPES))] + list(combinations(range(len(TYPES)), 2))
+PAIR_INDEX = np.empty((len(TYPES), len(TYPES)), dtype=np.uint8)
+for _index, (_first, _second) in enumerate(PAIRS):
+    PAIR_INDEX[_first, _second] = PAIR_INDEX[_second, _first] = _index
+
+# DUAL[type d'attaque, paire] : produit des deux multiplicateurs
+_first_types, _second_types = np.array(PAIRS).T
+DUAL = np.where(
+    _first_types == _second_types,
+    CHART[:, _first_types],
+    CHART[:, _first_types] * CHART[:, _second_types],
+)
+
+
+def pair_of(type1, type2=""):
+    """Paire de défense de deux noms de types (type inconnu : normal)."""
+    first = TYPE_INDEX.get(type1, 0)
+    return int(PAIR_INDEX[first, TYPE_INDEX.get(type2, first)])
+
+
+def effectiveness(attack_type, type1, type2=""):
+    return float(DUAL[TYPE_INDEX[attack_type], pair_of(type1, type2)])
+
+
+_species = {"version": None, "attack": None, "pair": None}
+
+
+def _load(version):
+    # Import local : fight_logic (importé par models) utilise ce module
+    from .models import Species
+
+    rows = list(Species.objects.values_list("id", "type1", "type2"))
+    size = max([len(FRENCH_TO_ENGLISH)] + [row[0] for row in rows]) + 1
+    # Espèce inconnue : type normal
+    attack = np.zeros(size, dtype=np.uint8)
+    pair = np.zeros(size, dtype=np.uint8)
+    for species_id, type1, type2 in rows:
+        attack[species_id] = TYPE_INDEX.get(type1, 0)
+        pair[species_id] = pair_of(type1, type2)
+    _species.update(version=version, attack=attack, pair=pair)
+
+
+def species_types(species_ids):
+    """(types d'attaque, paires de défense) d'un lot d'espèces."""
+    version = stats.catalog_version()
+    if _species["attack"] is None or _species["version"] != version:
+        _load(version)
+    attack, pair = _species["attack"], _species["pair"]
+    species = np.asarray(species_ids, dtype=np.intp)
+    species = np.where((species > 0) & (species < len(attack)), species, 0)
+    return attack[species], pair[species]
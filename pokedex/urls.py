@@ -13,4 +13,14 @@ urlpatterns = [
     path("capture/<int:capture_id>/", views.capture_detail, name="capture_detail"),
     path("teams/", views.team, name="team"),
     path("fights/", views.fight, name="fight"),
+    path("fights/<uuid:fight_id>/", views.fight_detail, name="fight_detail"),
+    path("fights/history/", views.fight_history, name="fight_history"),
+    path("fights/history/<int:result_id>/", views.fight_replay, name="fight_replay"),
+    path("leaderboard/", views.leaderboard, name="leaderboard"),
+    path("sprites/<str:name>", views.sprite_file, name="sprite_file"),
+    path(
+        "stats/pokeapi-cache/",
+        views.pokeapi_cache_stats,
+        name="pokeapi_cache_stats",
+    ),
 ]
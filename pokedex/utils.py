@@ -16,6 +16,7 @@ TYPE_TRANSLATIONS = {
     "rock": ("Roche", "stone"),
     "ghost": ("Spectre", "violet"),
     "dragon": ("Dragon", "indigo"),
+    "dark": ("Ténèbres", "neutral"),
     "steel": ("Acier", "slate"),
     "fairy": ("Fée", "rose"),
 }
@@ -1,51 +1,60 @@
+import asyncio
 import random
+from datetime import datetime
+from functools import reduce
+from operator import or_
 
-import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import UserCreationForm
-from django.shortcuts import get_object_or_404, redirect, render
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponseBadRequest, JsonResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect, render
 from django.urls import reverse_lazy
 from django.views import generic
 
-from .fight_logic import FightManager
+from .catalog import aget_species, aget_species_many
+from .collection import (
+    POKEDEX_SIZE,
+    aowned_species,
+    completion,
+    has_species,
+    in_pokedex,
+)
+from .fight_logic import FightManager, replay
 from .forms import ProfileEditForm
-from .models import PokemonCapture, Team
-from .utils import ENGLISH_TO_FRENCH, FRENCH_TO_ENGLISH, TYPE_TRANSLATIONS
+from .leaderboard import SORT_LABELS, SORTS, parse_cursor
+from .leaderboard import page as leaderboard_page
+from .matchmaking import pick_opponent
+from .models import Fight, FightResult, PokemonCapture, Team, TrainerStats
+from .pokeapi import get_client
+from .search import get_search_index
+from .sprites import CONTENT_TYPES, FILE_NAME, mirror_dir
+from .stats import STAT_LABELS, areal_stats, real_stats
+
+# Rendu depuis une vue async : les context processors (user, messages)
+# font des requêtes synchrones, on les exécute donc dans un thread
+arender = sync_to_async(render)
 
 
 # --- VUE PRINCIPALE : LISTE DES POKÉMONS (PAGE INDEX) ---
-def index(request):
+# Vue async : sous ASGI, l'attente de PokeAPI ne bloque pas de worker
+async def index(request):
     pokemons_to_display = []
     query = request.GET.get("q")  # On récupère la recherche tout de suite
 
-    items_to_process = []
-
     # ==========================================
     # CAS 1 : C'EST UNE RECHERCHE
     # ==========================================
     if query:
-        # On doit charger la liste des 151 pour chercher dedans
-        url = "https://pokeapi.co/api/v2/pokemon?limit=151"
-        try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                all_results = response.json()["results"]
-
-                query = query.lower().strip()
-                search_term = FRENCH_TO_ENGLISH.get(query, query)
-
-                for item in all_results:
-                    p_id = item["url"][:-1].split("/")[-1]
+        query = query.lower().strip()
 
-                    # On cherche dans le nom ou l'ID
-                    if search_term in item["name"] or query == p_id:
-                        items_to_process.append(item)
-
-                # On limite à 6 résultats max pour la recherche
-                items_to_process = items_to_process[:6]
-        except requests.exceptions.RequestException:
-            pass
+        # Index en mémoire : noms français / anglais, ID, préfixes, accents
+        # et fautes de frappe. On limite à 6 résultats max pour la recherche
+        found_ids = get_search_index().search(query, limit=6)
 
     # ==========================================
     # CAS 2 : C'EST LE MODE "HASARD" (SESSION)
@@ -53,147 +62,110 @@ def index(request):
     else:
         # Gestion de la session (Mémoire)
         # Si on force "?new=true" OU s'il n'y a rien en mémoire
-        if request.GET.get("new") or "random_team_ids" not in request.session:
+        random_ids = await request.session.aget("random_team_ids")
+        if request.GET.get("new") or random_ids is None:
             random_ids = random.sample(range(1, 152), 4)
-            request.session["random_team_ids"] = random_ids
-        else:
-            random_ids = request.session["random_team_ids"]
+            await request.session.aset("random_team_ids", random_ids)
 
-        # On construit manuellement la liste des items à traiter à partir des IDs
-        # Pas besoin de charger les 151 ici, on a juste besoin des URLs
-        for p_id in random_ids:
-            items_to_process.append(
-                {
-                    "url": f"https://pokeapi.co/api/v2/pokemon/{p_id}/",
-                    # On ne connait pas encore le nom, on le trouvera dans le détail
-                    "name": "loading...",
-                }
-            )
+        found_ids = random_ids
 
     # ==========================================
-    # ENRICHISSEMENT (Commun aux deux cas)
+    # AFFICHAGE (Commun aux deux cas) : lu depuis le catalogue local
     # ==========================================
-    for item in items_to_process:
-        try:
-            detail_response = requests.get(item["url"])
-            if detail_response.status_code == 200:
-                details = detail_response.json()
-
-                poke_id = details["id"]
-                type_en = details["types"][0]["type"]["name"]
-
-                # Traduction Type / Couleur
-                type_fr, color = TYPE_TRANSLATIONS.get(type_en, (type_en, "gray"))
-
-                # Traduction Nom
-                # Note: On prend le nom depuis 'details' car dans le cas 'Session',
-                # item['name'] n'est pas fiable.
-                name_en = details["name"]
-                name_fr = ENGLISH_TO_FRENCH.get(name_en, name_en).capitalize()
-
-                pokemons_to_display.append(
-                    {
-                        "id": poke_id,
-                        "name": name_fr,
-                        "color": color,
-                        "type": type_fr,
-                        "sprite": details["sprites"]["front_default"],
-                    }
-                )
-        except Exception:
+    # Les espèces manquantes sont demandées à PokeAPI en parallèle
+    # Badge « capturé » : un test de bit dans le Pokédex du dresseur
+    species_by_id, owned = await asyncio.gather(
+        aget_species_many(found_ids), aowned_species(await request.auser())
+    )
+
+    for poke_id in found_ids:
+        species = species_by_id.get(poke_id)
+        if species is None:
             continue
 
-    return render(
+        # Traduction Type / Couleur
+        type_fr, color = species.type_display
+
+        pokemons_to_display.append(
+            {
+                "id": species.id,
+                "name": species.name_fr,
+                "color": color,
+                "type": type_fr,
+                "sprite": species.sprite,
+                "owned": has_species(owned, species.id),
+            }
+        )
+
+    return await arender(
         request, "pokedex/index.html", {"pokemons": pokemons_to_display, "query": query}
     )
 
 
 # --- VUE : LE DETAIL POKEMON SELECTIONNE (PAGE POKEMON) ---
-def pokemon_detail(request, pokemon_id):
-    # URL 1 : Infos techniques (Poids, stats, sprites...)
-    url_pokemon = f"https://pokeapi.co/api/v2/pokemon/{pokemon_id}"
-    # URL 2 : Infos d'espèce (Noms traduits, descriptions...)
-    url_species = f"https://pokeapi.co/api/v2/pokemon-species/{pokemon_id}"
-
+async def pokemon_detail(request, pokemon_id):
     context = {}
 
-    try:
-        # On lance les requêtes
-        response_pk = requests.get(url_pokemon)
-        response_sp = requests.get(url_species)
-
-        if response_pk.status_code == 200:
-            data_pk = response_pk.json()
-
-            # --- RECUPERATION DU NOM FRANCAIS ---
-            name_fr = data_pk["name"]  # Valeur par défaut
-
-            if response_sp.status_code == 200:
-                data_sp = response_sp.json()
-                for name_entry in data_sp["names"]:
-                    if name_entry["language"]["name"] == "fr":
-                        name_fr = name_entry["name"]
-                        break
-
-            # --- TRADUCTION DU TYPE ---
-            type_en = data_pk["types"][0]["type"]["name"]
-            type_fr, color = TYPE_TRANSLATIONS.get(type_en, (type_en, "gray"))
-
-            # --- TRADUCTION DES STATS (Ajouté pour cohérence) ---
-            stat_translations = {
-                "hp": "PV",
-                "attack": "Attaque",
-                "defense": "Défense",
-                "special-attack": "Atq. Spé.",
-                "special-defense": "Déf. Spé.",
-                "speed": "Vitesse",
-            }
+    # Infos techniques + infos d'espèce (/pokemon et /pokemon-species en
+    # parallèle si l'espèce n'est pas encore dans le catalogue local)
+    species, current_team, owned = await asyncio.gather(
+        aget_species(pokemon_id),
+        request.session.aget("random_team_ids", []),
+        aowned_species(await request.auser()),
+    )
 
-            stats = []
-            for stat in data_pk["stats"]:
-                name_en = stat["stat"]["name"]
-                name_fr_stat = stat_translations.get(name_en, name_en)
-                stats.append({"name": name_fr_stat, "value": stat["base_stat"]})
+    if species is not None:
+        # --- TRADUCTION DU TYPE ---
+        type_fr, color = species.type_display
 
-            current_team = request.session.get("random_team_ids", [])
+        # --- TRADUCTION DES STATS (Ajouté pour cohérence) ---
+        stat_translations = {
+            "hp": "PV",
+            "attack": "Attaque",
+            "defense": "Défense",
+            "special-attack": "Atq. Spé.",
+            "special-defense": "Déf. Spé.",
+            "speed": "Vitesse",
+        }
 
-            # Si Le Pokémon affiché fait partie des 4 élus du hasard
-            if pokemon_id in current_team:
-                # On trouve à quelle position il est (0, 1, 2 ou 3)
-                current_index = current_team.index(pokemon_id)
+        stats = []
+        for name_en, base_stat in species.stats.base_stats():
+            name_fr_stat = stat_translations.get(name_en, name_en)
+            stats.append({"name": name_fr_stat, "value": base_stat})
 
-                # Le précédent : On recule de 1. Le modulo permet de boucler
-                prev_id = current_team[(current_index - 1) % 4]
+        # Si Le Pokémon affiché fait partie des 4 élus du hasard
+        if pokemon_id in current_team:
+            # On trouve à quelle position il est (0, 1, 2 ou 3)
+            current_index = current_team.index(pokemon_id)
 
-                # Le suivant : On avance de 1. Le modulo permet de boucler
-                next_id = current_team[(current_index + 1) % 4]
+            # Le précédent : On recule de 1. Le modulo permet de boucler
+            prev_id = current_team[(current_index - 1) % 4]
 
-            # Si C'est un Pokémon hors liste (accès direct ou recherche)
-            else:
-                # Logique classique (1 -> 2 -> 3...)
-                prev_id = pokemon_id - 1 if pokemon_id > 1 else 151
-                next_id = pokemon_id + 1 if pokemon_id < 151 else 1
-            context = {
-                "pokemon": {
-                    "id": data_pk["id"],
-                    "name": name_fr,
-                    "height": data_pk["height"] / 10,
-                    "weight": data_pk["weight"] / 10,
-                    "type": type_fr,
-                    "color": color,
-                    "stats": stats,
-                    "sprite": data_pk["sprites"]["other"]["official-artwork"][
-                        "front_default"
-                    ],
-                },
-                "previous_id": prev_id,
-                "next_id": next_id,
-            }
-    except Exception as e:
-        print(f"Erreur API: {e}")
-        pass
+            # Le suivant : On avance de 1. Le modulo permet de boucler
+            next_id = current_team[(current_index + 1) % 4]
+
+        # Si C'est un Pokémon hors liste (accès direct ou recherche)
+        else:
+            # Logique classique (1 -> 2 -> 3...)
+            prev_id = pokemon_id - 1 if pokemon_id > 1 else 151
+            next_id = pokemon_id + 1 if pokemon_id < 151 else 1
+        context = {
+            "pokemon": {
+                "id": species.id,
+                "name": species.name_fr,
+                "height": species.height / 10,
+                "weight": species.weight / 10,
+                "type": type_fr,
+                "color": color,
+                "stats": stats,
+                "sprite": species.artwork,
+            },
+            "previous_id": prev_id,
+            "next_id": next_id,
+            "owned": has_species(owned, pokemon_id),
+        }
 
-    return render(request, "pokedex/pokemon.html", context)
+    return await arender(request, "pokedex/pokemon.html", context)
 
 
 # --- VUE INSCRIPTION UTILISATEUR (PAGE SIGNUP)---
@@ -210,6 +182,7 @@ class SignUpView(generic.CreateView):
             Team.objects.create(
                 user=self.object, name=f"Équipe {position + 1}", position=position
             )
+        TrainerStats.objects.create(user=self.object)  # Ligne du classement
 
         return response
 
@@ -218,8 +191,11 @@ class SignUpView(generic.CreateView):
 @login_required
 def capture_pokemon(request):
     if request.method == "POST":
-        pokemon_id = request.POST.get("pokemon_id")
+        pokemon_id = request.POST.get("pokemon_id", "")
         raw_name = request.POST.get("pokemon_name")
+        # Numéro posté tel quel : seules les espèces du Pokédex se capturent
+        if not pokemon_id.isdigit() or not in_pokedex(int(pokemon_id)):
+            return HttpResponseBadRequest("Pokémon inconnu.")
 
         clean_name = raw_name.capitalize() if raw_name else "Inconnu"
 
@@ -240,22 +216,26 @@ def capture_pokemon(request):
 
 # --- VUE DETAIL D'UN POKÉMON CAPTURÉ (PAGE PROFILE) ---
 @login_required
-def capture_detail(request, capture_id):
-    capture = get_object_or_404(PokemonCapture, id=capture_id, user=request.user)
+async def capture_detail(request, capture_id):
+    user = await request.auser()
+    capture = await aget_object_or_404(PokemonCapture, id=capture_id, user=user)
 
     # --- GESTION DU RENOMMAGE (POST) ---
     if request.method == "POST":
         new_nickname = request.POST.get("nickname")
         if new_nickname:
             capture.nickname = new_nickname
-            capture.save()
+            await capture.asave()
             return redirect("capture_detail", capture_id=capture.id)
 
-    # --- RÉCUPERATION DES DONNÉES API ---
-    url = f"https://pokeapi.co/api/v2/pokemon/{capture.pokemon_id}"
-    response = requests.get(url)
+    # --- RÉCUPERATION DES DONNÉES (catalogue local) ---
+    # L'espèce et les captures voisines sont attendues ensemble
+    species, (prev_capture_id, next_capture_id) = await asyncio.gather(
+        aget_species(capture.pokemon_id),
+        _capture_neighbours(capture),
+    )
 
-    # Valeurs par défaut pour éviter crash si API HS
+    # Valeurs par défaut pour éviter crash si l'espèce est inconnue
     stats_display = []
     height_m = 0
     weight_kg = 0
@@ -263,25 +243,16 @@ def capture_detail(request, capture_id):
     type_fr = "Inconnu"
     color = "gray"
 
-    if response.status_code == 200:
-        data = response.json()
-        height_m = data["height"] / 10
-        weight_kg = data["weight"] / 10
+    if species is not None:
+        height_m = species.height / 10
+        weight_kg = species.weight / 10
 
-        # --- RECUPERATION TYPE ET COULEUR (C'est ce qui manquait !) ---
-        type_en = data["types"][0]["type"]["name"]
-        type_fr, color = TYPE_TRANSLATIONS.get(type_en, (type_en, "gray"))
+        # --- RECUPERATION TYPE ET COULEUR ---
+        type_fr, color = species.type_display
 
         # --- RÉCUPERATION DE LA DESCRIPTION ---
-        species_url = data["species"]["url"]
-        species_response = requests.get(species_url)
-
-        if species_response.status_code == 200:
-            species_data = species_response.json()
-            for entry in species_data["flavor_text_entries"]:
-                if entry["language"]["name"] == "fr":
-                    description = entry["flavor_text"].replace("\n", " ")
-                    break
+        if species.description_fr:
+            description = species.description_fr
 
         # --- CALCUL DES STATS ---
         stat_translations = {
@@ -293,18 +264,11 @@ def capture_detail(request, capture_id):
             "speed": ("Vitesse", "bg-yellow-400"),
         }
 
-        for s in data["stats"]:
-            name_en = s["stat"]["name"]
-            base_stat = s["base_stat"]
-
-            # Calculs RPG (formules)
-            if name_en == "hp":
-                real_value = int(
-                    (base_stat * 2 * capture.level) / 100 + capture.level + 10
-                )
-            else:
-                real_value = int((base_stat * 2 * capture.level) / 100 + 5)
-
+        # Stats réelles au niveau de la capture, d'un bloc (stats.py)
+        real_values = await areal_stats(capture.pokemon_id, capture.level)
+        for (name_en, base_stat), real_value in zip(
+            species.stats.base_stats(), real_values.tolist()
+        ):
             name_fr_stat, color_bar = stat_translations.get(
                 name_en, (name_en, "bg-gray-500")
             )
@@ -319,21 +283,8 @@ def capture_detail(request, capture_id):
                     "percent": percent,
                 }
             )
-            all_user_captures = list(
-                PokemonCapture.objects.filter(user=request.user)
-                .order_by("-captured_at")
-                .values_list("id", flat=True)
-            )
 
-    # 2. On trouve l'index du Pokémon actuel
-    current_index = all_user_captures.index(capture.id)
-    total_captures = len(all_user_captures)
-
-    prev_capture_id = all_user_captures[(current_index - 1) % total_captures]
-
-    next_capture_id = all_user_captures[(current_index + 1) % total_captures]
-
-    return render(
+    return await arender(
         request,
         "pokedex/capture_detail.html",
         {
@@ -350,11 +301,129 @@ def capture_detail(request, capture_id):
     )
 
 
+async def _capture_neighbours(capture):
+    """
+    Captures précédente et suivante dans l'ordre du profil (-captured_at, -id),
+    en boucle aux extrémités : deux lectures de l'index capture_collection,
+    quel que soit le nombre de captures du dresseur.
+    """
+    owned = PokemonCapture.objects.filter(user_id=capture.user_id).values_list(
+        "id", flat=True
+    )
+    newest_first = owned.order_by("-captured_at", "-id")
+    oldest_first = owned.order_by("captured_at", "id")
+    newer = Q(captured_at__gt=capture.captured_at) | Q(
+        captured_at=capture.captured_at, id__gt=capture.id
+    )
+    older = Q(captured_at__lt=capture.captured_at) | Q(
+        captured_at=capture.captured_at, id__lt=capture.id
+    )
+
+    # Première capture : la précédente est la plus ancienne (et inversement)
+    prev_id = await oldest_first.filter(newer).afirst()
+    if prev_id is None:
+        prev_id = await oldest_first.afirst()
+    next_id = await newest_first.filter(older).afirst()
+    if next_id is None:
+        next_id = await newest_first.afirst()
+    return prev_id, next_id
+
+
+# Captures affichées par page du profil (et par chargement du défilement)
+PROFILE_PAGE_SIZE = 60
+
+
+def _capture_filters(params):
+    """
+    Filtres du profil (?species=, ?level_min=, ?level_max=, ?q=) : le Q à
+    appliquer et les valeurs à réafficher. Chacun est lisible sur un index
+    de PokemonCapture commençant par user.
+    """
+    query = Q()
+    values = {
+        name: params.get(name, "").strip()
+        for name in ("species", "level_min", "level_max", "q")
+    }
+    if values["species"].isdigit():
+        query &= Q(pokemon_id=int(values["species"]))
+    if values["level_min"].isdigit():
+        query &= Q(level__gte=int(values["level_min"]))
+    if values["level_max"].isdigit():
+        query &= Q(level__lte=int(values["level_max"]))
+    if values["q"]:
+        # Préfixe du surnom en intervalle (pas de LIKE '%...%' qui parcourt
+        # tout) ; les surnoms par défaut commencent par une majuscule
+        prefixes = {values["q"], values["q"].capitalize()}
+        query &= reduce(
+            or_,
+            (
+                Q(nickname__gte=prefix, nickname__lt=prefix + "\U0010ffff")
+                for prefix in prefixes
+            ),
+        )
+    values["active"] = any(values.values())
+    return query, values
+
+
+def _parse_capture_cursor(text):
+    """'<captured_at ISO>_<id>' -> (datetime, id), ou None si invalide."""
+    captured_at, _, capture_id = text.rpartition("_")
+    try:
+        return datetime.fromisoformat(captured_at), int(capture_id)
+    except ValueError:
+        return None
+
+
+def _captures_after(captures, text):
+    """
+    Captures qui suivent le curseur `text` dans l'ordre (-captured_at, -id) :
+    pagination par clé, lecture d'index sans OFFSET. Toutes si pas de curseur.
+    """
+    cursor = _parse_capture_cursor(text)
+    if cursor is None:
+        return captures
+    captured_at, capture_id = cursor
+    return captures.filter(
+        Q(captured_at__lt=captured_at) | Q(captured_at=captured_at, id__lt=capture_id)
+    )
+
+
+def _capture_cursor(capture):
+    return f"{capture.captured_at.isoformat()}_{capture.id}"
+
+
 # --- VUE PROFIL UTILISATEUR (PAGE PROFILE) ---
 @login_required
 def profile(request):
-    captures = PokemonCapture.objects.filter(user=request.user).order_by("-captured_at")
-    return render(request, "pokedex/profile.html", {"captures": captures})
+    query, filters = _capture_filters(request.GET)
+    captures = PokemonCapture.objects.filter(query, user=request.user)
+
+    # Pagination par clé sur (captured_at, id) : index capture_collection
+    captures = _captures_after(captures, request.GET.get("after", ""))
+    captures = list(captures.order_by("-captured_at", "-id")[: PROFILE_PAGE_SIZE + 1])
+
+    next_query = None
+    if len(captures) > PROFILE_PAGE_SIZE:
+        captures = captures[:PROFILE_PAGE_SIZE]
+        params = request.GET.copy()
+        params.pop("fragment", None)
+        params["after"] = _capture_cursor(captures[-1])
+        next_query = params.urlencode()
+
+    context = {"captures": captures, "next_query": next_query}
+    # Défilement infini : juste les cartes suivantes
+    if request.GET.get("fragment"):
+        return render(request, "pokedex/capture_cards.html", context)
+
+    context["filters"] = filters
+    # Compteurs tenus par les signaux : une ligne lue, pas de COUNT
+    captures, pokedex = TrainerStats.objects.filter(user=request.user).values_list(
+        "captures", "pokedex"
+    ).first() or (0, b"")
+    context["capture_count"] = captures
+    context["species_owned"], context["completion"] = completion(bytes(pokedex))
+    context["pokedex_size"] = POKEDEX_SIZE
+    return render(request, "pokedex/profile.html", context)
 
 
 # --- VUE RELACHEMENT POKÉMON (PAGE PROFILE) ---
@@ -379,14 +448,23 @@ def edit_profile(request):
     return render(request, "pokedex/edit_profile.html", {"form": form})
 
 
+# Pokémon disponibles affichés par page sur la page des équipes
+AVAILABLE_PAGE_SIZE = 60
+
+
 # --- VUE EQUIPES (PAGE TEAMS) ---
+# Nombre de requêtes fixe, quel que soit le nombre de captures
 @login_required
 def team(request):
-    user_teams = Team.objects.filter(user=request.user).order_by("position")
+    user_teams = list(Team.objects.filter(user=request.user).order_by("position"))
 
     # On affiche la premiere équipe par défaut
     selected_team_position = int(request.GET.get("team", 0))
-    selected_team = user_teams.get(position=selected_team_position)
+    selected_team = next(
+        (t for t in user_teams if t.position == selected_team_position), None
+    )
+    if selected_team is None:
+        raise Http404("Équipe introuvable.")
 
     # Actions de modification
     if request.method == "POST":
@@ -421,7 +499,7 @@ def team(request):
                 )
 
                 # Vérifier que l'équipe n'a pas déjà 5 Pokémon
-                if selected_team.pokemons.count() >= 5:
+                if selected_team.roster_size >= 5:
                     messages.error(
                         request,
                         f"{selected_team.name} a déjà 5 Pokémons",
@@ -475,19 +553,42 @@ def team(request):
             return redirect(f"/teams/?team={selected_team_position}")
 
     # Récupérer les pokémon de l'équipe sélectionnée
-    team_pokemons = selected_team.pokemons.all()
-
-    # Récupérer les autres
-    available_pokemons = PokemonCapture.objects.filter(user=request.user).exclude(
+    team_pokemons = list(selected_team.pokemons.all())
+
+    # Résumé de l'équipe : stats réelles de tous les membres en un calcul
+    team_stats = real_stats(
+        [p.pokemon_id for p in team_pokemons], [p.level for p in team_pokemons]
+    ).reshape(-1, len(STAT_LABELS))
+    for pokemon, values in zip(team_pokemons, team_stats.tolist()):
+        pokemon.hp = values[0]
+    team_summary = list(zip(STAT_LABELS, team_stats.sum(axis=0).tolist()))
+
+    # Récupérer les autres, une page à la fois, par clé comme le profil
+    # (?after=<dernière capture affichée>) : une ligne de plus pour savoir
+    # s'il reste une page suivante, sans COUNT ni OFFSET
+    after = request.GET.get("after", "")
+    available = PokemonCapture.objects.filter(user=request.user).exclude(
         teams=selected_team
     )
+    available_pokemons = list(
+        _captures_after(available, after).order_by("-captured_at", "-id")[
+            : AVAILABLE_PAGE_SIZE + 1
+        ]
+    )
+    next_after = None
+    if len(available_pokemons) > AVAILABLE_PAGE_SIZE:
+        available_pokemons = available_pokemons[:AVAILABLE_PAGE_SIZE]
+        next_after = _capture_cursor(available_pokemons[-1])
 
     context = {
         "teams": user_teams,
         "selected_team": selected_team,
         "selected_team_position": selected_team_position,
         "team_pokemons": team_pokemons,
+        "team_summary": team_summary,
         "available_pokemons": available_pokemons,
+        "next_after": next_after,
+        "is_first_page": not after,
     }
 
     return render(request, "pokedex/teams.html", context)
@@ -565,101 +666,202 @@ def fight(request):
                     return redirect("fight")
 
                 manager = FightManager(t1, t2, mode="pvp")
-                request.session["fight_input_phase"] = "p1"  # P1 commence
             else:
-                # PVE: Adversaire aléatoire
-                others = Team.objects.exclude(id=team1_id)
-                # Filtrer uniquement les équipes prêtes pour le combat
-                ready_teams = [team for team in others if team.is_ready_for_battle()]
-
-                if ready_teams:
-                    t2 = random.choice(ready_teams)
-                else:
+                # PVE: Adversaire aléatoire parmi les équipes prêtes (pool
+                # tenu à jour par signaux), de niveau proche si possible
+                t2 = pick_opponent(t1, level_band=settings.MATCHMAKING_LEVEL_BAND)
+                if t2 is None:
                     t2 = t1  # Mirror match fallback
 
                 manager = FightManager(t1, t2, mode="pve")
 
-            # Sauvegarde en session
-            request.session["fight_state"] = manager.get_state()
-            request.session["fight_teams"] = {"p1": t1.id, "p2": t2.id}
+            # Un combat par ID : on peut en mener plusieurs en parallèle
+            fight = Fight.start(request.user, manager)
+            return redirect("fight_detail", fight_id=fight.id)
+
+    # 2. AFFICHAGE (GET) : sélection des équipes et combats en cours
+    # Les Pokémon de toutes les équipes en une requête (sprites des sélecteurs)
+    my_teams = Team.objects.filter(user=request.user).prefetch_related("pokemons")
+    ongoing = Fight.objects.filter(user=request.user, winner="").select_related(
+        "team1", "team2"
+    )
+    return render(
+        request,
+        "pokedex/fights.html",
+        {"teams": my_teams, "ongoing_fights": ongoing, "in_fight": False},
+    )
 
-            return redirect("fight")
+
+# --- VUE D'UN COMBAT (TOURS) ---
+@login_required
+def fight_detail(request, fight_id):
+    fight = get_object_or_404(
+        Fight.objects.select_related("team1", "team2"),
+        id=fight_id,
+        user=request.user,
+    )
+    manager = fight.load()
+    if manager is None:
+        # État d'un ancien format : le combat ne peut pas reprendre
+        fight.delete()
+        return redirect("fight")
+
+    if request.method == "POST":
+        action_type = request.POST.get("action_type")
 
         # --- COMBAT ACTION ---
-        elif action_type == "turn":
-            state = request.session.get("fight_state")
-            team_ids = request.session.get("fight_teams")
-
-            if state and team_ids:
-                # On recharge les objets Team
-                t1 = get_object_or_404(Team, id=team_ids["p1"])
-                t2 = get_object_or_404(Team, id=team_ids["p2"])
-
-                manager = FightManager(t1, t2, session_state=state)
-
-                # Parsing de l'action reçue
-                move = request.POST.get("move")
-                action = {"type": "attack"}
-                if move and move.startswith("switch_"):
-                    idx = int(move.split("_")[1])
-                    action = {"type": "switch", "index": idx}
-
-                # Logique selon le mode
-                if manager.mode == "pve":
-                    # Execution directe (P1 vs IA)
-                    manager.execute_turn(action)
-                    request.session["fight_state"] = manager.get_state()
-
-                elif manager.mode == "pvp":
-                    phase = request.session.get("fight_input_phase", "p1")
-
-                    if phase == "p1":
-                        # On stocke le choix de P1 et on passe à P2
-                        request.session["p1_pending_action"] = action
-                        request.session["fight_input_phase"] = "p2"
-
-                    elif phase == "p2":
-                        # On récupère P1 et on exécute tout
-                        p1_action = request.session.get("p1_pending_action")
-                        p2_action = action
-
-                        manager.execute_turn(p1_action, p2_action)
-
-                        # Reset pour le prochain tour
-                        request.session["fight_state"] = manager.get_state()
-                        request.session["fight_input_phase"] = "p1"
-                        if "p1_pending_action" in request.session:
-                            del request.session["p1_pending_action"]
+        if action_type == "turn":
+            # Parsing de l'action reçue
+            move = request.POST.get("move")
+            action = {"type": "attack"}
+            if move and move.startswith("switch_"):
+                idx = int(move.split("_")[1])
+                action = {"type": "switch", "index": idx}
+
+            # Logique selon le mode
+            if manager.mode == "pve":
+                # Execution directe (P1 vs IA)
+                manager.execute_turn(action)
+                saved = fight.save_state(manager)
+
+            elif fight.input_phase == "p1":
+                # PvP : on stocke le choix de P1 et on passe à P2
+                saved = fight.save_state(
+                    manager, input_phase="p2", pending_action=action
+                )
 
-            return redirect("fight")
+            else:
+                # On récupère P1 et on exécute tout
+                manager.execute_turn(fight.pending_action, action)
+                saved = fight.save_state(manager, input_phase="p1", pending_action=None)
+
+            # Autre onglet / double clic : l'état a changé depuis la lecture
+            if not saved:
+                messages.warning(
+                    request,
+                    "Le combat a changé entre-temps, action ignorée.",
+                    extra_tags="impossible_battle",
+                )
 
         # --- QUIT ---
         elif action_type == "quit":
-            keys = [
-                "fight_state",
-                "fight_teams",
-                "fight_input_phase",
-                "p1_pending_action",
-            ]
-            for k in keys:
-                if k in request.session:
-                    del request.session[k]
+            fight.delete()
             return redirect("fight")
 
-    # 2. AFFICHAGE (GET)
-    state = request.session.get("fight_state")
+        return redirect("fight_detail", fight_id=fight.id)
 
-    if state:
-        # MODE COMBAT
-        input_phase = request.session.get("fight_input_phase", "p1")
-        return render(
-            request,
-            "pokedex/fights.html",
-            {"state": state, "in_fight": True, "input_phase": input_phase},
-        )
-    else:
-        # MODE SELECTION
-        my_teams = Team.objects.filter(user=request.user)
-        return render(
-            request, "pokedex/fights.html", {"teams": my_teams, "in_fight": False}
-        )
+    # AFFICHAGE (GET)
+    return render(
+        request,
+        "pokedex/fights.html",
+        {
+            "fight": fight,
+            "state": manager.get_state(),
+            "in_fight": True,
+            "input_phase": fight.input_phase,
+        },
+    )
+
+
+# Combats terminés affichés par page dans l'historique
+HISTORY_PAGE_SIZE = 20
+
+
+# --- VUE HISTORIQUE DES COMBATS ---
+# Pagination par clé (?before=<id du dernier combat affiché>) : chaque page
+# est une lecture d'index, même avec des millions de combats enregistrés
+@login_required
+def fight_history(request):
+    results = FightResult.objects.filter(user=request.user).select_related(
+        "team1", "team2"
+    )
+    before = request.GET.get("before", "")
+    if before.isdigit():
+        results = results.filter(id__lt=int(before))
+    # Un combat de plus que la page : savoir s'il en reste de plus anciens
+    results = list(results[: HISTORY_PAGE_SIZE + 1])
+    has_older = len(results) > HISTORY_PAGE_SIZE
+    results = results[:HISTORY_PAGE_SIZE]
+
+    stats = TrainerStats.objects.filter(user=request.user).first()
+    return render(
+        request,
+        "pokedex/fight_history.html",
+        {
+            "results": results,
+            "stats": stats,
+            "next_before": results[-1].id if has_older else None,
+            "is_first_page": not before,
+        },
+    )
+
+
+# --- VUE REVOIR UN COMBAT (PAGE FIGHTS) ---
+# Le combat est rejoué depuis son journal (graine + actions) jusqu'au tour
+# demandé (?turn=N, la fin par défaut) : aucun état intermédiaire stocké
+@login_required
+def fight_replay(request, result_id):
+    result = get_object_or_404(FightResult, id=result_id, user=request.user)
+    turn = request.GET.get("turn", "")
+    manager = replay(result.replay, turns=int(turn) if turn.isdigit() else None)
+    if manager is None:
+        # Combat enregistré sans journal (ou d'un ancien format)
+        raise Http404("Ce combat ne peut pas être revu.")
+
+    return render(
+        request,
+        "pokedex/fights.html",
+        {
+            "state": manager.get_state(),
+            "in_fight": True,
+            "replay": {
+                "result": result,
+                "turn": manager.turn,
+                "previous": max(manager.turn - 1, 0),
+                "next": manager.turn + 1 if manager.turn < result.turns else None,
+            },
+        },
+    )
+
+
+# --- VUE CLASSEMENT DES DRESSEURS ---
+# Compteurs précalculés (leaderboard.py) : une page = une lecture d'index
+def leaderboard(request):
+    sort = request.GET.get("sort", "wins")
+    if sort not in SORTS:
+        sort = "wins"
+    rows, next_cursor = leaderboard_page(
+        sort, parse_cursor(request.GET.get("after", ""))
+    )
+    return render(
+        request,
+        "pokedex/leaderboard.html",
+        {
+            "rows": rows,
+            "sort": sort,
+            "sort_labels": SORT_LABELS,
+            "next_cursor": next_cursor,
+            "is_first_page": "after" not in request.GET,
+        },
+    )
+
+
+# --- FICHIERS DU MIROIR DE SPRITES (mirror_sprites, build_sprite_atlas) ---
+# Nommés par le hash de leur contenu : une URL ne change jamais, le
+# navigateur les garde un an sans revalider
+def sprite_file(request, name):
+    match = FILE_NAME.match(name)
+    path = mirror_dir() / name
+    if match is None or not path.is_file():
+        raise Http404("Image absente du miroir")
+    response = FileResponse(path.open("rb"), content_type=CONTENT_TYPES[match.group(1)])
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+
+# --- VUE STATS DU CACHE POKEAPI (STAFF) ---
+# Compteurs du processus courant (hits par niveau, misses, évictions...)
+@staff_member_required
+def pokeapi_cache_stats(request):
+    cache = get_client().cache
+    return JsonResponse(cache.info() if cache else {})